@@ -6,10 +6,10 @@ from langchain.agents.agent import AgentExecutor
 
 from pydantic import SecretStr
 
-from agents.candidate_matcher.prompts import prompt
+from agents.candidate_matcher.prompts import prompt, MATCHING_PROMPT_VERSION
 from agents.common.abstract_agent import Agent
-from agents.common.tools.get_candidates import get_candidates
-from agents.common.tools.get_job_postings import get_all_job_postings
+from agents.common.llm_cache import get_llm_cache
+from agents.common.tools.get_match_shortlist import get_match_shortlist
 from agents.common.tools.enrich_job_postings import enrich_job_postings
 from agents.common.tools.json_tools import convert_to_json
 from agents.common.tools.save_matches import save_job_matches
@@ -18,13 +18,17 @@ from common.config.config import OPENAI_API_KEY
 class CandidateMatcherAgent(Agent):
     def __init__(self):
         tools = [
-            get_all_job_postings,
+            get_match_shortlist,
             enrich_job_postings,
             convert_to_json,
-            get_candidates,
             save_job_matches
         ]
-        llm = ChatOpenAI(model="gpt-4o", temperature=0, api_key=SecretStr(OPENAI_API_KEY))
+        llm = ChatOpenAI(
+            model="gpt-4o",
+            temperature=0,
+            api_key=SecretStr(OPENAI_API_KEY),
+            cache=get_llm_cache(f"candidate_matcher_agent:v{MATCHING_PROMPT_VERSION}"),
+        )
         agent = create_openai_functions_agent(
             tools=tools,
             llm=llm,
@@ -0,0 +1,213 @@
+"""
+Direct LLM scoring of shortlisted candidate × job posting pairs.
+
+Instead of one long agent conversation that has to tool-call its way through every
+candidate, the shortlist is packed into chunks that fit a token budget. Each chunk is
+scored with a single structured-output call, chunks run concurrently under a rate
+limit, and each chunk's matches are upserted as soon as it finishes.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from langchain_openai.chat_models.base import ChatOpenAI
+from pydantic import BaseModel, Field, SecretStr
+
+from agents.candidate_matcher.compact_format import CompactPromptSerializer
+from agents.candidate_matcher.shortlist import build_match_shortlist
+from agents.candidate_matcher.prompts import scoring_prompt, MATCHING_PROMPT_VERSION
+from agents.common.llm_cache import get_llm_cache, metrics as llm_cache_metrics
+from common.config.config import (
+    OPENAI_API_KEY,
+    MATCHER_MODEL,
+    MATCHER_CHUNK_TOKEN_BUDGET,
+    MATCHER_MAX_CONCURRENCY,
+    MATCHER_REQUESTS_PER_SECOND,
+)
+from common.database.database import unit_of_work
+from common.database.repositories.matches import MatchesRepository
+from services.match_state import MatchStateService
+
+# Matches below this score are never stored (see chk_match_score_minimum)
+MIN_MATCH_SCORE = 60.0
+
+
+class MatchScore(BaseModel):
+    candidate_id: int
+    job_posting_id: int
+    match_score: float = Field(description="Match score from 0 to 100")
+    strengths: str = Field(description="What makes this a good match")
+    weaknesses: str = Field(description="What could be challenging")
+
+
+class MatchScores(BaseModel):
+    matches: List[MatchScore] = Field(description="Matches with match_score >= 60, omit the rest")
+
+
+@dataclass
+class ScoringResult:
+    matches: List[Dict[str, Any]] = field(default_factory=list)
+    chunks: int = 0
+    failed_chunks: int = 0
+    pairs: int = 0
+    # Work item tokens sent, excluding the system prompt
+    prompt_tokens: int = 0
+
+
+def chunk_work_items(
+    shortlist: List[Dict[str, Any]], token_budget: int, serializer: CompactPromptSerializer
+) -> List[List[Dict[str, Any]]]:
+    """
+    Pack the shortlist into chunks of candidates with (a slice of) their job postings whose
+    compact form stays within token_budget. A candidate with many postings is split across
+    chunks, repeating only its profile row, and a posting shortlisted for several candidates
+    of the same chunk is counted once. A single posting over budget gets a chunk of its own.
+    """
+    chunks: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    current_tokens = serializer.header_tokens
+    current_posting_ids, current_descriptions = set(), set()
+
+    def item_tokens(job_posting: Dict[str, Any]) -> int:
+        posting_tokens = 0
+        if job_posting["id"] not in current_posting_ids:
+            posting_tokens = serializer.posting_tokens(job_posting, serializer.description(job_posting) in current_descriptions)
+        return serializer.pair_tokens(job_posting) + posting_tokens
+
+    for candidate in shortlist:
+        profile = {k: v for k, v in candidate.items() if k != "job_postings"}
+        profile_tokens = serializer.candidate_tokens(profile)
+        entry = None
+
+        for job_posting in candidate["job_postings"]:
+            tokens = item_tokens(job_posting)
+            if current and current_tokens + tokens + (0 if entry else profile_tokens) > token_budget:
+                chunks.append(current)
+                current, current_tokens, entry = [], serializer.header_tokens, None
+                current_posting_ids, current_descriptions = set(), set()
+                tokens = item_tokens(job_posting)
+            if entry is None:
+                entry = {**profile, "job_postings": []}
+                current.append(entry)
+                current_tokens += profile_tokens
+
+            entry["job_postings"].append(job_posting)
+            current_posting_ids.add(job_posting["id"])
+            current_descriptions.add(serializer.description(job_posting))
+            current_tokens += tokens
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class BatchMatchScorer:
+    # Unchanged chunks (same pairs, same prompt version) are answered from the LLM cache
+    cache_namespace = f"match_scorer:v{MATCHING_PROMPT_VERSION}"
+
+    def __init__(
+        self,
+        llm: Optional[ChatOpenAI] = None,
+        token_budget: int = MATCHER_CHUNK_TOKEN_BUDGET,
+        max_concurrency: int = MATCHER_MAX_CONCURRENCY,
+    ):
+        self.token_budget = token_budget
+        self.serializer = CompactPromptSerializer()
+        self.max_concurrency = max_concurrency
+        self.llm = llm or ChatOpenAI(
+            model=MATCHER_MODEL,
+            temperature=0,
+            api_key=SecretStr(OPENAI_API_KEY),
+            cache=get_llm_cache(self.cache_namespace),
+            rate_limiter=InMemoryRateLimiter(
+                requests_per_second=MATCHER_REQUESTS_PER_SECOND,
+                max_bucket_size=max_concurrency,
+            ),
+        )
+        self.chain = scoring_prompt | self.llm.with_structured_output(MatchScores, method="json_schema")
+
+    async def _score_chunk(self, chunk: List[Dict[str, Any]], semaphore: asyncio.Semaphore) -> List[Dict[str, Any]]:
+        async with semaphore:
+            result: MatchScores = await self.chain.ainvoke({"work_items": self.serializer.serialize(chunk)})
+
+        # Drop pairs the model wasn't asked about and anything below the minimum score
+        requested = {(entry["id"], job_posting["id"]) for entry in chunk for job_posting in entry["job_postings"]}
+        return [
+            match.model_dump()
+            for match in result.matches
+            if (match.candidate_id, match.job_posting_id) in requested and match.match_score >= MIN_MATCH_SCORE
+        ]
+
+    @staticmethod
+    def _save_matches(matches: List[Dict[str, Any]]) -> int:
+        with unit_of_work():
+            return MatchesRepository().bulk_upsert_matches(matches)
+
+    async def score(self, shortlist: List[Dict[str, Any]]) -> ScoringResult:
+        chunks = chunk_work_items(shortlist, self.token_budget, self.serializer)
+        result = ScoringResult(
+            chunks=len(chunks),
+            pairs=sum(len(candidate["job_postings"]) for candidate in shortlist),
+            prompt_tokens=sum(self.serializer.tokens.count(self.serializer.serialize(chunk)) for chunk in chunks),
+        )
+        logging.info(
+            f"[BatchMatchScorer] Scoring {result.pairs} pairs in {result.chunks} chunks, "
+            f"~{result.prompt_tokens} input tokens"
+        )
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = [asyncio.create_task(self._score_chunk(chunk, semaphore)) for chunk in chunks]
+        for task in asyncio.as_completed(tasks):
+            try:
+                matches = await task
+            except Exception as e:
+                result.failed_chunks += 1
+                logging.error(f"[BatchMatchScorer] Error scoring chunk: {e}")
+                continue
+
+            # Stream each chunk's matches into the database as soon as it's scored
+            if matches:
+                await asyncio.to_thread(self._save_matches, matches)
+                result.matches.extend(matches)
+
+        logging.info(
+            f"[BatchMatchScorer] Saved {len(result.matches)} matches from {result.chunks - result.failed_chunks}/"
+            f"{result.chunks} chunks"
+        )
+        if cache_stats := llm_cache_metrics.snapshot().get(self.cache_namespace):
+            logging.info(f"[BatchMatchScorer] LLM cache: {cache_stats}")
+        return result
+
+    def run(self, shortlist: List[Dict[str, Any]]) -> ScoringResult:
+        """Blocking entry point for the workflow and crons"""
+        return asyncio.run(self.score(shortlist))
+
+
+def score_pending_matches(*job_posting_criteria) -> Optional[ScoringResult]:
+    """
+    Score the pending delta (optionally limited to the job postings matching the criteria) and
+    advance the match watermark. None if there was nothing to match. If any chunk fails the
+    watermark stays put, so the failed pairs are retried by the next run.
+    """
+    match_state = MatchStateService()
+    delta = match_state.get_delta(*job_posting_criteria)
+    if delta.is_empty():
+        logging.info("[BatchMatchScorer] No new or changed candidates or job postings to match")
+        return None
+
+    result = BatchMatchScorer().run(build_match_shortlist(delta))
+    if not result.failed_chunks:
+        match_state.mark_matched(delta)
+    return result
+
+
+if __name__ == '__main__':
+    # Dry run: plan the chunks for the pending shortlist without calling the LLM
+    serializer = CompactPromptSerializer()
+    chunks = chunk_work_items(build_match_shortlist(), MATCHER_CHUNK_TOKEN_BUDGET, serializer)
+    for i, chunk in enumerate(chunks, 1):
+        pairs = sum(len(entry["job_postings"]) for entry in chunk)
+        print(f"Chunk {i}: {len(chunk)} candidates, {pairs} pairs, {serializer.tokens.count(serializer.serialize(chunk))} tokens")
@@ -0,0 +1,199 @@
+"""
+Token-minimized representation of matching work for LLM prompts.
+
+JSON repeats every key for every posting and carries fields the scoring rubric never uses
+(links, timestamps). Here each chunk is written as two pipe-separated tables with the header
+given once: job postings (each posting once, even if shortlisted for several candidates) and
+candidates with their shortlisted pairs. Tech stacks use canonical names, descriptions are
+truncated to a token budget, and a description repeated verbatim points to the first posting
+that has it.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from common.config.config import MATCHER_MODEL, MATCHER_DESCRIPTION_MAX_TOKENS
+from common.normalization.locations import resolve_location
+from common.normalization.tech_stack import normalize_technology
+
+POSTING_COLUMNS = ("id", "title", "company", "company_type", "industry", "stage", "tech", "description")
+CANDIDATE_COLUMNS = ("id", "role", "location", "tech", "pairs")
+
+# Placeholder for empty values and unknown scores
+EMPTY = "-"
+
+
+class TokenCounter:
+    """Counts tokens with the model's tokenizer, or ~4 characters per token if it can't be loaded"""
+
+    def __init__(self, model: str = MATCHER_MODEL):
+        self.encoding = None
+        try:
+            import tiktoken
+
+            self.encoding = tiktoken.encoding_for_model(model)
+        except Exception as e:
+            # tiktoken downloads its vocabularies on first use, that fails offline
+            logging.warning(f"[TokenCounter] Tokenizer for {model} not available, estimating token counts: {type(e).__name__}")
+
+    def count(self, text: str) -> int:
+        if self.encoding:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return len(text) // 4 + 1
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to max_tokens at a word boundary"""
+        if self.encoding:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            cut = self.encoding.decode(tokens[:max_tokens])
+        else:
+            if len(text) <= max_tokens * 4:
+                return text
+            cut = text[:max_tokens * 4]
+        return cut.rsplit(" ", 1)[0].rstrip(",.;:- ") + "…"
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return EMPTY
+    text = " ".join(str(value).split()).replace("|", "/")
+    return text or EMPTY
+
+
+def _score(value: Optional[float]) -> str:
+    return EMPTY if value is None else f"{value:.2f}".lstrip("0")
+
+
+def compact_tech_stack(tech_stack: Optional[str]) -> str:
+    """Canonical names where known, the original otherwise, without duplicates"""
+    technologies = []
+    for item in (tech_stack or "").split(","):
+        item = " ".join(item.split())
+        technology = normalize_technology(item) or item.lower()
+        if technology and technology not in technologies:
+            technologies.append(technology)
+    return ",".join(technologies)
+
+
+class CompactPromptSerializer:
+    def __init__(self, token_counter: Optional[TokenCounter] = None, description_max_tokens: int = MATCHER_DESCRIPTION_MAX_TOKENS):
+        self.tokens = token_counter or TokenCounter()
+        self.description_max_tokens = description_max_tokens
+        self._posting_cells: Dict[int, List[str]] = {}
+        self.header_tokens = self.tokens.count(self._headers())
+
+    @staticmethod
+    def _headers() -> str:
+        return f"## job_postings\n{'|'.join(POSTING_COLUMNS)}\n## candidates\n{'|'.join(CANDIDATE_COLUMNS)}\n"
+
+    def posting_cells(self, job_posting: Dict[str, Any]) -> List[str]:
+        """Cells of a posting row, memoized by ID since the same posting shows up for many candidates"""
+        cells = self._posting_cells.get(job_posting["id"])
+        if cells is None:
+            description = job_posting.get("quick_description")
+            cells = self._posting_cells[job_posting["id"]] = [
+                str(job_posting["id"]),
+                _cell(job_posting.get("job_title")),
+                _cell(job_posting.get("company_name")),
+                _cell(job_posting.get("company_type")),
+                _cell(job_posting.get("industry")),
+                _cell(job_posting.get("stage")),
+                _cell(compact_tech_stack(job_posting.get("tech_stack"))),
+                _cell(self.tokens.truncate(_cell(description), self.description_max_tokens) if description else None),
+            ]
+        return cells
+
+    def candidate_cells(self, candidate: Dict[str, Any]) -> List[str]:
+        location = candidate.get("location")
+        resolved = resolve_location(location)
+        place = ", ".join(filter(None, (resolved.country, resolved.region)))
+        return [
+            str(candidate["id"]),
+            _cell(candidate.get("role")),
+            _cell(f"{location} ({place})" if location and place else location),
+            _cell(compact_tech_stack(candidate.get("tech_stack"))),
+        ]
+
+    @staticmethod
+    def pair_cell(job_posting: Dict[str, Any]) -> str:
+        """job_posting_id:pre_score:similarity"""
+        return f"{job_posting['id']}:{_score(job_posting.get('pre_score'))}:{_score(job_posting.get('similarity'))}"
+
+    # Token costs used to pack chunks without serializing them first
+    def posting_tokens(self, job_posting: Dict[str, Any], description_seen: bool = False) -> int:
+        """Cost of a posting row, description_seen if its description is already in the chunk"""
+        cells = self.posting_cells(job_posting)
+        if description_seen and cells[-1] != EMPTY:
+            cells = cells[:-1] + [f"same as {cells[0]}"]
+        return self.tokens.count("|".join(cells) + "\n")
+
+    def description(self, job_posting: Dict[str, Any]) -> str:
+        return self.posting_cells(job_posting)[-1]
+
+    def candidate_tokens(self, candidate: Dict[str, Any]) -> int:
+        return self.tokens.count("|".join(self.candidate_cells(candidate)) + "|\n")
+
+    def pair_tokens(self, job_posting: Dict[str, Any]) -> int:
+        return self.tokens.count(" " + self.pair_cell(job_posting))
+
+    def serialize(self, work_items: List[Dict[str, Any]]) -> str:
+        """Candidates with their shortlisted job postings as compact tables"""
+        posting_rows, candidate_rows = [], []
+        seen_postings = set()
+        description_owners: Dict[str, int] = {}
+
+        for candidate in work_items:
+            for job_posting in candidate["job_postings"]:
+                if job_posting["id"] in seen_postings:
+                    continue
+                seen_postings.add(job_posting["id"])
+                cells = list(self.posting_cells(job_posting))
+                description = cells[-1]
+                if description != EMPTY:
+                    # Reposts and multi-location postings often share the same description
+                    if description in description_owners:
+                        cells[-1] = f"same as {description_owners[description]}"
+                    else:
+                        description_owners[description] = job_posting["id"]
+                posting_rows.append("|".join(cells))
+
+            pairs = " ".join(self.pair_cell(job_posting) for job_posting in candidate["job_postings"])
+            candidate_rows.append("|".join(self.candidate_cells(candidate) + [pairs]))
+
+        return (
+            f"## job_postings\n{'|'.join(POSTING_COLUMNS)}\n" + "\n".join(posting_rows) +
+            f"\n## candidates\n{'|'.join(CANDIDATE_COLUMNS)}\n" + "\n".join(candidate_rows)
+        )
+
+    def token_report(self, shortlist: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Token cost of the shortlist as JSON (previous format) vs compact tables"""
+        postings = len({job_posting["id"] for candidate in shortlist for job_posting in candidate["job_postings"]})
+        json_tokens = self.tokens.count(json.dumps(shortlist, default=str, ensure_ascii=False))
+        compact_tokens = self.tokens.count(self.serialize(shortlist))
+        return {
+            "postings": postings,
+            "json_tokens": json_tokens,
+            "compact_tokens": compact_tokens,
+            "json_tokens_per_posting": json_tokens / postings if postings else 0.0,
+            "compact_tokens_per_posting": compact_tokens / postings if postings else 0.0,
+            "reduction": 1 - compact_tokens / json_tokens if json_tokens else 0.0,
+            "exact": self.tokens.encoding is not None,
+        }
+
+
+if __name__ == '__main__':
+    # Token report for the pending shortlist
+    from agents.candidate_matcher.shortlist import build_match_shortlist
+
+    shortlist = build_match_shortlist()
+    serializer = CompactPromptSerializer()
+    report = serializer.token_report(shortlist)
+    print(serializer.serialize(shortlist[:2]))
+    print()
+    print(f"{report['postings']} postings ({'tokenizer' if report['exact'] else 'estimated'} counts)")
+    print(f"JSON:    {report['json_tokens']:8} tokens, {report['json_tokens_per_posting']:.1f} per posting")
+    print(f"Compact: {report['compact_tokens']:8} tokens, {report['compact_tokens_per_posting']:.1f} per posting")
+    print(f"Reduction: {report['reduction']:.0%}")
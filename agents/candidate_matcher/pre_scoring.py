@@ -0,0 +1,224 @@
+"""
+Deterministic pre-scoring of candidate × job posting pairs.
+
+Computes tech stack overlap, role compatibility and location compatibility for every pair
+at once as NumPy matrices, so only the most plausible postings per candidate are handed
+to the LLM matcher for final scoring. The role synonyms and scoring weights mirror the
+matcher prompt.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from common.normalization.locations import COUNTRIES, REGIONS, resolve_location
+from common.normalization.patterns import keyword_pattern
+from common.normalization.tech_stack import TECHNOLOGIES, ecosystem_ancestors, extract_technologies, job_posting_technologies
+
+# Same weights the matcher prompt uses for its final score
+TECH_WEIGHT = 0.35
+ROLE_WEIGHT = 0.25
+LOCATION_WEIGHT = 0.25
+COMPANY_WEIGHT = 0.15
+
+# Score used when one side of a feature is unknown, so missing data neither helps nor sinks a pair
+NEUTRAL_SCORE = 0.5
+
+# Role families, seeded from the matcher prompt synonyms
+ROLE_SYNONYMS = {
+    "backend": ["backend", "back-end", "back end", "server developer", "server-side", "api developer"],
+    "frontend": ["frontend", "front-end", "front end", "ui developer", "ui engineer"],
+    "fullstack": ["fullstack", "full stack", "full-stack", "generalist"],
+    "devops": ["devops", "dev-ops", "infrastructure engineer", "site reliability", "sre", "platform engineer", "cloud engineer"],
+    "data": ["data scientist", "data engineer", "data analyst", "ml engineer", "ai engineer", "machine learning", "data"],
+    "mobile": ["mobile", "ios", "android", "react native", "flutter"],
+}
+
+# Partial compatibility between different role families (symmetric)
+ROLE_AFFINITY = {
+    ("fullstack", "backend"): 0.7,
+    ("fullstack", "frontend"): 0.7,
+    ("backend", "devops"): 0.4,
+    ("backend", "data"): 0.3,
+    ("frontend", "mobile"): 0.4,
+}
+
+# Weight of a technology that is only implied through its ecosystem (e.g. Django implies Python)
+IMPLIED_TECH_WEIGHT = 0.5
+
+# Location score when both sides are in the same region but not the same country
+SAME_REGION_SCORE = 0.8
+# Location score of a remote posting restricted to regions the candidate isn't in
+REMOTE_OTHER_REGION_SCORE = 0.3
+
+_ROLE_PATTERNS = {family: keyword_pattern(synonyms) for family, synonyms in ROLE_SYNONYMS.items()}
+
+ROLE_FAMILIES = list(ROLE_SYNONYMS)
+COUNTRY_CODES = list(COUNTRIES)
+_TECH_INDEX = {tech: i for i, tech in enumerate(TECHNOLOGIES)}
+_COUNTRY_INDEX = {code: i for i, code in enumerate(COUNTRY_CODES)}
+_REGION_INDEX = {region: i for i, region in enumerate(REGIONS)}
+
+
+def _get(item: Any, key: str) -> Optional[str]:
+    """Read a field from a dict or a row/model"""
+    if isinstance(item, dict):
+        return item.get(key)
+    return getattr(item, key, None)
+
+
+def _tech_vector(technologies: set) -> np.ndarray:
+    """Weighted vector of direct technologies (1.0) and the ecosystems they imply"""
+    vector = np.zeros(len(TECHNOLOGIES), dtype=np.float32)
+    for tech in technologies:
+        vector[_TECH_INDEX[tech]] = 1.0
+        for parent in ecosystem_ancestors(tech):
+            index = _TECH_INDEX[parent]
+            vector[index] = max(vector[index], IMPLIED_TECH_WEIGHT)
+    return vector
+
+
+def _location_features(locations: List[Optional[str]]) -> Dict[str, np.ndarray]:
+    """Country and region one-hot matrices plus the remote flag of each location text"""
+    countries = np.zeros((len(locations), len(COUNTRY_CODES)), dtype=np.float32)
+    regions = np.zeros((len(locations), len(REGIONS)), dtype=np.float32)
+    remote = np.zeros(len(locations), dtype=bool)
+    for row, location in enumerate(locations):
+        resolved = resolve_location(location)
+        countries[row, [_COUNTRY_INDEX[code] for code in resolved.countries]] = 1.0
+        regions[row, [_REGION_INDEX[region] for region in resolved.regions]] = 1.0
+        remote[row] = resolved.remote
+    return {"country": countries, "region": regions, "remote": remote}
+
+
+def _one_hot(text: Optional[str], patterns: Dict[str, re.Pattern], labels: List[str]) -> np.ndarray:
+    vector = np.zeros(len(labels), dtype=np.float32)
+    if text:
+        for i, label in enumerate(labels):
+            if patterns[label].search(text):
+                vector[i] = 1.0
+    return vector
+
+
+def _role_affinity_matrix() -> np.ndarray:
+    matrix = np.eye(len(ROLE_FAMILIES), dtype=np.float32)
+    for (a, b), affinity in ROLE_AFFINITY.items():
+        i, j = ROLE_FAMILIES.index(a), ROLE_FAMILIES.index(b)
+        matrix[i, j] = matrix[j, i] = affinity
+    return matrix
+
+
+_ROLE_AFFINITY_MATRIX = _role_affinity_matrix()
+
+
+class PreScoringEngine:
+    """Vectorized candidate × job posting plausibility scores in [0, 1]"""
+
+    def __init__(self, job_technologies: Optional[Dict[int, Set[str]]] = None):
+        # Canonical technologies per job posting id from the technology index, parsed from text when missing
+        self.job_technologies = job_technologies
+
+    def _job_technologies(self, job_posting: Any) -> Set[str]:
+        if self.job_technologies is not None:
+            return self.job_technologies.get(_get(job_posting, "id"), set())
+        return job_posting_technologies(_get(job_posting, "job_title"), _get(job_posting, "quick_description"), _get(job_posting, "tech_stack"))
+
+    def candidate_features(self, candidates: List[Any]) -> Dict[str, np.ndarray]:
+        return {
+            "tech": np.array([_tech_vector(extract_technologies(_get(c, "tech_stack"))) for c in candidates], dtype=np.float32).reshape(len(candidates), len(TECHNOLOGIES)),
+            "role": np.array([_one_hot(_get(c, "role"), _ROLE_PATTERNS, ROLE_FAMILIES) for c in candidates], dtype=np.float32).reshape(len(candidates), len(ROLE_FAMILIES)),
+            **_location_features([_get(c, "location") for c in candidates]),
+        }
+
+    def job_features(self, job_postings: List[Any]) -> Dict[str, np.ndarray]:
+        texts = [" ".join(filter(None, [_get(j, "job_title"), _get(j, "quick_description")])) for j in job_postings]
+        return {
+            "tech": np.array([_tech_vector(self._job_technologies(j)) for j in job_postings], dtype=np.float32).reshape(len(job_postings), len(TECHNOLOGIES)),
+            "role": np.array([_one_hot(_get(j, "job_title"), _ROLE_PATTERNS, ROLE_FAMILIES) for j in job_postings], dtype=np.float32).reshape(len(job_postings), len(ROLE_FAMILIES)),
+            **_location_features(texts),
+        }
+
+    def score(self, candidates: List[Any], job_postings: List[Any]) -> np.ndarray:
+        """Return an (n_candidates, n_job_postings) matrix of weighted pre-scores"""
+        if not candidates or not job_postings:
+            return np.zeros((len(candidates), len(job_postings)), dtype=np.float32)
+
+        c = self.candidate_features(candidates)
+        j = self.job_features(job_postings)
+
+        # Tech: weighted overlap normalized by the candidate's direct stack size
+        candidate_direct = (c["tech"] == 1.0).sum(axis=1, keepdims=True)
+        tech = np.clip((c["tech"] @ j["tech"].T) / np.maximum(candidate_direct, 1), 0.0, 1.0)
+        tech_unknown = (candidate_direct == 0) | (j["tech"].sum(axis=1) == 0)[None, :]
+        tech = np.where(tech_unknown, NEUTRAL_SCORE, tech)
+
+        # Role: best affinity between the candidate's and the posting's role families
+        role = (c["role"][:, :, None] * _ROLE_AFFINITY_MATRIX[None, :, :]).max(axis=1) @ (j["role"].T > 0)
+        role = np.clip(role, 0.0, 1.0)
+        role_unknown = (c["role"].sum(axis=1) == 0)[:, None] | (j["role"].sum(axis=1) == 0)[None, :]
+        role = np.where(role_unknown, NEUTRAL_SCORE, role)
+
+        # Location: same country, then same region. Remote postings fit everyone unless restricted to other regions
+        same_country = np.clip(c["country"] @ j["country"].T, 0.0, 1.0)
+        same_region = np.clip(c["region"] @ j["region"].T, 0.0, 1.0)
+        location = np.maximum(same_country, SAME_REGION_SCORE * same_region)
+        candidate_unknown = (c["region"].sum(axis=1) == 0)[:, None]
+        job_unknown = (j["region"].sum(axis=1) == 0)[None, :]
+        location = np.where(candidate_unknown | job_unknown, NEUTRAL_SCORE, location)
+        remote_fit = np.where(job_unknown | candidate_unknown | (same_region > 0), 1.0, REMOTE_OTHER_REGION_SCORE)
+        location = np.where(j["remote"][None, :], remote_fit, location)
+
+        return (
+            TECH_WEIGHT * tech
+            + ROLE_WEIGHT * role
+            + LOCATION_WEIGHT * location
+            + COMPANY_WEIGHT * NEUTRAL_SCORE
+        ).astype(np.float32)
+
+    def shortlist(
+        self,
+        candidates: List[Any],
+        job_postings: List[Any],
+        top_k: int,
+        min_score: float = 0.0
+    ) -> Dict[Any, List[Tuple[Any, float]]]:
+        """
+        Return, per candidate id, up to top_k (job posting id, pre-score) pairs
+        with a pre-score of at least min_score, best first.
+        """
+        scores = self.score(candidates, job_postings)
+        shortlist = {}
+        if scores.size == 0:
+            return {_get(candidate, "id"): [] for candidate in candidates}
+
+        k = min(top_k, scores.shape[1])
+        # argpartition finds each row's top-k in O(n_jobs); only those k get sorted
+        top_indices = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        for row, candidate in enumerate(candidates):
+            ranked = sorted(top_indices[row], key=lambda col: -scores[row, col])
+            shortlist[_get(candidate, "id")] = [
+                (_get(job_postings[col], "id"), round(float(scores[row, col]), 3))
+                for col in ranked
+                if scores[row, col] >= min_score
+            ]
+        return shortlist
+
+
+if __name__ == '__main__':
+    candidates = [
+        {"id": 1, "tech_stack": "NestJS, TypeScript, Node.js, PostgreSQL", "role": "backend", "location": "Buenos Aires, Argentina"},
+        {"id": 2, "tech_stack": "React, Next.js, Tailwind CSS", "role": "frontend", "location": "Madrid, Spain"},
+        {"id": 3, "tech_stack": "Python, Pandas, Scikit-learn", "role": "data scientist", "location": "Toronto, Canada"},
+    ]
+    job_postings = [
+        {"id": 10, "job_title": "Senior Backend Engineer (Node.js)", "tech_stack": "node, typescript, aws", "quick_description": "Remote LATAM"},
+        {"id": 11, "job_title": "Frontend Developer", "tech_stack": "React, TypeScript", "quick_description": "Hybrid in Berlin, Germany"},
+        {"id": 12, "job_title": "Machine Learning Engineer", "tech_stack": "Python, PyTorch", "quick_description": "On-site in New York"},
+        {"id": 13, "job_title": "Java Backend Developer", "tech_stack": "Java, Spring Boot", "quick_description": "On-site in San Francisco, USA"},
+    ]
+
+    engine = PreScoringEngine()
+    print(np.round(engine.score(candidates, job_postings), 2))
+    for candidate_id, pairs in engine.shortlist(candidates, job_postings, top_k=2).items():
+        print(f"Candidate {candidate_id}: {pairs}")
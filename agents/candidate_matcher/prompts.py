@@ -1,16 +1,10 @@
 from langchain_core.messages.system import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
-prompt = ChatPromptTemplate.from_messages([
-    SystemMessage(
-        content="""
-        You are an expert recruiter that intelligently matches candidates to job postings. You understand the nuances of tech roles, skills, and location preferences.
-
-        You'll have to use get_all_job_postings tool to retrieve available job postings from the database.
-        Also, you have to use get_candidates tool to obtain the list of candidates in the system.
-
-        Each candidate has: Location, Role, Tech Stack.
+# Bump when the scoring rules change, so cached LLM scores from the old rules are not reused
+MATCHING_PROMPT_VERSION = "2"
 
+MATCHING_GUIDELINES = """
         INTELLIGENT MATCHING GUIDELINES:
 
         1. ROLE MATCHING - Be smart about role variations:
@@ -41,33 +35,77 @@ prompt = ChatPromptTemplate.from_messages([
            - Company/Industry Match: 15% (startup vs enterprise, industry alignment)
 
         5. MINIMUM SCORE: Only create matches with 60% or higher score.
+"""
 
+WORK_ITEMS_FORMAT = """
+        INPUT FORMAT - pipe-separated tables, header row first, "-" means unknown:
+        - job_postings: id|title|company|company_type|industry|stage|tech|description
+          Each job posting is listed once. Descriptions are truncated, "same as <id>" reuses another posting's description.
+        - candidates: id|role|location|tech|pairs
+          pairs lists the candidate's job postings to score as job_posting_id:pre_score:similarity, best first.
+          pre_score (keyword-based) and similarity (text-based) are rough estimates between 0 and 1.
+"""
+
+MATCHING_PROCESS = """
         MATCHING PROCESS:
-        1. Analyze each candidate-job combination holistically
+        1. Analyze each shortlisted candidate-job combination holistically
         2. Consider the candidate's background and the job's requirements
         3. Think about whether this would be a good career move for the candidate
         4. Calculate a realistic score based on all factors
         5. Only include matches that make sense for both parties
+"""
+
+prompt = ChatPromptTemplate.from_messages([
+    SystemMessage(
+        content=f"""
+        You are an expert recruiter that intelligently matches candidates to job postings. You understand the nuances of tech roles, skills, and location preferences.
 
+        You'll have to use get_match_shortlist tool to retrieve the candidates in the system. Each candidate comes
+        with the job postings that were pre-selected for them, best first, each with a pre_score between 0 and 1.
+
+        Each candidate has: Location, Role, Tech Stack.
+
+        Only evaluate the candidate-job pairs returned by get_match_shortlist. Pairs that are not in the shortlist
+        were either matched in a previous run or discarded as incompatible. If it returns no candidates there is
+        nothing to match. The pre_score and similarity are hints, make your own judgement.
+{WORK_ITEMS_FORMAT}{MATCHING_GUIDELINES}{MATCHING_PROCESS}
         For each candidate, evaluate matches and return JSON with this format:
         ```
-        {
+        {{
             "candidate_id": int,
             "job_posting_id": int,
             "match_score": float, // MUST be 60% or higher
             "strengths": string,   // What makes this a good match
             "weaknesses": string   // What could be challenging
-        }
+        }}
         ```
 
         IMPORTANT: Only include matches with match_score >= 60.0. Be selective but not overly strict.
 
         Finally, invoke save_job_matches with this format:
-        {
+        {{
           "job_matches": [ ... ]
-        }
+        }}
         """
     ),
     MessagesPlaceholder("agent_scratchpad"),
     # MessagesPlaceholder("input")
 ])
+
+
+# Direct scoring prompt used by BatchMatchScorer, one call per chunk of candidates and their shortlisted postings
+scoring_prompt = ChatPromptTemplate.from_messages([
+    SystemMessage(
+        content=f"""
+        You are an expert recruiter that intelligently matches candidates to job postings. You understand the nuances of tech roles, skills, and location preferences.
+
+        You'll receive candidates, each with the job postings that were pre-selected for them. The pre_score and
+        similarity are hints, make your own judgement.
+{WORK_ITEMS_FORMAT}{MATCHING_GUIDELINES}{MATCHING_PROCESS}
+        Score only the candidate-job pairs listed in the pairs column, using the candidate id as candidate_id and the
+        job posting id as job_posting_id.
+        Only return matches with match_score >= 60.0 (0-100 scale). Be selective but not overly strict.
+        """
+    ),
+    ("human", "{work_items}"),
+])
@@ -0,0 +1,74 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from agents.candidate_matcher.pre_scoring import PreScoringEngine
+from common.config.config import MATCHER_TOP_K, MATCHER_MIN_PRE_SCORE
+from common.database.database import unit_of_work
+from common.database.models.job_posting import JobPosting
+from common.database.repositories.job_posting import JobPostingsRepository
+from common.normalization.locations import resolve_location
+from services.job_posting_index import get_job_posting_index
+from services.match_state import MatchDelta, MatchStateService
+
+
+def build_match_shortlist(delta: Optional[MatchDelta] = None) -> List[Dict[str, Any]]:
+    """
+    Candidates with the job postings worth sending to the LLM for each of them.
+
+    Only the pending delta is considered (see MatchStateService). Postings are picked by
+    keyword pre-scoring plus the text index, and carry their pre_score and similarity.
+    """
+    delta = delta or MatchStateService().get_delta()
+    with unit_of_work():
+        job_technologies = JobPostingsRepository().get_technologies_by_job_posting()
+    engine = PreScoringEngine(job_technologies=job_technologies)
+
+    # Changed candidates against the whole active catalog, everyone else only against the changed postings
+    shortlist = engine.shortlist(delta.changed_candidates, delta.job_postings, top_k=MATCHER_TOP_K, min_score=MATCHER_MIN_PRE_SCORE)
+    shortlist.update(engine.shortlist(delta.unchanged_candidates, delta.changed_job_postings, top_k=MATCHER_TOP_K, min_score=MATCHER_MIN_PRE_SCORE))
+    job_postings_by_id = {job_posting["id"]: job_posting for job_posting in delta.job_postings}
+
+    # Add the postings the text index ranks highest that keyword pre-scoring missed
+    index = get_job_posting_index()
+    active_job_posting_ids = np.fromiter(job_postings_by_id, dtype=np.int64)
+    changed_job_posting_ids = np.fromiter(delta.changed_job_posting_hashes, dtype=np.int64)
+    if len(changed_job_posting_ids):
+        index.index_from_database(JobPosting.id.in_(changed_job_posting_ids.tolist()))
+    similarities = {}
+    for candidate in delta.candidates:
+        allowed_ids = active_job_posting_ids if candidate["id"] in delta.changed_candidate_hashes else changed_job_posting_ids
+        similarities[candidate["id"]] = dict(index.search_for_candidate(candidate, top_n=MATCHER_TOP_K, job_posting_ids=allowed_ids))
+        shortlisted_ids = {job_posting_id for job_posting_id, _ in shortlist.get(candidate["id"], [])}
+        shortlist.setdefault(candidate["id"], []).extend(
+            (job_posting_id, None) for job_posting_id in similarities[candidate["id"]] if job_posting_id not in shortlisted_ids
+        )
+
+    result = [
+        {
+            "id": candidate["id"],
+            "tech_stack": candidate["tech_stack"],
+            "location": candidate["location"],
+            "country": resolve_location(candidate["location"]).country,
+            "region": resolve_location(candidate["location"]).region,
+            "role": candidate["role"],
+            "job_postings": [
+                {
+                    **job_postings_by_id[job_posting_id],
+                    "pre_score": pre_score,
+                    "similarity": similarities[candidate["id"]].get(job_posting_id, 0.0),
+                }
+                for job_posting_id, pre_score in shortlist[candidate["id"]]
+            ],
+        }
+        for candidate in delta.candidates
+        if shortlist.get(candidate["id"])
+    ]
+
+    pairs = sum(len(candidate["job_postings"]) for candidate in result)
+    logging.info(
+        f"[MatchShortlist] {pairs} of {delta.pair_count} pending candidate-job pairs shortlisted "
+        f"for {len(result)} candidates"
+    )
+    return result
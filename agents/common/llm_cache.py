@@ -0,0 +1,167 @@
+"""
+Persistent, content-addressed LLM response cache.
+
+Plugs into LangChain's cache hook (`ChatOpenAI(cache=...)`), so agents and direct pipelines
+get it without changes to how they call the model. Entries are keyed by a namespace (agent name
+and prompt template version), the model settings LangChain reports (model, temperature, bound
+tools, response format) and a hash of the whitespace-normalized input messages. A re-run after a
+crash, or re-scoring an unchanged pair, is answered from the database instead of the API.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+from pydantic import BaseModel
+
+from common.config.config import LLM_CACHE_ENABLED, LLM_CACHE_TTL_HOURS
+from common.database.database import db_session
+from common.database.repositories.llm_cache import LLMCacheRepository
+from services.run_ledger import record_cache_lookup
+
+
+class LLMCacheMetrics:
+    """Thread-safe per-namespace hit/miss counters for this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "writes": 0, "errors": 0})
+
+    def incr(self, namespace: str, counter: str):
+        with self._lock:
+            self._counters[namespace][counter] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            stats = {}
+            for namespace, counters in self._counters.items():
+                lookups = counters["hits"] + counters["misses"]
+                stats[namespace] = {**counters, "hit_rate": counters["hits"] / lookups if lookups else 0.0}
+            return stats
+
+
+metrics = LLMCacheMetrics()
+
+
+def _normalize_value(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, list):
+        return [_normalize_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize_value(item) for key, item in value.items()}
+    return value
+
+
+def _normalize(text: str) -> str:
+    """
+    LangChain passes the input messages as serialized JSON. Whitespace differences inside them
+    (prompt indentation, trailing newlines) and key order don't change the answer
+    """
+    try:
+        return json.dumps(_normalize_value(json.loads(text)), sort_keys=True, ensure_ascii=False)
+    except ValueError:
+        return " ".join(text.split())
+
+
+def _serializable(generation):
+    """Structured output puts the parsed pydantic object in the message, store it as a dict instead"""
+    if isinstance(generation, ChatGeneration):
+        parsed = generation.message.additional_kwargs.get("parsed")
+        if isinstance(parsed, BaseModel):
+            message = generation.message.model_copy(
+                update={"additional_kwargs": {**generation.message.additional_kwargs, "parsed": parsed.model_dump()}}
+            )
+            return generation.model_copy(update={"message": message})
+    return generation
+
+
+class LLMCache(BaseCache):
+    def __init__(self, namespace: str, ttl_hours: int = LLM_CACHE_TTL_HOURS):
+        self.namespace = namespace
+        self.ttl = timedelta(hours=ttl_hours) if ttl_hours > 0 else None
+
+    def _key(self, prompt: str, llm_string: str) -> str:
+        digest = hashlib.sha256()
+        for part in (self.namespace, llm_string, _normalize(prompt)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        # Cache failures must never fail the LLM call, they just count as a miss
+        try:
+            with db_session() as session, session.begin():
+                response = LLMCacheRepository(session).get_response(self._key(prompt, llm_string), datetime.now())
+            if response is None:
+                metrics.incr(self.namespace, "misses")
+                record_cache_lookup(f"llm:{self.namespace}", False)
+                return None
+            generations = loads(response)
+        except Exception as e:
+            metrics.incr(self.namespace, "errors")
+            logging.warning(f"[LLMCache] Lookup failed in {self.namespace}: {e}")
+            return None
+
+        metrics.incr(self.namespace, "hits")
+        record_cache_lookup(f"llm:{self.namespace}", True)
+        # A cached answer costs nothing, without its original usage the run ledger doesn't count its tokens
+        for generation in generations:
+            if isinstance(generation, ChatGeneration) and isinstance(generation.message, AIMessage):
+                generation.message.usage_metadata = None
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        try:
+            now = datetime.now()
+            response = dumps([_serializable(generation) for generation in return_val])
+            with db_session() as session, session.begin():
+                LLMCacheRepository(session).put_response(
+                    self._key(prompt, llm_string), self.namespace, response, now, now + self.ttl if self.ttl else None
+                )
+            metrics.incr(self.namespace, "writes")
+        except Exception as e:
+            metrics.incr(self.namespace, "errors")
+            logging.warning(f"[LLMCache] Update failed in {self.namespace}: {e}")
+
+    def clear(self, **kwargs: Any) -> None:
+        with db_session() as session, session.begin():
+            LLMCacheRepository(session).clear(self.namespace)
+
+
+def get_llm_cache(namespace: str) -> Optional[LLMCache]:
+    """Cache to pass as ChatOpenAI(cache=...), None (no caching) when LLM_CACHE_ENABLED is off"""
+    return LLMCache(namespace) if LLM_CACHE_ENABLED else None
+
+
+def purge_expired_llm_cache() -> int:
+    with db_session() as session, session.begin():
+        return LLMCacheRepository(session).purge_expired(datetime.now())
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="LLM cache usage per namespace")
+    parser.add_argument("--purge-expired", action="store_true", help="Delete expired entries")
+    parser.add_argument("--clear", metavar="NAMESPACE", help="Delete every entry of a namespace")
+    args = parser.parse_args()
+
+    if args.purge_expired:
+        print(f"Purged {purge_expired_llm_cache()} expired entries")
+    if args.clear:
+        LLMCache(args.clear).clear()
+        print(f"Cleared {args.clear}")
+
+    with db_session() as session:
+        stats = LLMCacheRepository(session).get_stats_by_namespace(datetime.now())
+    for namespace, row in stats.items():
+        print(f"{namespace:40} entries={row['entries']:6} live={row['live']:6} hits={row['hits']:8}")
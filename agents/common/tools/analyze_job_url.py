@@ -6,6 +6,9 @@ import re
 import logging
 from urllib.parse import urlparse, parse_qs
 
+from services.run_ledger import record_count
+from .extract_jobs_from_listing import url_labels
+from .job_discovery_monitor import monitor_operation
 from .job_discovery_cache import get_cached_url_analysis, cache_url_analysis
 
 class AnalyzeUrlInput(BaseModel):
@@ -212,6 +215,7 @@ def analyze_page_content(page: Page, url: str) -> Dict[str, Any]:
         }
 
 @tool("analyze_job_url", args_schema=AnalyzeUrlInput)
+@monitor_operation("analyze_job_url", labels=url_labels)
 def analyze_job_url(url: str) -> Dict[str, Any]:
     """
     Analyze a URL to determine if it's a direct job posting, job listing page, company careers page, or not relevant.
@@ -246,6 +250,7 @@ def analyze_job_url(url: str) -> Dict[str, Any]:
                 # Set user agent and timeout
                 page.set_extra_http_headers({"User-Agent": "Mozilla/5.0 (compatible; JobBot/1.0)"})
                 page.goto(url, wait_until="domcontentloaded", timeout=15000)
+                record_count("pages_fetched")
                 
                 content_result = analyze_page_content(page, url)
                 
@@ -3,11 +3,12 @@ from pydantic import BaseModel, Field
 from typing import Dict, List, Any, Optional
 import logging
 import asyncio
+import contextvars
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
 from .analyze_job_url import analyze_job_url
-from .extract_jobs_from_listing import extract_jobs_from_listing
+from .extract_jobs_from_listing import extract_jobs_from_listing, url_labels
 from .validate_job_posting import validate_job_posting
 from .job_discovery_monitor import monitor_operation, job_monitor, PLAYWRIGHT_RATE_LIMITER
 from .job_discovery_cache import (
@@ -33,7 +34,7 @@ class BatchProcessResult(BaseModel):
     processing_time: float
     results: List[Dict[str, Any]]
 
-@monitor_operation("process_single_url")
+@monitor_operation("process_single_url", labels=url_labels)
 def process_single_url(url: str, max_jobs_per_listing: int = 30, validate: bool = True) -> Dict[str, Any]:
     """Process a single URL through the complete pipeline"""
     result = {
@@ -252,9 +253,9 @@ def batch_process_urls(
     try:
         # Process URLs concurrently with thread pool
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all jobs
+            # Submit all jobs, each in a copy of this context so its pages count towards the caller's run
             future_to_url = {
-                executor.submit(process_single_url, url, max_jobs_per_listing, validate_jobs): url 
+                executor.submit(contextvars.copy_context().run, process_single_url, url, max_jobs_per_listing, validate_jobs): url 
                 for url in urls
             }
             
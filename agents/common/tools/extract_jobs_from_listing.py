@@ -7,6 +7,9 @@ import logging
 from urllib.parse import urljoin, urlparse
 import time
 
+from services.run_ledger import record_count
+from .job_discovery_monitor import monitor_operation
+
 class ExtractJobsInput(BaseModel):
     url: str = Field(description="The job listing page URL to extract jobs from")
     max_jobs: int = Field(description="Maximum number of jobs to extract", default=50)
@@ -98,6 +101,11 @@ def detect_platform(url: str) -> str:
     else:
         return "generic"
 
+def url_labels(url: str = "", *args, **kwargs) -> Dict[str, str]:
+    """Monitor labels of an operation on a URL, whether it's called as a tool or directly"""
+    host = urlparse(url).netloc.lower().removeprefix("www.")
+    return {"platform": detect_platform(url), "host": host or "unknown"}
+
 def extract_job_links_from_page(page: Page, platform: str, base_url: str) -> List[Dict[str, Any]]:
     """Extract job links and metadata from a single page"""
     selectors = PLATFORM_SELECTORS.get(platform, PLATFORM_SELECTORS["generic"])
@@ -220,6 +228,7 @@ def handle_pagination(page: Page, platform: str, max_pages: int) -> List[str]:
     return page_urls
 
 @tool("extract_jobs_from_listing", args_schema=ExtractJobsInput)
+@monitor_operation("extract_jobs_from_listing", labels=url_labels)
 def extract_jobs_from_listing(url: str, max_jobs: int = 50, max_pages: int = 3) -> List[Dict[str, Any]]:
     """
     Extract individual job URLs and metadata from a job listing page.
@@ -243,6 +252,7 @@ def extract_jobs_from_listing(url: str, max_jobs: int = 50, max_pages: int = 3)
             try:
                 # Navigate to listing page
                 page.goto(url, wait_until="networkidle", timeout=30000)
+                record_count("pages_fetched")
                 
                 # Handle cookie banners and overlays
                 try:
@@ -283,6 +293,7 @@ def extract_jobs_from_listing(url: str, max_jobs: int = 50, max_pages: int = 3)
                         try:
                             logging.info(f"Processing additional page: {page_url}")
                             page.goto(page_url, wait_until="networkidle", timeout=20000)
+                            record_count("pages_fetched")
                             
                             page_jobs = extract_job_links_from_page(page, platform, base_url)
                             all_jobs.extend(page_jobs)
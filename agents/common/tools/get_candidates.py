@@ -1,6 +1,19 @@
 from langchain_core.tools import tool
 
+from common.database.database import unit_of_work
 from common.database.repositories.candidates import CandidatesRepository
+from common.normalization.locations import resolve_location, search_locale
+
+
+def _resolved_location(location):
+    resolved = resolve_location(location)
+    search_country, search_language = search_locale(location)
+    return {
+        "country": resolved.country,
+        "region": resolved.region,
+        "search_country": search_country,
+        "search_language": search_language,
+    }
 
 
 @tool('get_candidates')
@@ -8,22 +21,25 @@ def get_candidates():
     """
     Return a list of candidates of the DB that includes:
         * Tech stack as a comma separated string of techs
-        * location that can be a country or a region, but in the first case it must prioritize regions, for example,
-        if country is anything in latin america, it should opt for matching the whole latam region instead of just the country
+        * location that can be a country or a region, already resolved into:
+            * country: ISO country code (null if only a region is known)
+            * region: LATAM, NA, EU or APAC, prioritize regions when grouping, for example if country is anything
+            in latin america, it should opt for matching the whole latam region instead of just the country
+            * search_country and search_language: the serpapi_google_search country and language codes to use
         * role that can be anything like backend engineer, frontend, data, manager, VP, etc
     """
-    candidates_repo = CandidatesRepository()
-    candidates = candidates_repo.get_candidates()
-    return [
-        {
-            "id": r.id,
-            "telegram_chat_id": r.telegram_chat_id,
-            "tech_stack": r.tech_stack,
-            "location": r.location,
-            "role": r.role,
-            "created_at": r.created_at.isoformat() if r.created_at else None,
-            "updated_at": r.updated_at.isoformat() if r.updated_at else None,
-            "deleted_at": r.deleted_at.isoformat() if r.deleted_at else None,
-        }
-        for r in candidates
-    ]
\ No newline at end of file
+    with unit_of_work():
+        return [
+            {
+                "id": r.id,
+                "telegram_chat_id": r.telegram_chat_id,
+                "tech_stack": r.tech_stack,
+                "location": r.location,
+                **_resolved_location(r.location),
+                "role": r.role,
+                "created_at": r.created_at.isoformat() if r.created_at else None,
+                "updated_at": r.updated_at.isoformat() if r.updated_at else None,
+                "deleted_at": r.deleted_at.isoformat() if r.deleted_at else None,
+            }
+            for r in CandidatesRepository().stream_candidates()
+        ]
\ No newline at end of file
@@ -0,0 +1,18 @@
+from langchain_core.tools import tool
+
+from agents.candidate_matcher.compact_format import CompactPromptSerializer
+from agents.candidate_matcher.shortlist import build_match_shortlist
+
+
+@tool('get_match_shortlist')
+def get_match_shortlist():
+    """
+    Returns the candidates that have job postings worth evaluating, each with those job postings.
+    Only pairs that weren't matched before are included: new or changed job postings for every
+    candidate, and every active job posting for candidates whose profile changed.
+    Postings are pre-selected locally by tech stack overlap, role and location compatibility,
+    best first. The result is two pipe-separated tables: job_postings, and candidates whose pairs
+    column lists job_posting_id:pre_score:similarity (0-1 each, "-" when unknown) per posting.
+    Only these candidate-job pairs need to be scored.
+    """
+    return CompactPromptSerializer().serialize(build_match_shortlist())
@@ -11,6 +11,8 @@ from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 from threading import Lock
 
+from services.run_ledger import record_cache_lookup
+
 @dataclass
 class CacheEntry:
     data: Any
@@ -48,12 +50,15 @@ class JobDiscoveryCache:
                 if time.time() - entry.timestamp > entry.ttl:
                     del self._cache[cache_key]
                     self.miss_count += 1
+                    record_cache_lookup(prefix, False)
                     return None
                 
                 self.hit_count += 1
+                record_cache_lookup(prefix, True)
                 return entry.data
             
             self.miss_count += 1
+            record_cache_lookup(prefix, False)
             return None
     
     def set(self, prefix: str, key_data: Any, value: Any, ttl: int = 3600):
@@ -1,8 +1,14 @@
+import logging
+
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 from typing import Optional, List
 
+from common.database.database import unit_of_work
+from common.database.models.job_posting import JobPosting
 from common.database.repositories.job_posting import JobPostingsRepository
+from services.job_posting_events import job_posting_events
+from services.job_posting_index import index_job_postings
 
 class SaveJobPostingsInput(BaseModel):
     job_postings: Optional[List[dict]] = Field(description="The list of job postings dicts to upsert into the DB", default=[])
@@ -21,8 +27,14 @@ def save_job_postings(*, job_postings: Optional[List[dict]] = []):
         return "No job postings to save."
     
     try:
-        job_postings_repo = JobPostingsRepository()
-        job_postings_repo.save_job_postings(job_postings)
-        return f"Successfully upserted {len(job_postings)} job postings"
+        with unit_of_work():
+            JobPostingsRepository().save_job_postings(job_postings)
     except Exception as e:
         return f"Error upserting job postings: {str(e)}"
+
+    try:
+        index_job_postings(JobPosting.job_link.in_([job['job_link'] for job in job_postings]))
+    except Exception as e:
+        logging.error(f"Error indexing saved job postings: {e}")
+    job_posting_events.publish_saved([job['job_link'] for job in job_postings])
+    return f"Successfully upserted {len(job_postings)} job postings"
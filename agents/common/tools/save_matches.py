@@ -2,6 +2,7 @@ from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 from typing import Optional, List
 
+from common.database.database import unit_of_work
 from common.database.repositories.matches import MatchesRepository
 
 class SaveJobMatchesInput(BaseModel):
@@ -39,8 +40,8 @@ def save_job_matches(*, job_matches: Optional[List[dict]]):
         return f"No high-quality matches (score >= 60%) to save. Filtered out {filtered_out_count} low-quality matches."
     
     try:
-        matches_repo = MatchesRepository()
-        matches_repo.save_matches(high_quality_matches)
+        with unit_of_work():
+            MatchesRepository().save_matches(high_quality_matches)
         return f"Successfully upserted {len(high_quality_matches)} high-quality job matches (filtered out {filtered_out_count} low-quality matches)"
     except Exception as e:
         return f"Error upserting job matches: {str(e)}"
\ No newline at end of file
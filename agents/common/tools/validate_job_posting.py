@@ -6,6 +6,10 @@ import re
 import logging
 from urllib.parse import urlparse
 
+from services.run_ledger import record_count
+from .extract_jobs_from_listing import url_labels
+from .job_discovery_monitor import monitor_operation
+
 class ValidateJobInput(BaseModel):
     url: str = Field(description="The job posting URL to validate")
 
@@ -282,6 +286,7 @@ def validate_job_content(metadata: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 @tool("validate_job_posting", args_schema=ValidateJobInput)
+@monitor_operation("validate_job_posting", labels=url_labels)
 def validate_job_posting(url: str) -> Dict[str, Any]:
     """
     Validate that a URL points to an active, real job posting.
@@ -300,6 +305,7 @@ def validate_job_posting(url: str) -> Dict[str, Any]:
             try:
                 # Navigate to job posting
                 page.goto(url, wait_until="domcontentloaded", timeout=20000)
+                record_count("pages_fetched")
                 
                 # Wait a bit for dynamic content
                 page.wait_for_timeout(2000)
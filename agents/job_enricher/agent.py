@@ -6,8 +6,9 @@ from langchain.agents.agent import AgentExecutor
 
 from pydantic import SecretStr
 
-from agents.job_enricher.prompts import prompt
+from agents.job_enricher.prompts import prompt, JOB_ENRICHER_PROMPT_VERSION
 from agents.common.abstract_agent import Agent
+from agents.common.llm_cache import get_llm_cache
 from agents.common.tools.enrich_job_postings import enrich_job_postings
 from agents.common.tools.get_job_postings import get_job_postings
 from agents.common.tools.json_tools import convert_to_json
@@ -20,7 +21,12 @@ class JobEnricherAgent(Agent):
             enrich_job_postings,
             convert_to_json
         ]
-        llm = ChatOpenAI(model="gpt-4o", temperature=0, api_key=SecretStr(OPENAI_API_KEY))
+        llm = ChatOpenAI(
+            model="gpt-4o",
+            temperature=0,
+            api_key=SecretStr(OPENAI_API_KEY),
+            cache=get_llm_cache(f"job_enricher_agent:v{JOB_ENRICHER_PROMPT_VERSION}"),
+        )
         agent = create_openai_functions_agent(
             tools=tools,
             llm=llm,
@@ -0,0 +1,303 @@
+"""
+Direct job enrichment pipeline.
+
+Enrichment is deterministic (open the posting, check it's still open, scrape its details),
+so the workflow runs it directly instead of asking an LLM agent to call the tools. Postings
+are fetched by a pool of worker threads, each with its own browser. A host scheduler shards
+postings by host so no site gets more than a few parallel visits, spaced by a politeness
+delay, while other hosts keep the remaining workers busy. Results are checkpointed to the
+database in batches, at least every few seconds, so an interrupted run only redoes the
+postings still in flight.
+"""
+
+import contextvars
+import logging
+import queue
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from playwright.sync_api import sync_playwright
+
+from agents.job_enricher.extraction import check_job_availability, extract_job_details
+from common.config.config import (
+    ENRICHMENT_WORKERS,
+    ENRICHMENT_BATCH_SIZE,
+    ENRICHMENT_FLUSH_SECONDS,
+    ENRICHMENT_PAGE_TIMEOUT_MS,
+    ENRICHMENT_WAIT_UNTIL,
+    ENRICHMENT_PER_HOST_CONCURRENCY,
+    ENRICHMENT_HOST_DELAY_SECONDS,
+)
+from common.database.database import unit_of_work
+from common.database.models.job_posting import JobPosting
+from common.database.repositories.job_posting import JobPostingsRepository
+from services.job_posting_index import index_job_postings
+from services.run_ledger import record_count
+
+ENRICHMENT_COLUMNS = (JobPosting.id, JobPosting.job_title, JobPosting.company_name, JobPosting.job_link)
+
+# Put on the results queue by each worker when it stops
+_WORKER_DONE = object()
+
+
+def job_host(url: Optional[str]) -> str:
+    host = urlparse(url or "").hostname or ""
+    return host.removeprefix("www.")
+
+
+class HostScheduler:
+    """
+    Hands job postings to workers round-robin across hosts, with at most per_host_concurrency
+    visits in flight per host and delay_seconds between the start of two visits to the same host.
+    """
+
+    def __init__(self, job_postings: List[Dict[str, Any]], per_host_concurrency: int, delay_seconds: float):
+        self.per_host_concurrency = per_host_concurrency
+        self.delay_seconds = delay_seconds
+        self._queues: Dict[str, deque] = {}
+        for job_posting in job_postings:
+            self._queues.setdefault(job_host(job_posting["job_link"]), deque()).append(job_posting)
+        self._hosts = deque(self._queues)
+        self._active: Dict[str, int] = defaultdict(int)
+        self._next_visit: Dict[str, float] = defaultdict(float)
+        self._condition = threading.Condition()
+
+    @property
+    def host_count(self) -> int:
+        return len(self._queues)
+
+    def next(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Next (host, job posting) to visit, blocking while every pending host is busy or cooling down"""
+        with self._condition:
+            while self._hosts:
+                now = time.monotonic()
+                wait = None
+                for _ in range(len(self._hosts)):
+                    host = self._hosts[0]
+                    self._hosts.rotate(-1)
+                    if self._active[host] >= self.per_host_concurrency:
+                        continue
+                    if self._next_visit[host] > now:
+                        wait = min(wait or float("inf"), self._next_visit[host] - now)
+                        continue
+
+                    job_posting = self._queues[host].popleft()
+                    if not self._queues[host]:
+                        del self._queues[host]
+                        self._hosts.remove(host)
+                    self._active[host] += 1
+                    self._next_visit[host] = now + self.delay_seconds
+                    return host, job_posting
+                # Woken up by done() when a host frees a slot, or when the earliest cooldown ends
+                self._condition.wait(timeout=wait)
+            return None
+
+    def done(self, host: str):
+        with self._condition:
+            self._active[host] -= 1
+            self._condition.notify_all()
+
+    def remaining(self) -> List[Dict[str, Any]]:
+        with self._condition:
+            return [job_posting for host_queue in self._queues.values() for job_posting in host_queue]
+
+
+@dataclass
+class EnrichmentReport:
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    def count(self, status: str) -> int:
+        return sum(1 for result in self.results if result["status"] == status)
+
+    def summary(self) -> str:
+        durations = sorted(result["duration_seconds"] for result in self.results if result["status"] != "skipped")
+        timings = ""
+        if durations:
+            p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+            timings = f", per job p50={statistics.median(durations):.1f}s p95={p95:.1f}s max={durations[-1]:.1f}s"
+        return (
+            f"{len(self.results)} job postings in {self.wall_seconds:.1f}s: {self.count('active')} enriched, "
+            f"{self.count('expired')} expired, {self.count('error')} errors, {self.count('skipped')} skipped{timings}"
+        )
+
+
+class JobEnrichmentPipeline:
+    def __init__(
+        self,
+        workers: int = ENRICHMENT_WORKERS,
+        batch_size: int = ENRICHMENT_BATCH_SIZE,
+        flush_seconds: float = ENRICHMENT_FLUSH_SECONDS,
+        page_timeout_ms: int = ENRICHMENT_PAGE_TIMEOUT_MS,
+        wait_until: str = ENRICHMENT_WAIT_UNTIL,
+        per_host_concurrency: int = ENRICHMENT_PER_HOST_CONCURRENCY,
+        host_delay_seconds: float = ENRICHMENT_HOST_DELAY_SECONDS,
+        on_save: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    ):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.page_timeout_ms = page_timeout_ms
+        self.wait_until = wait_until
+        self.per_host_concurrency = per_host_concurrency
+        self.host_delay_seconds = host_delay_seconds
+        # Called with each batch of results inside the unit of work saving it, e.g. to checkpoint a workflow run
+        self.on_save = on_save
+
+    def run(self, *criteria) -> EnrichmentReport:
+        """Enrich the job postings matching the criteria, by default the ones never enriched"""
+        started = time.perf_counter()
+        with unit_of_work():
+            job_postings = [
+                dict(row._mapping)
+                for row in JobPostingsRepository().stream_job_postings(
+                    *(criteria or (JobPosting.enriched_at.is_(None),)), columns=ENRICHMENT_COLUMNS
+                )
+            ]
+
+        report = EnrichmentReport()
+        if not job_postings:
+            logging.info("[JobEnrichment] No job postings to enrich")
+            return report
+
+        scheduler = HostScheduler(job_postings, self.per_host_concurrency, self.host_delay_seconds)
+        results: queue.Queue = queue.Queue()
+        # More workers than hosts x per-host slots would only wait on the scheduler
+        worker_count = min(self.workers, len(job_postings), scheduler.host_count * self.per_host_concurrency)
+        # Workers run in a copy of this context, so the pages they load count towards the caller's run
+        workers = [
+            threading.Thread(
+                target=contextvars.copy_context().run, args=(self._worker, scheduler, results),
+                name=f"enrichment-worker-{i}", daemon=True,
+            )
+            for i in range(worker_count)
+        ]
+        logging.info(
+            f"[JobEnrichment] Enriching {len(job_postings)} job postings from {scheduler.host_count} hosts "
+            f"with {worker_count} workers"
+        )
+        for worker in workers:
+            worker.start()
+
+        # Collect results as workers produce them and checkpoint them in batches, or after flush_seconds
+        pending, done_workers = [], 0
+        last_flush = time.monotonic()
+        try:
+            while done_workers < len(workers):
+                try:
+                    result = results.get(timeout=self.flush_seconds)
+                except queue.Empty:
+                    result = None
+                if result is _WORKER_DONE:
+                    done_workers += 1
+                elif result is not None:
+                    report.results.append(result)
+                    pending.append(result)
+                if pending and (len(pending) >= self.batch_size or time.monotonic() - last_flush >= self.flush_seconds):
+                    self._save(pending)
+                    pending, last_flush = [], time.monotonic()
+        finally:
+            # Also on interruption, so finished postings aren't visited again by the next run
+            self._save(pending)
+
+        # Postings left behind by workers that couldn't start a browser stay pending for the next run
+        for job_posting in scheduler.remaining():
+            report.results.append(self._result(job_posting, "skipped", 0.0, error="No browser available"))
+
+        # Refresh the search index with the enriched requirements and drop expired postings
+        try:
+            index_job_postings(JobPosting.id.in_([result["id"] for result in report.results if result["status"] != "skipped"]))
+        except Exception as e:
+            logging.error(f"[JobEnrichment] Error indexing enriched job postings: {e}")
+
+        report.wall_seconds = time.perf_counter() - started
+        for status in ("active", "expired", "error", "skipped"):
+            record_count(f"enrichment_{status}", report.count(status))
+        logging.info(f"[JobEnrichment] {report.summary()}")
+        return report
+
+    def _worker(self, scheduler: HostScheduler, results: queue.Queue):
+        # Playwright's sync API is bound to the thread that started it, so each worker has its own browser
+        try:
+            with sync_playwright() as p:
+                browser = p.chromium.launch(headless=True)
+                try:
+                    page = browser.new_page()
+                    while (item := scheduler.next()) is not None:
+                        host, job_posting = item
+                        try:
+                            results.put(self._enrich(page, job_posting))
+                        finally:
+                            scheduler.done(host)
+                finally:
+                    browser.close()
+        except Exception as e:
+            logging.error(f"[JobEnrichment] Worker {threading.current_thread().name} stopped: {e}")
+        finally:
+            results.put(_WORKER_DONE)
+
+    def _enrich(self, page, job_posting: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            page.goto(job_posting["job_link"], wait_until=self.wait_until, timeout=self.page_timeout_ms)
+            record_count("pages_fetched")
+            job_status = check_job_availability(page, job_posting["job_link"])
+            if job_status["status"] == "expired":
+                return self._result(job_posting, "expired", time.perf_counter() - started, reason=job_status["reason"])
+
+            details = extract_job_details(page, job_posting["job_link"])
+            return self._result(job_posting, "active", time.perf_counter() - started, details=details)
+        except Exception as e:
+            return self._result(job_posting, "error", time.perf_counter() - started, error=str(e))
+
+    @staticmethod
+    def _result(job_posting: Dict[str, Any], status: str, duration_seconds: float, **extra) -> Dict[str, Any]:
+        logging.info(f"[JobEnrichment] Job posting {job_posting['id']} {status} in {duration_seconds:.1f}s")
+        return {
+            "id": job_posting["id"],
+            "job_title": job_posting["job_title"],
+            "company_name": job_posting["company_name"],
+            "enriched": status == "active",
+            "status": status,
+            "duration_seconds": round(duration_seconds, 3),
+            **extra,
+        }
+
+    def _save(self, results: List[Dict[str, Any]]):
+        if not results:
+            return
+        now = datetime.now()
+        updates = []
+        for result in results:
+            update = {"id": result["id"], "status": result["status"], "enriched_at": now}
+            if result["status"] == "active":
+                details = result.get("details") or {}
+                update.update(
+                    detailed_description=details.get("description", ""),
+                    requirements=details.get("requirements", ""),
+                    benefits=details.get("benefits", ""),
+                    salary_range=details.get("salary_range", ""),
+                    contact_info=details.get("contact_info", ""),
+                )
+                if details.get("deadline"):
+                    update["application_deadline"] = details["deadline"]
+            updates.append(update)
+
+        try:
+            with unit_of_work():
+                JobPostingsRepository().bulk_update_enrichment(updates)
+                if self.on_save:
+                    self.on_save(results)
+        except Exception as e:
+            logging.error(f"[JobEnrichment] Error saving {len(updates)} enrichment results: {e}")
+
+
+if __name__ == '__main__':
+    report = JobEnrichmentPipeline().run()
+    print(report.summary())
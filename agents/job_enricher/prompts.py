@@ -1,6 +1,9 @@
 from langchain_core.messages.system import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
+# Bump when the prompt changes, so cached LLM responses to the old prompt are not reused
+JOB_ENRICHER_PROMPT_VERSION = "1"
+
 prompt = ChatPromptTemplate.from_messages([
     SystemMessage(
         content="""
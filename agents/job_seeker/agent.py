@@ -7,6 +7,7 @@ from langchain.agents.agent import AgentExecutor
 from pydantic import SecretStr
 
 from agents.common.abstract_agent import Agent
+from agents.common.llm_cache import get_llm_cache
 from agents.common.tools.get_candidates import get_candidates
 from agents.common.tools.google_search import serpapi_google_search
 from agents.common.tools.json_tools import convert_to_json
@@ -15,7 +16,7 @@ from agents.common.tools.analyze_job_url import analyze_job_url
 from agents.common.tools.extract_jobs_from_listing import extract_jobs_from_listing
 from agents.common.tools.validate_job_posting import validate_job_posting
 from agents.common.tools.batch_process_urls import batch_process_urls
-from agents.job_seeker.prompts import prompt
+from agents.job_seeker.prompts import prompt, JOB_SEEKER_PROMPT_VERSION
 from common.config.config import OPENAI_API_KEY
 
 class JobSeekerAgent(Agent):
@@ -30,7 +31,12 @@ class JobSeekerAgent(Agent):
             validate_job_posting,
             batch_process_urls
         ]
-        llm = ChatOpenAI(model="gpt-4o", temperature=0, api_key=SecretStr(OPENAI_API_KEY))
+        llm = ChatOpenAI(
+            model="gpt-4o",
+            temperature=0,
+            api_key=SecretStr(OPENAI_API_KEY),
+            cache=get_llm_cache(f"job_seeker_agent:v{JOB_SEEKER_PROMPT_VERSION}"),
+        )
         agent = create_openai_functions_agent(
             tools=tools,
             llm=llm,
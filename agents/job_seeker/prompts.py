@@ -1,6 +1,9 @@
 from langchain_core.messages.system import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
+# Bump when the prompt changes, so cached LLM responses to the old prompt are not reused
+JOB_SEEKER_PROMPT_VERSION = "1"
+
 prompt = ChatPromptTemplate.from_messages([
     SystemMessage(
         content="""
@@ -11,7 +14,9 @@ prompt = ChatPromptTemplate.from_messages([
         STEP 1: Get candidates and group them
         - Use get_candidates to fetch available candidates
         - Group by geographical region, role, and tech stack to optimize search queries
-        - Determine country and language codes as before
+        - Each candidate already includes its resolved region, country, search_country and search_language.
+          Use the group's search_country and search_language as the country and language of serpapi_google_search,
+          don't work them out yourself
         
         STEP 2: Intelligent search and processing
         - Call serpapi_google_search ONCE per grouping using appropriate search queries
@@ -0,0 +1,146 @@
+"""
+Concurrent Telegram fan-out on a single event loop.
+
+Messages go out concurrently, within Telegram's limits: a global pace of messages per second shared
+by every chat, and a minimum interval between two messages to the same chat (messages to one chat
+are sent in order by a single coroutine). A RetryAfter (flood control) holds back every send for
+the time Telegram asks, timeouts and network errors are retried with exponential backoff, and
+every message gets an outcome so callers only mark as sent what was actually delivered.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, Hashable, List, Optional
+
+from telegram import Bot
+from telegram.error import BadRequest, ChatMigrated, Forbidden, NetworkError, RetryAfter, TelegramError
+
+from common.config.config import (
+    TELEGRAM_SEND_CONCURRENCY,
+    TELEGRAM_MESSAGES_PER_SECOND,
+    TELEGRAM_PER_CHAT_INTERVAL_SECONDS,
+    TELEGRAM_SEND_MAX_RETRIES,
+)
+
+
+@dataclass
+class OutgoingMessage:
+    # Identifies the recipient in the outcomes, e.g. the candidate ID
+    key: Hashable
+    chat_id: int
+    text: str
+
+
+@dataclass
+class SendOutcome:
+    # delivered, blocked (the user blocked the bot), rejected (bad chat or message, not retried) or failed
+    status: str
+    attempts: int = 0
+    error: Optional[str] = None
+
+    @property
+    def delivered(self) -> bool:
+        return self.status == "delivered"
+
+
+class SendPacer:
+    """Spaces sends 1/rate seconds apart on the event loop. pause() holds every send back, e.g. on a flood wait"""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1 / rate_per_second
+        self._next_slot = 0.0
+
+    async def wait(self):
+        # Reserving the slot doesn't await, so it's atomic on the loop
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def pause(self, seconds: float):
+        self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+
+class TelegramBulkSender:
+    def __init__(
+        self,
+        bot: Bot,
+        concurrency: int = TELEGRAM_SEND_CONCURRENCY,
+        messages_per_second: float = TELEGRAM_MESSAGES_PER_SECOND,
+        per_chat_interval_seconds: float = TELEGRAM_PER_CHAT_INTERVAL_SECONDS,
+        max_retries: int = TELEGRAM_SEND_MAX_RETRIES,
+        retry_base_seconds: float = 1.0,
+    ):
+        self.bot = bot
+        self.concurrency = concurrency
+        self.pacer = SendPacer(messages_per_second)
+        self.per_chat_interval_seconds = per_chat_interval_seconds
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+
+    async def send_all(self, messages: List[OutgoingMessage]) -> Dict[Any, SendOutcome]:
+        """
+        Send every message and return the outcome per key. A key with several messages is delivered only if all of
+        them were, its remaining messages are dropped after the first one that wasn't
+        """
+        started = time.monotonic()
+        by_chat: Dict[int, List[OutgoingMessage]] = {}
+        for message in messages:
+            by_chat.setdefault(message.chat_id, []).append(message)
+
+        outcomes: Dict[Any, SendOutcome] = {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self._send_chat(chat_messages, semaphore, outcomes) for chat_messages in by_chat.values()))
+
+        counts: Dict[str, int] = {}
+        for outcome in outcomes.values():
+            counts[outcome.status] = counts.get(outcome.status, 0) + 1
+        logging.info(
+            f"[TelegramBulkSender] Sent {len(messages)} messages to {len(by_chat)} chats in "
+            f"{time.monotonic() - started:.1f}s: {counts}"
+        )
+        return outcomes
+
+    async def _send_chat(self, messages: List[OutgoingMessage], semaphore: asyncio.Semaphore, outcomes: Dict[Any, SendOutcome]):
+        async with semaphore:
+            for index, message in enumerate(messages):
+                previous = outcomes.get(message.key)
+                if previous and not previous.delivered:
+                    continue
+                if index:
+                    await asyncio.sleep(self.per_chat_interval_seconds)
+                outcomes[message.key] = await self.send(message)
+
+    async def send(self, message: OutgoingMessage) -> SendOutcome:
+        attempts = 0
+        while True:
+            await self.pacer.wait()
+            attempts += 1
+            try:
+                await self.bot.send_message(chat_id=message.chat_id, text=message.text)
+                return SendOutcome("delivered", attempts)
+            except RetryAfter as e:
+                # Flood control applies to the whole bot, not only this chat
+                delay = e.retry_after.total_seconds() if isinstance(e.retry_after, timedelta) else float(e.retry_after)
+                self.pacer.pause(delay)
+                error = e
+            except Forbidden as e:
+                return SendOutcome("blocked", attempts, str(e))
+            except (BadRequest, ChatMigrated) as e:
+                # BadRequest is a NetworkError subclass, but retrying the same request won't help
+                return SendOutcome("rejected", attempts, str(e))
+            except NetworkError as e:
+                delay = self.retry_base_seconds * 2 ** (attempts - 1)
+                error = e
+            except TelegramError as e:
+                return SendOutcome("rejected", attempts, str(e))
+
+            if attempts > self.max_retries:
+                logging.warning(f"[TelegramBulkSender] Giving up on chat {message.chat_id} after {attempts} attempts: {error}")
+                return SendOutcome("failed", attempts, str(error))
+            logging.info(f"[TelegramBulkSender] Retrying chat {message.chat_id} in {delay:.1f}s: {error}")
+            await asyncio.sleep(delay)
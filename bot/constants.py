@@ -244,5 +244,59 @@ MESSAGES = {
             "• `/matches backend` → Roles de backend\n\n"
             "💡 *Tip:* Usa `/matches` sin consulta para ver todas tus coincidencias."
         )
+    },
+
+    "matches_next_page": {
+        "en": "Next page ▶️",
+        "es": "Página siguiente ▶️"
+    },
+
+    "matches_first_page": {
+        "en": "⏮ First page",
+        "es": "⏮ Primera página"
+    },
+
+    "matches_page_expired": {
+        "en": "⌛ This list has expired. Run /matches again to see your matches.",
+        "es": "⌛ Esta lista expiró. Usa /matches de nuevo para ver tus coincidencias."
+    }
+}
+
+# Plain text templates of match notifications and /matches pages, compiled per language by bot/rendering.py.
+# Sections of a message (header, entries, footer) are separated by a blank line.
+NOTIFICATION_TEMPLATES = {
+    "digest_header": {
+        "en": "🎯 New Job Opportunities Found!",
+        "es": "🎯 Nuevas Oportunidades de Trabajo Encontradas!"
+    },
+
+    "digest_empty": {
+        "en": "No new job opportunities found for you at this time.",
+        "es": "No se encontraron nuevas oportunidades de trabajo para ti en este momento."
+    },
+
+    "digest_more": {
+        "en": "... and {count} more opportunities!",
+        "es": "... y {count} oportunidades más!"
+    },
+
+    "matches_page_header": {
+        "en": "🎯 Your Job Opportunities",
+        "es": "🎯 Tus Oportunidades de Trabajo"
+    },
+
+    "match_entry": {
+        "en": "{index}. {job_title}\n🏢 {company_name}\n📍 {location}\n⭐ Match Score: {score}%\n🔗 {job_link}",
+        "es": "{index}. {job_title}\n🏢 {company_name}\n📍 {location}\n⭐ Coincidencia: {score}%\n🔗 {job_link}"
+    },
+
+    "matches_filter_info": {
+        "en": "🔍 *Filtered by:* `{query}`\n💡 *Tip:* Use `/matches` without a filter to see all your matches.",
+        "es": "🔍 *Filtrado por:* `{query}`\n💡 *Tip:* Usa `/matches` sin filtro para ver todas tus coincidencias."
+    },
+
+    "matches_format_error": {
+        "en": "🔍 Error formatting matches. Please try again.",
+        "es": "🔍 Error al formatear las coincidencias. Por favor intenta de nuevo."
     }
-}
\ No newline at end of file
+}
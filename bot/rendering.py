@@ -0,0 +1,267 @@
+"""
+Rendering of match notifications and /matches pages.
+
+Field sanitizing and markdown escaping replace only the characters a text actually contains, found in
+one scan, instead of a str.replace pass per special character; results are memoized, since the same
+postings show up in many candidates' digests and pages. (str.translate is single-pass too, but with
+multi-character replacements CPython falls back to a per-character path that is slower than the
+replace loops, see the benchmark below.) The per-language templates of bot/constants.py are compiled
+once into bound format methods. Long messages are split into Telegram-sized chunks at section, then
+line boundaries.
+"""
+
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from telegram.constants import MessageLimit
+
+from bot.constants import NOTIFICATION_TEMPLATES
+
+MAX_MESSAGE_LENGTH = MessageLimit.MAX_TEXT_LENGTH
+# Sections of a message: header, each match and footer
+SECTION_SEPARATOR = "\n\n"
+DEFAULT_LANGUAGE = "en"
+# Distinct field values kept by each memoized sanitizer
+SANITIZE_CACHE_SIZE = 4096
+
+# Characters that break Telegram markdown parsing, escaped with a backslash
+MARKDOWN_ESCAPES = {char: f"\\{char}" for char in "_*[]()~`>#+-=|{}.!"}
+# Plain text fields (titles, company names) lose or replace anything that could read as markup
+SAFE_TEXT_REPLACEMENTS = {
+    '*': '',
+    '_': '',
+    '[': '(',
+    ']': ')',
+    '`': "'",
+    '~': '-',
+    '>': '',
+    '#': '',
+    '+': 'plus',
+    '=': 'equals',
+    '|': 'or',
+    '{': '(',
+    '}': ')',
+}
+
+
+def _replacer(replacements: Mapping[str, str]) -> Callable[[str], str]:
+    """
+    Memoized function applying replacements to the characters a text contains. No replacement contains a
+    replaced character, so the order they are applied in doesn't matter
+    """
+    chars = frozenset(replacements)
+
+    @lru_cache(maxsize=SANITIZE_CACHE_SIZE)
+    def replace(text: str) -> str:
+        for char in chars.intersection(text):
+            text = text.replace(char, replacements[char])
+        return text
+
+    return replace
+
+
+_escape_markdown = _replacer(MARKDOWN_ESCAPES)
+_safe_text = _replacer(SAFE_TEXT_REPLACEMENTS)
+
+
+def escape_markdown(text: Optional[str]) -> Optional[str]:
+    return _escape_markdown(text) if text else text
+
+
+def safe_text(text: Optional[str]) -> Optional[str]:
+    return _safe_text(text) if text else text
+
+
+def match_percentage(match_score: float) -> int:
+    """Scores are stored as percentages (60-100), older 0-1 scores are scaled up"""
+    return round(match_score * 100 if match_score <= 1 else match_score)
+
+
+def telegram_length(text: str) -> int:
+    """Length as Telegram counts it, in UTF-16 code units (most emoji count twice)"""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def chunk_message(text: str, limit: int = MAX_MESSAGE_LENGTH, separators: Sequence[str] = (SECTION_SEPARATOR, "\n")) -> List[str]:
+    """
+    Split text into messages of at most limit UTF-16 units, packing whole sections per message; a section longer
+    than the limit is split at line breaks, and a line longer than the limit wherever it has to be
+    """
+    if telegram_length(text) <= limit:
+        return [text]
+    if not separators:
+        return _split_hard(text, limit)
+
+    separator, finer_separators = separators[0], separators[1:]
+    separator_length = telegram_length(separator)
+    chunks: List[str] = []
+    current: List[str] = []
+    current_length = 0
+    for part in text.split(separator):
+        part_length = telegram_length(part)
+        if current and current_length + separator_length + part_length <= limit:
+            current.append(part)
+            current_length += separator_length + part_length
+            continue
+        if current:
+            chunks.append(separator.join(current))
+        if part_length <= limit:
+            current, current_length = [part], part_length
+        else:
+            *complete, last = chunk_message(part, limit, finer_separators)
+            chunks.extend(complete)
+            current, current_length = [last], telegram_length(last)
+    if current:
+        chunks.append(separator.join(current))
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+def _split_hard(text: str, limit: int) -> List[str]:
+    chunks, start, length = [], 0, 0
+    for position, char in enumerate(text):
+        char_length = 2 if ord(char) > 0xFFFF else 1
+        if length + char_length > limit:
+            chunks.append(text[start:position])
+            start, length = position, 0
+        length += char_length
+    chunks.append(text[start:])
+    return chunks
+
+
+class NotificationRenderer:
+    def __init__(self, templates: Mapping[str, Mapping[str, str]] = NOTIFICATION_TEMPLATES, max_listed: int = 5):
+        self.max_listed = max_listed
+        # language -> template key -> bound str.format, falling back to the default language per key
+        languages = {language for translations in templates.values() for language in translations}
+        self._templates: Dict[str, Dict[str, Callable[..., str]]] = {
+            language: {
+                key: translations.get(language, translations[DEFAULT_LANGUAGE]).format
+                for key, translations in templates.items()
+            }
+            for language in languages
+        }
+
+    def _compiled(self, language: str) -> Dict[str, Callable[..., str]]:
+        return self._templates.get(language) or self._templates[DEFAULT_LANGUAGE]
+
+    def render_entry(self, index: int, job_posting, match_score: float, language: str) -> str:
+        """A numbered match; job_posting can be a JobPosting or a row with the same columns"""
+        return self._compiled(language)["match_entry"](
+            index=index,
+            job_title=safe_text(job_posting.job_title or 'Unknown Title'),
+            company_name=safe_text(job_posting.company_name or 'Unknown Company'),
+            location=safe_text(getattr(job_posting, 'location', None) or 'Remote'),
+            score=match_percentage(match_score),
+            job_link=job_posting.job_link,
+        )
+
+    def render_digest(self, matches: Sequence, job_postings: Mapping[int, object], language: str) -> str:
+        """New matches notification, best max_listed matches first. job_postings maps posting IDs to postings"""
+        templates = self._compiled(language)
+        if not matches:
+            return SECTION_SEPARATOR.join((templates["digest_header"](), templates["digest_empty"]()))
+
+        sections = [templates["digest_header"]()]
+        index = 0
+        for match in matches[:self.max_listed]:
+            job_posting = job_postings.get(match.job_posting_id)
+            if job_posting:
+                index += 1
+                sections.append(self.render_entry(index, job_posting, match.match_score, language))
+        if len(matches) > self.max_listed:
+            sections.append(templates["digest_more"](count=len(matches) - self.max_listed))
+        return SECTION_SEPARATOR.join(sections)
+
+    def render_matches_page(self, rows: Iterable, language: str, start_index: int = 1, query: Optional[str] = None) -> str:
+        """
+        One /matches page. rows come from AsyncMatchesRepository.get_matches_page and already carry the job
+        posting columns
+        """
+        templates = self._compiled(language)
+        sections = [templates["matches_page_header"]()]
+        sections.extend(self.render_entry(index, row, row.match_score, language) for index, row in enumerate(rows, start_index))
+        if query:
+            sections.append(templates["matches_filter_info"](query=query))
+        return SECTION_SEPARATOR.join(sections)
+
+    def render_format_error(self, language: str) -> str:
+        return self._compiled(language)["matches_format_error"]()
+
+
+renderer = NotificationRenderer()
+
+
+if __name__ == '__main__':
+    # Benchmark against the per-character str.replace loops this module replaces
+    import timeit
+    from types import SimpleNamespace
+
+    def legacy_escape_markdown(text):
+        for char in ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']:
+            text = text.replace(char, f'\\{char}')
+        return text
+
+    def legacy_safe_text(text):
+        for char, replacement in {'*': '', '_': '', '[': '(', ']': ')', '`': "'", '~': '-', '>': '', '#': '',
+                                  '+': 'plus', '=': 'equals', '|': 'or', '{': '(', '}': ')'}.items():
+            text = text.replace(char, replacement)
+        return text
+
+    def legacy_render_digest(matches, job_postings, language):
+        header = "🎯 Nuevas Oportunidades de Trabajo Encontradas!\n\n" if language == 'es' else "🎯 New Job Opportunities Found!\n\n"
+        parts = [header]
+        for i, match in enumerate(matches[:5], 1):
+            job_posting = job_postings[match.job_posting_id]
+            parts.append(
+                f"{i}. {legacy_safe_text(job_posting.job_title)}\n🏢 {legacy_safe_text(job_posting.company_name)}\n"
+                f"📍 {legacy_safe_text(job_posting.location)}\n⭐ Match Score: {int(match.match_score)}%\n🔗 {job_posting.job_link}\n"
+            )
+        return "\n".join(parts)
+
+    samples = [
+        "Senior Backend Engineer (Python/Django) - Remote [LATAM] #hiring",
+        "Acme Corp. | Fintech + Payments {Series B}",
+        "Plain title without markup",
+    ]
+    for text in samples:
+        assert escape_markdown(text) == legacy_escape_markdown(text)
+        assert safe_text(text) == legacy_safe_text(text)
+
+    job_postings = {
+        i: SimpleNamespace(
+            id=i, job_title=f"Senior Backend Engineer #{i} (Python/Django) [Remote]", company_name="Acme Corp. | Fintech + Payments",
+            location="Buenos Aires", job_link=f"https://jobs.example.com/acme/{i}",
+        )
+        for i in range(200)
+    }
+    matches = [SimpleNamespace(job_posting_id=i, match_score=60 + i % 40) for i in range(200)]
+    long_text = " ".join(samples * 20)
+    escape_table = str.maketrans(MARKDOWN_ESCAPES)
+    safe_table = str.maketrans(SAFE_TEXT_REPLACEMENTS)
+    assert long_text.translate(escape_table) == escape_markdown(long_text)
+
+    # uncached: first time a text is seen, cached: the same posting in another digest
+    runs = 20000
+    print(f"{'':20}{'replace loop':>14}{'translate':>14}{'uncached':>14}{'cached':>14}")
+    for name, legacy, table, current in [
+        ("escape_markdown", legacy_escape_markdown, escape_table, _escape_markdown),
+        ("safe_text", legacy_safe_text, safe_table, _safe_text),
+    ]:
+        timings = [
+            timeit.timeit(lambda: [function(text) for text in samples], number=runs) / runs * 1e6
+            for function in (legacy, lambda text: text.translate(table), current.__wrapped__, current)
+        ]
+        print(f"{name:20}" + "".join(f"{timing:12.2f}us" for timing in timings))
+
+    legacy_us = timeit.timeit(lambda: legacy_render_digest(matches, job_postings, 'es'), number=runs) / runs * 1e6
+    current_us = timeit.timeit(lambda: renderer.render_digest(matches, job_postings, 'es'), number=runs) / runs * 1e6
+    print(f"{'digest (5 of 200)':20}{legacy_us:12.2f}us{'':14}{'':14}{current_us:12.2f}us")
+
+    # Every match listed, then split for Telegram
+    full = NotificationRenderer(max_listed=len(matches))
+    digest = full.render_digest(matches, job_postings, 'en')
+    chunks = chunk_message(digest)
+    chunk_us = timeit.timeit(lambda: chunk_message(digest), number=200) / 200 * 1e6
+    assert all(telegram_length(chunk) <= MAX_MESSAGE_LENGTH for chunk in chunks)
+    assert SECTION_SEPARATOR.join(chunks) == digest
+    print(f"{'chunk_message':20}{chunk_us:12.2f}us  {telegram_length(digest)} units -> {len(chunks)} messages")
@@ -1,19 +1,45 @@
 import logging
 import asyncio
+import hashlib
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
 
-from telegram import Update, BotCommand
-from telegram.ext import ContextTypes, ApplicationBuilder, CommandHandler, MessageHandler, filters
+from telegram import Update, BotCommand, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes, ApplicationBuilder, CallbackQueryHandler, CommandHandler, MessageHandler, filters
 
 from bot.constants import MESSAGES, COMMAND_USE_GUIDES
-from common.config.config import TELEGRAM_BOT_TOKEN
+from bot.rendering import escape_markdown
+from common.config.config import TELEGRAM_BOT_TOKEN, TELEGRAM_CONCURRENT_UPDATES, MATCHES_PAGE_SIZE
+from common.database.async_database import async_unit_of_work, dispose_async_engine
+from common.database.repositories.async_match_filters import AsyncMatchFiltersRepository
+from common.database.repositories.async_matches import AsyncMatchesRepository
 from common.types.upsert_candidate_input import UpsertCandidateInput
-from services.candidates import CandidatesService
+from services.candidate_profile_cache import CandidateProfileCache
+from services.candidates import AsyncCandidatesService
 from services.notification_service import NotificationService
 
+# /matches pagination callback data
+MATCHES_CALLBACK_PREFIX = "matches"
+MATCHES_NO_QUERY_TOKEN = "-"
+EPOCH = datetime(1970, 1, 1)
+
 class TelegramBot:
-    def __init__(self):
-        self.app = ApplicationBuilder().token(TELEGRAM_BOT_TOKEN).post_init(self._post_init_setup).build()
-        self.candidates_service = CandidatesService()
+    def __init__(self, cache_profiles: bool = True):
+        """
+        cache_profiles should be off when several instances serve the bot (webhook mode): a profile
+        changed through one instance would be served stale by the others until the cache TTL
+        """
+        self.app = (
+            ApplicationBuilder()
+            .token(TELEGRAM_BOT_TOKEN)
+            .post_init(self._post_init_setup)
+            .post_shutdown(self._post_shutdown)
+            .concurrent_updates(TELEGRAM_CONCURRENT_UPDATES)
+            .build()
+        )
+        # Updates are handled concurrently on PTB's event loop, so handlers use the async database layer to avoid blocking other chats
+        # A cache of size 0 stores nothing, every read goes to the database
+        self.candidates_service = AsyncCandidatesService(None if cache_profiles else CandidateProfileCache(max_size=0))
         self.notification_service = NotificationService()
         self._register_handlers()
 
@@ -82,6 +108,7 @@ class TelegramBot:
         self.app.add_handler(CommandHandler('setrole', self.set_role))
         self.app.add_handler(CommandHandler('setlocation', self.set_location))
         self.app.add_handler(CommandHandler('matches', self.get_matches))
+        self.app.add_handler(CallbackQueryHandler(self.get_matches_page, pattern=f"^{MATCHES_CALLBACK_PREFIX}\\|"))
         self.app.add_handler(CommandHandler('matcheshelp', self.get_matches_help))
         self.app.add_handler(CommandHandler('myinfo', self.get_my_info))
         self.app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.non_command_message))
@@ -90,17 +117,7 @@ class TelegramBot:
         """
         Escape special characters that break Telegram markdown parsing
         """
-        if not text:
-            return text
-        
-        # Characters that need escaping in Telegram markdown
-        escape_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-        
-        escaped_text = text
-        for char in escape_chars:
-            escaped_text = escaped_text.replace(char, f'\\{char}')
-        
-        return escaped_text
+        return escape_markdown(text)
 
     def _get_message(self, key: str, lang: str = "en", **kwargs) -> str:
         if key not in MESSAGES:
@@ -114,7 +131,8 @@ class TelegramBot:
         return self._escape_markdown(formatted_text)
 
     def _detect_language(self, update: Update) -> str:
-        lang_code = (update.message.from_user.language_code or "en").lower()
+        # effective_user also covers callback queries, which carry no message from the user
+        lang_code = (update.effective_user.language_code or "en").lower()
         if lang_code.startswith("es"):
             return "es"
         return "en"
@@ -135,7 +153,7 @@ class TelegramBot:
             logging.error("Tech stack was not informed")
             await update.message.reply_text(f"You must inform the stack to continue, command usage: {COMMAND_USE_GUIDES['SET_STACK']}")
             return
-        self.candidates_service.upsert(
+        await self.candidates_service.upsert(
             id=chat_id,
             data=UpsertCandidateInput(tech_stack=stack)
         )
@@ -152,7 +170,7 @@ class TelegramBot:
             logging.error("Role was not informed")
             await update.message.reply_text(f"You must inform the role to continue, command usage: {COMMAND_USE_GUIDES['SET_ROLE']}")
             return
-        self.candidates_service.upsert(
+        await self.candidates_service.upsert(
             id=chat_id,
             data=UpsertCandidateInput(role=role)
         )
@@ -169,7 +187,7 @@ class TelegramBot:
             logging.error("Location was not informed")
             await update.message.reply_text(f"You must inform the location to continue, command usage: {COMMAND_USE_GUIDES['SET_LOCATION']}")
             return
-        self.candidates_service.upsert(
+        await self.candidates_service.upsert(
             id=chat_id,
             data=UpsertCandidateInput(location=location)
         )
@@ -182,7 +200,7 @@ class TelegramBot:
         
         try:
             # Get candidate by telegram chat ID
-            candidate = self.candidates_service.get_by_telegram_id(chat_id)
+            candidate = await self.candidates_service.get_by_telegram_id(chat_id)
             if not candidate:
                 await update.message.reply_markdown(
                     self._get_message('candidate_not_found', user_lang)
@@ -195,16 +213,11 @@ class TelegramBot:
                 query = " ".join(context.args).strip()
                 logging.info(f"Filtering matches with query: '{query}' for chat_id {chat_id}")
             
-            # Get matches for this candidate with optional filtering
-            from common.database.repositories.matches import MatchesRepository
-            matches_repo = MatchesRepository()
-            
-            if query:
-                matches = matches_repo.get_matches_by_candidate_with_filter(candidate.id, query)
-            else:
-                matches = matches_repo.get_matches_by_candidate(candidate.id)
+            # Get the first page of matches for this candidate with optional filtering
+            query_token = await self._store_matches_query(query)
+            message, keyboard = await self._render_matches_page(candidate.id, user_lang, query, query_token)
             
-            if not matches:
+            if message is None:
                 if query:
                     # Show filtered no results message
                     if user_lang == "es":
@@ -217,18 +230,7 @@ class TelegramBot:
                 await update.message.reply_markdown(message)
                 return
             
-            # Format and send matches
-            message = self.notification_service.format_matches_for_display(matches, user_lang)
-            
-            # Add filter info if query was used
-            if query:
-                if user_lang == "es":
-                    filter_info = f"\n\n🔍 *Filtrado por:* `{query}`\n💡 *Tip:* Usa `/matches` sin filtro para ver todas tus coincidencias."
-                else:
-                    filter_info = f"\n\n🔍 *Filtered by:* `{query}`\n💡 *Tip:* Use `/matches` without a filter to see all your matches."
-                message += filter_info
-            
-            await update.message.reply_text(message)
+            await update.message.reply_text(message, reply_markup=keyboard)
             
         except Exception as e:
             logging.error(f"Error in /matches command: {e}")
@@ -236,6 +238,110 @@ class TelegramBot:
                 self._get_message('error_occurred', user_lang)
             )
 
+    async def get_matches_page(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle the inline keyboard buttons that move through /matches pages"""
+        callback_query = update.callback_query
+        chat_id = update.effective_chat.id
+        user_lang = self._detect_language(update)
+        await callback_query.answer()
+        
+        try:
+            query_token, cursor, start_index = self._decode_matches_callback(callback_query.data)
+            query = None
+            if query_token != MATCHES_NO_QUERY_TOKEN:
+                async with async_unit_of_work() as session:
+                    query = await AsyncMatchFiltersRepository(session).get_query(query_token)
+                if query is None:
+                    # A button from before filters were stored in the database
+                    await callback_query.edit_message_text(MESSAGES['matches_page_expired'][user_lang])
+                    return
+            
+            candidate = await self.candidates_service.get_by_telegram_id(chat_id)
+            if not candidate:
+                await callback_query.edit_message_text(MESSAGES['matches_page_expired'][user_lang])
+                return
+            
+            message, keyboard = await self._render_matches_page(
+                candidate.id, user_lang, query, query_token, cursor, start_index
+            )
+            if message is None:
+                await callback_query.edit_message_text(MESSAGES['matches_page_expired'][user_lang])
+                return
+            
+            await callback_query.edit_message_text(message, reply_markup=keyboard)
+            
+        except Exception as e:
+            logging.error(f"Error paging /matches for chat_id {chat_id}: {e}")
+            await callback_query.edit_message_text(MESSAGES['matches_page_expired'][user_lang])
+
+    async def _render_matches_page(
+        self,
+        candidate_id: int,
+        user_lang: str,
+        query: Optional[str],
+        query_token: str,
+        cursor: Optional[Tuple[datetime, int]] = None,
+        start_index: int = 1
+    ) -> Tuple[Optional[str], Optional[InlineKeyboardMarkup]]:
+        """
+        Fetch a single page of matches and build its message and navigation keyboard.
+        Returns (None, None) when the page is empty.
+        """
+        async with async_unit_of_work() as session:
+            rows, has_next_page = await AsyncMatchesRepository(session).get_matches_page(
+                candidate_id, query=query, after=cursor, limit=MATCHES_PAGE_SIZE
+            )
+        
+        if not rows:
+            return None, None
+        
+        # Includes the filter info when a query was used
+        message = self.notification_service.format_matches_page(rows, user_lang, start_index, query)
+        
+        buttons = []
+        if cursor is not None:
+            buttons.append(InlineKeyboardButton(
+                MESSAGES['matches_first_page'][user_lang],
+                callback_data=self._encode_matches_callback(query_token, None, 1)
+            ))
+        if has_next_page:
+            last_row = rows[-1]
+            buttons.append(InlineKeyboardButton(
+                MESSAGES['matches_next_page'][user_lang],
+                callback_data=self._encode_matches_callback(
+                    query_token, (last_row.created_at, last_row.id), start_index + len(rows)
+                )
+            ))
+        
+        return message, InlineKeyboardMarkup([buttons]) if buttons else None
+
+    async def _store_matches_query(self, query: Optional[str]) -> str:
+        """
+        Store the /matches filter in the database and return a short token for it, since callback
+        data is limited to 64 bytes. Any instance of the bot resolves the token of a page button
+        """
+        if not query:
+            return MATCHES_NO_QUERY_TOKEN
+        query_token = hashlib.sha1(query.encode()).hexdigest()[:12]
+        async with async_unit_of_work() as session:
+            await AsyncMatchFiltersRepository(session).save(query_token, query)
+        return query_token
+
+    def _encode_matches_callback(self, query_token: str, cursor: Optional[Tuple[datetime, int]], start_index: int) -> str:
+        """Encode a /matches page as callback data: matches|<query token>|<created_at µs>|<match id>|<start index>"""
+        if cursor is None:
+            return f"{MATCHES_CALLBACK_PREFIX}|{query_token}|0|0|{start_index}"
+        created_at, match_id = cursor
+        created_at_us = (created_at - EPOCH) // timedelta(microseconds=1)
+        return f"{MATCHES_CALLBACK_PREFIX}|{query_token}|{created_at_us}|{match_id}|{start_index}"
+
+    def _decode_matches_callback(self, data: str) -> Tuple[str, Optional[Tuple[datetime, int]], int]:
+        _, query_token, created_at_us, match_id, start_index = data.split("|")
+        cursor = None
+        if int(match_id) > 0:
+            cursor = (EPOCH + timedelta(microseconds=int(created_at_us)), int(match_id))
+        return query_token, cursor, int(start_index)
+
     async def get_matches_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         chat_id = update.effective_chat.id
         user_lang = self._detect_language(update)
@@ -257,7 +363,7 @@ class TelegramBot:
         
         try:
             # Get candidate by telegram chat ID
-            candidate = self.candidates_service.get_by_telegram_id(chat_id)
+            candidate = await self.candidates_service.get_by_telegram_id(chat_id)
             if not candidate:
                 await update.message.reply_markdown(
                     self._get_message('candidate_not_found', user_lang)
@@ -307,7 +413,7 @@ class TelegramBot:
         chat_id = update.effective_chat.id
         logging.info(f"Received non-command message from chat_id {chat_id}")
         user_lang = self._detect_language(update)
-        self.candidates_service.upsert(
+        await self.candidates_service.upsert(
             id=chat_id,
             data=UpsertCandidateInput(language=user_lang)
         )
@@ -371,6 +477,13 @@ class TelegramBot:
         else:
             logging.warning("No commands to set up - _commands_to_setup not found")
 
+    async def _post_shutdown(self, application):
+        """Release pooled async database connections when the bot stops"""
+        try:
+            await dispose_async_engine()
+        except Exception as e:
+            logging.error(f"Failed to dispose async database engine: {e}")
+
     async def send_message(self, chat_id: int, message: str):
         """Send a message to a specific chat ID"""
         try:
@@ -0,0 +1,138 @@
+"""
+Webhook mode for the Telegram bot.
+
+One aiohttp server on the application's event loop receives the updates Telegram posts to the webhook
+and serves the health endpoints. The webhook handler only checks the secret token and puts the update
+on the bot's update queue, answering Telegram right away; the application processes queued updates
+concurrently (TELEGRAM_CONCURRENT_UPDATES). Unlike getUpdates polling, several instances can serve the
+same webhook behind a load balancer, so a rolling deploy never has two pollers fighting over updates.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import signal
+from typing import Optional
+
+from aiohttp import web
+from telegram import Update
+
+from bot.telegram_bot import TelegramBot
+from common.config.config import (
+    TELEGRAM_BOT_TOKEN,
+    TELEGRAM_WEBHOOK_URL,
+    TELEGRAM_WEBHOOK_PATH,
+    TELEGRAM_WEBHOOK_SECRET,
+    TELEGRAM_WEBHOOK_MAX_CONNECTIONS,
+    PORT,
+)
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def webhook_secret() -> str:
+    """The configured secret, or one derived from the bot token so every instance agrees on it"""
+    return TELEGRAM_WEBHOOK_SECRET or hashlib.sha256(f"webhook:{TELEGRAM_BOT_TOKEN}".encode()).hexdigest()[:32]
+
+
+class WebhookServer:
+    def __init__(
+        self,
+        telegram_bot: TelegramBot,
+        webhook_url: str = TELEGRAM_WEBHOOK_URL,
+        webhook_path: str = TELEGRAM_WEBHOOK_PATH,
+        port: int = PORT,
+        secret: Optional[str] = None,
+    ):
+        if not webhook_url:
+            raise ValueError("TELEGRAM_WEBHOOK_URL is required in webhook mode")
+        self.telegram_bot = telegram_bot
+        self.application = telegram_bot.app
+        self.webhook_url = webhook_url.rstrip("/") + webhook_path
+        self.webhook_path = webhook_path
+        self.port = port
+        self.secret = secret or webhook_secret()
+        self._stop: Optional[asyncio.Event] = None
+
+        self.web_app = web.Application()
+        self.web_app.router.add_get("/", self.root)
+        self.web_app.router.add_get("/health", self.health)
+        self.web_app.router.add_post(webhook_path, self.webhook)
+
+    async def root(self, request: web.Request) -> web.Response:
+        return web.json_response({'message': 'Jobs Agent Telegram Bot', 'status': 'running'})
+
+    async def health(self, request: web.Request) -> web.Response:
+        healthy = self.application.running
+        return web.json_response(
+            {
+                'status': 'healthy' if healthy else 'starting',
+                'service': 'jobs-agent',
+                'mode': 'webhook',
+                'queued_updates': self.application.update_queue.qsize(),
+            },
+            status=200 if healthy else 503,
+        )
+
+    async def webhook(self, request: web.Request) -> web.Response:
+        if not hmac.compare_digest(request.headers.get(SECRET_TOKEN_HEADER, ""), self.secret):
+            return web.Response(status=403)
+        try:
+            update = Update.de_json(await request.json(), self.application.bot)
+        except Exception as e:
+            logging.warning(f"[WebhookServer] Invalid update: {e}")
+            return web.Response(status=400)
+        # Answer Telegram right away, the application works through the queue concurrently
+        await self.application.update_queue.put(update)
+        return web.Response()
+
+    def stop(self):
+        if self._stop:
+            self._stop.set()
+
+    def run(self):
+        """Blocking entry point, serves until SIGINT/SIGTERM or stop()"""
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        self._stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                # Not on the main thread (e.g. tests)
+                pass
+
+        # No access log, every update would log a line
+        runner = web.AppRunner(self.web_app, access_log=None)
+        await runner.setup()
+        # Health checks answer (503) while the bot starts
+        await web.TCPSite(runner, host="0.0.0.0", port=self.port).start()
+        logging.info(f"[WebhookServer] Listening on port {self.port}")
+
+        await self.telegram_bot.update_commands()
+        await self.application.initialize()
+        try:
+            if self.application.post_init:
+                await self.application.post_init(self.application)
+            await self.application.start()
+            # Every instance sets the same webhook, pending updates are kept across deploys
+            await self.application.bot.set_webhook(
+                url=self.webhook_url,
+                secret_token=self.secret,
+                allowed_updates=["message", "callback_query"],
+                max_connections=TELEGRAM_WEBHOOK_MAX_CONNECTIONS,
+            )
+            logging.info(f"[WebhookServer] Receiving updates at {self.webhook_url}")
+            await self._stop.wait()
+        finally:
+            logging.info("[WebhookServer] Stopping")
+            # Stop accepting updates first, then let the application finish the queued ones
+            await runner.cleanup()
+            if self.application.running:
+                await self.application.stop()
+            await self.application.shutdown()
+            if self.application.post_shutdown:
+                await self.application.post_shutdown(self.application)
@@ -7,15 +7,111 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 SERPAPI_KEY = os.getenv("SERPAPI_KEY", "")
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
+# Maximum number of Telegram updates processed at the same time by the bot
+TELEGRAM_CONCURRENT_UPDATES = int(os.getenv("TELEGRAM_CONCURRENT_UPDATES", "32"))
+# How the bot receives updates: "polling" (a single instance) or "webhook" (Telegram posts them to
+# TELEGRAM_WEBHOOK_URL + TELEGRAM_WEBHOOK_PATH, so any number of instances can run behind a load balancer)
+TELEGRAM_MODE = os.getenv("TELEGRAM_MODE", "polling")
+TELEGRAM_WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL", "")
+TELEGRAM_WEBHOOK_PATH = os.getenv("TELEGRAM_WEBHOOK_PATH", "/telegram/webhook")
+# Telegram sends it with every update and the server rejects requests without it (derived from the token when empty)
+TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET", "")
+# Connections Telegram opens to the webhook at the same time (1-100)
+TELEGRAM_WEBHOOK_MAX_CONNECTIONS = int(os.getenv("TELEGRAM_WEBHOOK_MAX_CONNECTIONS", "40"))
+# Port of the HTTP server (health checks, and the webhook in webhook mode)
+PORT = int(os.getenv("PORT", "8000"))
+# Bulk sends (notification digests): messages in flight, messages per second across all chats (Telegram allows
+# about 30), seconds between two messages to the same chat, and retries of timeouts and network errors
+TELEGRAM_SEND_CONCURRENCY = int(os.getenv("TELEGRAM_SEND_CONCURRENCY", "20"))
+TELEGRAM_MESSAGES_PER_SECOND = float(os.getenv("TELEGRAM_MESSAGES_PER_SECOND", "25"))
+TELEGRAM_PER_CHAT_INTERVAL_SECONDS = float(os.getenv("TELEGRAM_PER_CHAT_INTERVAL_SECONDS", "1"))
+TELEGRAM_SEND_MAX_RETRIES = int(os.getenv("TELEGRAM_SEND_MAX_RETRIES", "3"))
+# Number of matches shown per /matches page
+MATCHES_PAGE_SIZE = int(os.getenv("MATCHES_PAGE_SIZE", "5"))
+# In-process candidate profile cache used by the bot
+CANDIDATE_CACHE_MAX_SIZE = int(os.getenv("CANDIDATE_CACHE_MAX_SIZE", "10000"))
+CANDIDATE_CACHE_TTL_SECONDS = int(os.getenv("CANDIDATE_CACHE_TTL_SECONDS", "600"))
+# Job postings per candidate forwarded to the LLM matcher after local pre-scoring
+MATCHER_TOP_K = int(os.getenv("MATCHER_TOP_K", "15"))
+# Pairs below this pre-score (0-1) are never sent to the LLM matcher
+MATCHER_MIN_PRE_SCORE = float(os.getenv("MATCHER_MIN_PRE_SCORE", "0.3"))
+# Direct LLM scoring of shortlisted pairs: model, prompt size per call, parallel calls and request rate
+MATCHER_MODEL = os.getenv("MATCHER_MODEL", "gpt-4o")
+MATCHER_CHUNK_TOKEN_BUDGET = int(os.getenv("MATCHER_CHUNK_TOKEN_BUDGET", "6000"))
+MATCHER_MAX_CONCURRENCY = int(os.getenv("MATCHER_MAX_CONCURRENCY", "4"))
+MATCHER_REQUESTS_PER_SECOND = float(os.getenv("MATCHER_REQUESTS_PER_SECOND", "2"))
+# Job posting descriptions are truncated to this many tokens in matching prompts
+MATCHER_DESCRIPTION_MAX_TOKENS = int(os.getenv("MATCHER_DESCRIPTION_MAX_TOKENS", "60"))
+# Local TF-IDF index of job postings used for semantic retrieval
+JOB_INDEX_PATH = os.getenv("JOB_INDEX_PATH", "data/job_posting_index.npz")
+JOB_INDEX_FEATURES = int(os.getenv("JOB_INDEX_FEATURES", str(2 ** 20)))
+# Job enrichment: "pipeline" runs it directly, "agent" goes through the JobEnricherAgent
+ENRICHMENT_MODE = os.getenv("ENRICHMENT_MODE", "pipeline")
+# Parallel browsers, results per database write (and max seconds between writes), page load timeout and
+# Playwright load state of the enrichment pipeline
+ENRICHMENT_WORKERS = int(os.getenv("ENRICHMENT_WORKERS", "4"))
+ENRICHMENT_BATCH_SIZE = int(os.getenv("ENRICHMENT_BATCH_SIZE", "25"))
+ENRICHMENT_FLUSH_SECONDS = float(os.getenv("ENRICHMENT_FLUSH_SECONDS", "5"))
+ENRICHMENT_PAGE_TIMEOUT_MS = int(os.getenv("ENRICHMENT_PAGE_TIMEOUT_MS", "30000"))
+ENRICHMENT_WAIT_UNTIL = os.getenv("ENRICHMENT_WAIT_UNTIL", "networkidle")
+# Politeness: parallel visits per host and seconds between two visits to the same host
+ENRICHMENT_PER_HOST_CONCURRENCY = int(os.getenv("ENRICHMENT_PER_HOST_CONCURRENCY", "2"))
+ENRICHMENT_HOST_DELAY_SECONDS = float(os.getenv("ENRICHMENT_HOST_DELAY_SECONDS", "1"))
+# Job matching workflow: "batch" runs fetch, enrich and match one after the other, "streaming" runs them
+# concurrently, passing postings through bounded queues in micro-batches
+WORKFLOW_MODE = os.getenv("WORKFLOW_MODE", "batch")
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "200"))
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "25"))
+STREAM_BATCH_WAIT_SECONDS = float(os.getenv("STREAM_BATCH_WAIT_SECONDS", "10"))
+# Batch mode checkpoints each run, a restarted run resumes the last unfinished one unless it started longer ago than this
+WORKFLOW_RESUME_MAX_AGE_HOURS = int(os.getenv("WORKFLOW_RESUME_MAX_AGE_HOURS", "24"))
+# Persistent LLM response cache shared by every agent and direct pipeline (0 TTL never expires)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_HOURS = int(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+# Postgres work queue: when enabled, crons only enqueue enrichment, matching and notification tasks and
+# `python worker.py` processes run them
+TASK_QUEUE_ENABLED = os.getenv("TASK_QUEUE_ENABLED", "false").lower() == "true"
+# Seconds a claimed task stays leased to its worker (renewed while it runs), attempts before a task is
+# dead-lettered and base delay of the exponential retry backoff
+TASK_LEASE_SECONDS = int(os.getenv("TASK_LEASE_SECONDS", "300"))
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "5"))
+TASK_RETRY_BASE_SECONDS = int(os.getenv("TASK_RETRY_BASE_SECONDS", "30"))
+# Seconds an idle worker waits before polling for tasks again, and tasks each worker process runs at the same time
+TASK_POLL_SECONDS = float(os.getenv("TASK_POLL_SECONDS", "2"))
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "2"))
 
 # Cron job configurations
 CRON_JOB_SEEKER_INTERVAL_HOURS = int(os.getenv("CRON_JOB_SEEKER_INTERVAL_HOURS", "6"))
 CRON_JOB_ENRICHMENT_INTERVAL_HOURS = int(os.getenv("CRON_JOB_ENRICHMENT_INTERVAL_HOURS", "12"))
-CRON_NOTIFICATION_INTERVAL_HOURS = int(os.getenv("CRON_NOTIFICATION_INTERVAL_HOURS", "24"))
-CRON_MATCH_NOTIFICATION_INTERVAL_HOURS = int(os.getenv("CRON_MATCH_NOTIFICATION_INTERVAL_HOURS", "24"))
 
 # Cron job start times (24-hour format)
 CRON_JOB_SEEKER_START_TIME = os.getenv("CRON_JOB_SEEKER_START_TIME", "00:00")
 CRON_JOB_ENRICHMENT_START_TIME = os.getenv("CRON_JOB_ENRICHMENT_START_TIME", "02:00")
-CRON_NOTIFICATION_START_TIME = os.getenv("CRON_NOTIFICATION_START_TIME", "08:00")
-CRON_MATCH_NOTIFICATION_START_TIME = os.getenv("CRON_MATCH_NOTIFICATION_START_TIME", "09:00")
\ No newline at end of file
+# Match notifications. Saving a match writes an outbox event, and a candidate's pending events are sent as one digest
+# once the oldest has waited NOTIFICATION_DIGEST_WINDOW_MINUTES, so nobody gets more than one message per window
+NOTIFICATION_DIGEST_WINDOW_MINUTES = int(os.getenv("NOTIFICATION_DIGEST_WINDOW_MINUTES", "10"))
+# Minutes between notification dispatcher runs, and digests sent per run (the rest wait for the next run)
+NOTIFICATION_DISPATCH_INTERVAL_MINUTES = int(os.getenv("NOTIFICATION_DISPATCH_INTERVAL_MINUTES", "2"))
+NOTIFICATION_MAX_DIGESTS_PER_RUN = int(os.getenv("NOTIFICATION_MAX_DIGESTS_PER_RUN", "200"))
+# Cron runs are guarded by a database lock shared by every replica. A tick finding the previous run still going is
+# skipped ("skip") or waits up to CRON_QUEUE_WAIT_SECONDS for it to finish ("queue")
+CRON_OVERLAP_POLICY = os.getenv("CRON_OVERLAP_POLICY", "skip")
+CRON_QUEUE_WAIT_SECONDS = int(os.getenv("CRON_QUEUE_WAIT_SECONDS", "3600"))
+# Seconds a tick may run late (e.g. the process was busy or restarting) before it's dropped, and random delay
+# added to each tick so replicas don't all hit the lock and external sites at the same instant
+CRON_MISFIRE_GRACE_SECONDS = int(os.getenv("CRON_MISFIRE_GRACE_SECONDS", "300"))
+CRON_JITTER_SECONDS = int(os.getenv("CRON_JITTER_SECONDS", "60"))
+
+# Database connection pool configuration
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT_SECONDS = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Server-side timeouts (Postgres only, 0 disables them)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.getenv("DB_IDLE_IN_TRANSACTION_TIMEOUT_MS", "60000"))
+# Connections checked out for longer than this are logged as potential leaks
+DB_LEAK_DETECTION_SECONDS = int(os.getenv("DB_LEAK_DETECTION_SECONDS", "300"))
+# Rows fetched per round trip when streaming large reads through a server-side cursor
+DB_STREAM_BATCH_SIZE = int(os.getenv("DB_STREAM_BATCH_SIZE", "500"))
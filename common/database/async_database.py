@@ -0,0 +1,87 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from common.config.config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_TIMEOUT_MS,
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS,
+)
+
+# Async drivers used for each sync backend in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def _async_engine_config(database_url: str) -> tuple[URL, dict]:
+    """Translate the sync DATABASE_URL into an async driver URL plus engine options"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS.get(backend, url.get_driver_name())}")
+
+    options = {
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+    }
+    if backend == "sqlite":
+        return url, options
+
+    options.update({
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+    })
+
+    if backend == "postgresql":
+        connect_args = {}
+        # asyncpg doesn't understand libpq's sslmode query param, it takes an ssl argument instead
+        if "sslmode" in url.query:
+            connect_args["ssl"] = url.query["sslmode"]
+            url = url.difference_update_query(["sslmode"])
+
+        server_settings = {}
+        if DB_STATEMENT_TIMEOUT_MS > 0:
+            server_settings["statement_timeout"] = str(DB_STATEMENT_TIMEOUT_MS)
+        if DB_IDLE_IN_TRANSACTION_TIMEOUT_MS > 0:
+            server_settings["idle_in_transaction_session_timeout"] = str(DB_IDLE_IN_TRANSACTION_TIMEOUT_MS)
+        if server_settings:
+            connect_args["server_settings"] = server_settings
+
+        if connect_args:
+            options["connect_args"] = connect_args
+
+    return url, options
+
+
+_async_url, _async_options = _async_engine_config(DATABASE_URL)
+async_engine = create_async_engine(_async_url, **_async_options)
+async_db_session = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+@asynccontextmanager
+async def async_unit_of_work() -> AsyncIterator[AsyncSession]:
+    """
+    Async counterpart of unit_of_work() for code running on the bot's event loop.
+    Commits on success, rolls back on error and always returns the connection to the pool.
+    """
+    async with async_db_session() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def dispose_async_engine():
+    """Close pooled async connections - call on application shutdown"""
+    await async_engine.dispose()
@@ -1,6 +1,165 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from common.config.config import DATABASE_URL
+import logging
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Iterator, Optional
 
-engine = create_engine(DATABASE_URL)
-db_session = sessionmaker(autoflush=False, bind=engine)
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+
+from common.config.config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_TIMEOUT_MS,
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS,
+    DB_LEAK_DETECTION_SECONDS,
+)
+
+
+def _engine_options(database_url: str) -> dict:
+    """Build pool and connection options for the configured backend"""
+    backend = make_url(database_url).get_backend_name()
+    options = {
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+    }
+
+    # SQLite (local runs) uses its own pool classes that don't accept sizing args
+    if backend == "sqlite":
+        return options
+
+    options.update({
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+    })
+
+    if backend == "postgresql":
+        server_settings = []
+        if DB_STATEMENT_TIMEOUT_MS > 0:
+            server_settings.append(f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}")
+        if DB_IDLE_IN_TRANSACTION_TIMEOUT_MS > 0:
+            server_settings.append(f"-c idle_in_transaction_session_timeout={DB_IDLE_IN_TRANSACTION_TIMEOUT_MS}")
+        if server_settings:
+            options["connect_args"] = {"options": " ".join(server_settings)}
+
+    return options
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+# expire_on_commit=False keeps loaded attributes usable after the unit of work closes the session
+db_session = sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
+
+# Thread-local session shared by every repository created inside a unit_of_work() block
+_scoped_session = scoped_session(db_session)
+_uow_state = threading.local()
+
+
+@contextmanager
+def unit_of_work() -> Iterator[Session]:
+    """
+    Open a unit of work shared by all repositories created inside the block.
+
+    The outermost block commits on success, rolls back on error and always returns the
+    connection to the pool. Nested blocks reuse the outer session.
+    """
+    depth = getattr(_uow_state, "depth", 0)
+    session = _scoped_session()
+    _uow_state.depth = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+    except Exception:
+        if depth == 0:
+            session.rollback()
+        raise
+    finally:
+        _uow_state.depth = depth
+        if depth == 0:
+            _scoped_session.remove()
+
+
+def current_session() -> Optional[Session]:
+    """Return the session of the active unit of work in this thread, if any"""
+    if getattr(_uow_state, "depth", 0) > 0:
+        return _scoped_session()
+    return None
+
+
+@contextmanager
+def dedicated_connection() -> Iterator[Connection]:
+    """
+    An autocommit connection held on purpose for a long time, e.g. to keep a session-level
+    advisory lock. It's never idle in a transaction and isn't reported as a leak.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.info["long_lived"] = True
+        try:
+            yield connection
+        finally:
+            connection.info.pop("long_lived", None)
+
+
+# Connection leak detection
+_checked_out_connections = {}
+_reported_leaks = set()
+_leak_lock = threading.Lock()
+_last_leak_scan = 0.0
+_LEAK_SCAN_INTERVAL_SECONDS = 30
+
+
+def log_leaked_connections(threshold_seconds: Optional[int] = None) -> int:
+    """
+    Log connections that have been checked out of the pool for longer than the threshold.
+    Each leaked connection is reported once, with the stack that checked it out.
+    Returns the number of connections currently over the threshold.
+    """
+    threshold = threshold_seconds if threshold_seconds is not None else DB_LEAK_DETECTION_SECONDS
+    now = time.monotonic()
+    leaked = 0
+
+    with _leak_lock:
+        for key, (checked_out_at, stack, connection_record) in _checked_out_connections.items():
+            held_for = now - checked_out_at
+            if held_for < threshold or connection_record.info.get("long_lived"):
+                continue
+            leaked += 1
+            if key in _reported_leaks:
+                continue
+            _reported_leaks.add(key)
+            logging.warning(
+                f"[Database] Connection held for {held_for:.0f}s without being returned to the pool. "
+                f"Checked out at:\n{''.join(traceback.format_list(stack))}"
+            )
+
+    if leaked:
+        logging.warning(f"[Database] {leaked} connection(s) over the leak threshold. Pool status: {engine.pool.status()}")
+    return leaked
+
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    global _last_leak_scan
+    # Drop the two innermost frames (SQLAlchemy pool internals and this listener)
+    stack = traceback.extract_stack(limit=12)[:-2]
+    with _leak_lock:
+        _checked_out_connections[id(connection_record)] = (time.monotonic(), stack, connection_record)
+
+    if DB_LEAK_DETECTION_SECONDS > 0 and time.monotonic() - _last_leak_scan > _LEAK_SCAN_INTERVAL_SECONDS:
+        _last_leak_scan = time.monotonic()
+        log_leaked_connections()
+
+
+@event.listens_for(engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    key = id(connection_record)
+    with _leak_lock:
+        _checked_out_connections.pop(key, None)
+        _reported_leaks.discard(key)
@@ -0,0 +1,57 @@
+"""
+Cross-process locks on the application database.
+
+On Postgres these are session-level advisory locks held on a dedicated connection: every process
+and replica sharing the database sees them, and the server releases them if the holder dies, so a
+crashed process never leaves a lock behind. Other backends (SQLite, local runs) fall back to
+in-process locks.
+"""
+
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from sqlalchemy import text
+
+from common.database.database import engine, dedicated_connection
+
+_local_locks: Dict[str, threading.Lock] = {}
+_local_locks_guard = threading.Lock()
+
+
+def advisory_lock_key(name: str) -> int:
+    """Stable signed 64-bit key for a lock name (Python's hash() changes between processes)"""
+    return int.from_bytes(hashlib.sha256(name.encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+@contextmanager
+def advisory_lock(name: str, wait_seconds: float = 0, poll_seconds: float = 1.0) -> Iterator[bool]:
+    """
+    Try to take the named lock, waiting up to wait_seconds for its holder to release it.
+    Yields whether it was acquired, the block runs either way
+    """
+    if engine.dialect.name != "postgresql":
+        with _local_locks_guard:
+            lock = _local_locks.setdefault(name, threading.Lock())
+        acquired = lock.acquire(timeout=wait_seconds) if wait_seconds > 0 else lock.acquire(blocking=False)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+        return
+
+    key = advisory_lock_key(name)
+    with dedicated_connection() as connection:
+        deadline = time.monotonic() + wait_seconds
+        acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(poll_seconds)
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
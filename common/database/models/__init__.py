@@ -2,4 +2,4 @@ from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
-from . import job_posting, candidate, match
+from . import job_posting, candidate, match, job_posting_technology, llm_cache_entry, workflow_run, task, cron_run, notification_outbox, run, match_filter
@@ -11,6 +11,8 @@ class Candidate(Base):
     location = Column(String(length=64), nullable=True)
     role = Column(String(length=64), nullable=True)
     language = Column(String(length=2), nullable=False, default='en')
+    # Hash of the profile fields the candidate was last matched with (null = never matched)
+    matched_profile_hash = Column(String(length=40), nullable=True)
 
     created_at = Column(DateTime, nullable=False, server_default=func.now()) # Add default value here
     updated_at = Column(DateTime, nullable=True)
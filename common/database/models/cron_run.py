@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Index, func
+
+from common.database.models import Base
+
+
+class CronRun(Base):
+    """One scheduled execution of a cron job, including ticks skipped because another run held the lock"""
+    __tablename__ = 'cron_runs'
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(length=64), nullable=False)
+    status = Column(String(length=16), nullable=False)  # running, succeeded, failed, skipped
+    # hostname:pid of the process that ran (or skipped) it
+    host = Column(String(length=128), nullable=False)
+    error = Column(Text, nullable=True)
+
+    started_at = Column(DateTime, nullable=False, server_default=func.now())
+    finished_at = Column(DateTime, nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+
+    __table_args__ = (
+        Index('ix_cron_runs_name_started_at', 'name', 'started_at'),
+    )
@@ -26,4 +26,7 @@ class JobPosting(Base):
     enriched_at = Column(DateTime, nullable=True)
     
     # Status field to track job availability
-    status = Column(String(length=32), default='active', nullable=False)  # active, expired, filled, error
\ No newline at end of file
+    status = Column(String(length=32), default='active', nullable=False)  # active, expired, filled, error
+
+    # Hash of the content the posting was last matched with (null = never matched)
+    matched_content_hash = Column(String(length=40), nullable=True)
\ No newline at end of file
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, SmallInteger, Index
+
+from common.database.models import Base
+
+
+class JobPostingTechnology(Base):
+    """Inverted index from canonical technology IDs (common.normalization.tech_stack) to job postings"""
+    __tablename__ = 'job_posting_technologies'
+
+    technology_id = Column(SmallInteger, primary_key=True)
+    job_posting_id = Column(Integer, primary_key=True)
+
+    # The primary key serves technology -> postings lookups, this one posting -> technologies
+    __table_args__ = (
+        Index('ix_job_posting_technologies_job_posting_id', 'job_posting_id'),
+    )
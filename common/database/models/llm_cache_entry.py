@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, func
+
+from common.database.models import Base
+
+
+class LLMCacheEntry(Base):
+    """Cached LLM generations, content-addressed by namespace (agent + prompt version), model settings and input"""
+    __tablename__ = 'llm_cache'
+
+    key = Column(String(length=64), primary_key=True)
+    namespace = Column(String(length=64), nullable=False)
+    response = Column(Text, nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0, server_default='0')
+
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    expires_at = Column(DateTime, nullable=True)
+    last_hit_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_llm_cache_namespace', 'namespace'),
+        Index('ix_llm_cache_expires_at', 'expires_at'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, func, DateTime, UniqueConstraint, CheckConstraint
+from sqlalchemy import Column, Integer, String, Float, func, DateTime, UniqueConstraint, CheckConstraint, Index
 
 from common.database.models import Base
 
@@ -18,7 +18,9 @@ class Match(Base):
     
     # Composite unique constraint to prevent duplicate matches
     # Check constraint to ensure only quality matches (score >= 60)
+    # Index backing the keyset pagination of a candidate's matches on (created_at, id)
     __table_args__ = (
         UniqueConstraint('candidate_id', 'job_posting_id', name='uq_matches_candidate_job'),
         CheckConstraint('match_score >= 60.0', name='chk_match_score_minimum'),
+        Index('ix_matches_candidate_created_at_id', 'candidate_id', 'created_at', 'id'),
     )
\ No newline at end of file
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Text, DateTime, func
+
+from common.database.models import Base
+
+
+class MatchFilter(Base):
+    """
+    /matches filters by content token. Page buttons only carry the token (callback data is limited to
+    64 bytes), any bot instance resolves it here
+    """
+    __tablename__ = 'match_filters'
+
+    token = Column(String(length=16), primary_key=True)
+    query = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
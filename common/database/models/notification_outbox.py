@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, DateTime, Index, func, text
+
+from common.database.models import Base
+
+
+class NotificationOutboxEvent(Base):
+    """
+    Transactional outbox of match notifications: a row is written in the same transaction that saves a
+    new (or re-scored, still un-notified) match, and the notification engine sends each candidate's
+    pending rows as one digest, then stamps dispatched_at
+    """
+    __tablename__ = 'notification_outbox'
+
+    id = Column(Integer, primary_key=True, index=True)
+    candidate_id = Column(Integer, nullable=False)
+    match_id = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    dispatched_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Backs the due candidates query
+        Index('ix_notification_outbox_dispatched_at_candidate_id', 'dispatched_at', 'candidate_id', 'created_at'),
+        # A match has at most one pending event, saving it again before the digest goes out is a no-op
+        Index(
+            'uq_notification_outbox_pending_match_id', 'match_id', unique=True,
+            postgresql_where=text("dispatched_at IS NULL"), sqlite_where=text("dispatched_at IS NULL"),
+        ),
+    )
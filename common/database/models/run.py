@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Index, func
+
+from common.database.models import Base
+
+
+class Run(Base):
+    """
+    Ledger entry of a cron or workflow execution: how long each stage took, what it processed and what it
+    cost. A run started inside another (a workflow run by a cron) points to it with parent_id, and its
+    totals are included in the parent's
+    """
+    __tablename__ = 'runs'
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(length=16), nullable=False)  # cron, workflow
+    name = Column(String(length=64), nullable=False)
+    status = Column(String(length=16), nullable=False)  # running, succeeded, failed
+    parent_id = Column(Integer, nullable=True)
+    # hostname:pid of the process that ran it
+    host = Column(String(length=128), nullable=False)
+
+    started_at = Column(DateTime, nullable=False, server_default=func.now())
+    finished_at = Column(DateTime, nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+    stages = Column(Text, nullable=True)  # JSON, stage -> seconds
+
+    items_processed = Column(Integer, nullable=False, default=0, server_default='0')
+    pages_fetched = Column(Integer, nullable=False, default=0, server_default='0')
+    cache_hits = Column(Integer, nullable=False, default=0, server_default='0')
+    cache_misses = Column(Integer, nullable=False, default=0, server_default='0')
+
+    llm_requests = Column(Integer, nullable=False, default=0, server_default='0')
+    prompt_tokens = Column(Integer, nullable=False, default=0, server_default='0')
+    completion_tokens = Column(Integer, nullable=False, default=0, server_default='0')
+    # Estimated from the model's list prices, 0 for models LangChain has no price for
+    cost_usd = Column(Float, nullable=False, default=0, server_default='0')
+
+    # Every named counter, e.g. per cache hits and misses
+    counters = Column(Text, nullable=True)  # JSON
+    errors = Column(Integer, nullable=False, default=0, server_default='0')
+    error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index('ix_runs_name_started_at', 'name', 'started_at'),
+        Index('ix_runs_parent_id', 'parent_id'),
+    )
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, func, text
+
+from common.database.models import Base
+
+
+class Task(Base):
+    """
+    Durable work queue item. Workers claim pending tasks with FOR UPDATE SKIP LOCKED under a lease,
+    a task whose lease runs out (crashed worker) is picked up again, and a task failing max_attempts
+    times is dead-lettered
+    """
+    __tablename__ = 'tasks'
+
+    id = Column(Integer, primary_key=True, index=True)
+    queue = Column(String(length=32), nullable=False)
+    payload = Column(Text, nullable=False, default='{}')  # JSON
+    status = Column(String(length=16), nullable=False, default='pending')  # pending, running, done, dead
+    # Pending tasks with the same key are enqueued once
+    dedupe_key = Column(String(length=128), nullable=True)
+
+    attempts = Column(Integer, nullable=False, default=0, server_default='0')
+    max_attempts = Column(Integer, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    # Not claimed before run_at, used for delayed tasks and retry backoff
+    run_at = Column(DateTime, nullable=False, server_default=func.now())
+    locked_by = Column(String(length=128), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Backs the claim query
+        Index('ix_tasks_queue_status_run_at', 'queue', 'status', 'run_at'),
+        Index('ix_tasks_status_lease_expires_at', 'status', 'lease_expires_at'),
+        Index(
+            'uq_tasks_pending_dedupe_key', 'dedupe_key', unique=True,
+            postgresql_where=text("status = 'pending'"), sqlite_where=text("status = 'pending'"),
+        ),
+    )
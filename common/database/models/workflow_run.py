@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, UniqueConstraint, func
+
+from common.database.models import Base
+
+
+class WorkflowRun(Base):
+    """Checkpoint of a job matching workflow run, so a crashed or restarted run resumes where it stopped"""
+    __tablename__ = 'workflow_runs'
+
+    id = Column(Integer, primary_key=True, index=True)
+    workflow = Column(String(length=64), nullable=False)
+    status = Column(String(length=16), nullable=False, default='running')  # running, completed, failed, abandoned
+    # Next stage to run, stages before it are done and skipped on resume
+    stage = Column(String(length=32), nullable=False)
+    attempts = Column(Integer, nullable=False, default=1, server_default='1')
+    error = Column(Text, nullable=True)
+
+    started_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_workflow_runs_workflow_status', 'workflow', 'status'),
+    )
+
+
+class WorkflowItem(Base):
+    """Progress of a job posting through a workflow run"""
+    __tablename__ = 'workflow_items'
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, nullable=False)
+    job_posting_id = Column(Integer, nullable=False)
+    # Last stage the posting completed: discovered, enriched, matched
+    stage = Column(String(length=16), nullable=False)
+    # Enrichment outcome: active, expired, error
+    status = Column(String(length=16), nullable=True)
+    error = Column(Text, nullable=True)
+
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('run_id', 'job_posting_id', name='uq_workflow_items_run_job_posting'),
+        Index('ix_workflow_items_run_stage', 'run_id', 'stage'),
+    )
@@ -0,0 +1,53 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from common.database.models.candidate import Candidate
+
+
+class AsyncCandidatesRepository:
+    """Async candidates data access for the Telegram bot, committed by async_unit_of_work()"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_by_id(self, id: int) -> Optional[Candidate]:
+        """Get candidate by telegram chat ID"""
+        result = await self.session.execute(
+            select(Candidate).where(Candidate.telegram_chat_id == id)
+        )
+        return result.scalars().first()
+
+    async def get_candidate_by_id(self, candidate_id: int) -> Optional[Candidate]:
+        """Get candidate by internal ID (not telegram_chat_id)"""
+        return await self.session.get(Candidate, candidate_id)
+
+    async def upsert_by_telegram_id(self, telegram_chat_id: int, changes: Dict[str, Any]) -> Optional[Row]:
+        """
+        Insert the candidate or update only the changed fields in a single statement.
+        Returns the resulting candidate columns, None when the row already held these values
+        and nothing was written.
+        """
+        insert = postgresql_insert if self.session.bind.dialect.name == "postgresql" else sqlite_insert
+        statement = insert(Candidate).values(
+            telegram_chat_id=telegram_chat_id,
+            **{"language": "en", **changes}
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[Candidate.telegram_chat_id],
+            set_={**changes, "updated_at": func.now()},
+            where=or_(*(getattr(Candidate, key).is_distinct_from(statement.excluded[key]) for key in changes)) if changes else None
+        ).returning(
+            Candidate.id,
+            Candidate.telegram_chat_id,
+            Candidate.role,
+            Candidate.location,
+            Candidate.tech_stack,
+            Candidate.language,
+        )
+        result = await self.session.execute(statement)
+        return result.one_or_none()
@@ -0,0 +1,22 @@
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from common.database.models.job_posting import JobPosting
+
+
+class AsyncJobPostingsRepository:
+    """Async job postings reads for the Telegram bot"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_job_postings_by_ids(self, job_ids: List[int]) -> List[JobPosting]:
+        """Get job postings by a list of IDs"""
+        if not job_ids:
+            return []
+        result = await self.session.execute(
+            select(JobPosting).where(JobPosting.id.in_(job_ids))
+        )
+        return list(result.scalars().all())
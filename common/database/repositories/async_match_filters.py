@@ -0,0 +1,26 @@
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from common.database.models.match_filter import MatchFilter
+
+
+class AsyncMatchFiltersRepository:
+    """Async /matches filter storage for the Telegram bot, committed by async_unit_of_work()"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def save(self, token: str, query: str):
+        """Tokens are derived from the query, a token already stored holds the same one"""
+        insert = postgresql_insert if self.session.bind.dialect.name == "postgresql" else sqlite_insert
+        await self.session.execute(
+            insert(MatchFilter).values(token=token, query=query).on_conflict_do_nothing(index_elements=[MatchFilter.token])
+        )
+
+    async def get_query(self, token: str) -> Optional[str]:
+        result = await self.session.execute(select(MatchFilter.query).where(MatchFilter.token == token))
+        return result.scalar_one_or_none()
@@ -0,0 +1,98 @@
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from common.database.models.job_posting import JobPosting
+from common.database.models.match import Match
+from common.database.repositories.matches import job_posting_search_filter
+
+
+class AsyncMatchesRepository:
+    """Async matches data access for the Telegram bot, committed by async_unit_of_work()"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_matches_by_candidate(self, candidate_id: int) -> List[Match]:
+        """Get all matches for a specific candidate"""
+        result = await self.session.execute(
+            select(Match)
+            .where(Match.candidate_id == candidate_id)
+            .order_by(Match.created_at.desc())
+        )
+        return list(result.scalars().all())
+
+    async def get_matches_by_candidate_with_filter(self, candidate_id: int, query: Optional[str] = None) -> List[Match]:
+        """Get matches for a specific candidate, optionally filtered by a job posting search query"""
+        if not query or query.strip() == "":
+            return await self.get_matches_by_candidate(candidate_id)
+
+        try:
+            result = await self.session.execute(
+                select(Match)
+                .join(JobPosting, Match.job_posting_id == JobPosting.id)
+                .where(
+                    Match.candidate_id == candidate_id,
+                    job_posting_search_filter(query)
+                )
+                .order_by(Match.created_at.desc())
+            )
+            return list(result.scalars().all())
+        except Exception as e:
+            logging.error(f"Error filtering matches for candidate {candidate_id} with query '{query}': {e}")
+            await self.session.rollback()
+            # Return empty list on error to prevent crashes
+            return []
+
+    async def get_matches_page(
+        self,
+        candidate_id: int,
+        query: Optional[str] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = 5
+    ) -> Tuple[List[Row], bool]:
+        """
+        Get one page of a candidate's matches, newest first, using keyset pagination on (created_at, id).
+
+        Args:
+            candidate_id: The candidate ID to filter by
+            query: Optional search query to filter job postings by
+            after: (created_at, id) of the last match on the previous page, None for the first page
+            limit: Page size
+
+        Returns:
+            The page rows, with only the match and job posting columns needed for display,
+            and whether there is a next page
+        """
+        statement = select(
+            Match.id,
+            Match.created_at,
+            Match.match_score,
+            Match.job_posting_id,
+            JobPosting.job_title,
+            JobPosting.company_name,
+            JobPosting.job_link,
+        ).join(
+            JobPosting, Match.job_posting_id == JobPosting.id
+        ).where(
+            Match.candidate_id == candidate_id
+        )
+
+        if query and query.strip():
+            statement = statement.where(job_posting_search_filter(query))
+
+        if after:
+            after_created_at, after_id = after
+            statement = statement.where(or_(
+                Match.created_at < after_created_at,
+                and_(Match.created_at == after_created_at, Match.id < after_id)
+            ))
+
+        # Fetch one extra row to know whether a next page exists without counting
+        statement = statement.order_by(Match.created_at.desc(), Match.id.desc()).limit(limit + 1)
+        rows = (await self.session.execute(statement)).all()
+        return rows[:limit], len(rows) > limit
@@ -0,0 +1,22 @@
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from common.database.database import db_session, current_session
+
+
+class BaseRepository:
+    """
+    Resolves the session a repository works with: an explicit one, the active
+    unit_of_work() session, or a standalone session owned by the repository.
+    """
+
+    def __init__(self, session: Optional[Session] = None):
+        shared_session = session or current_session()
+        self._owns_session = shared_session is None
+        self.session = shared_session or db_session()
+
+    def close_session(self):
+        """Close the session if this repository owns it - shared sessions are closed by their unit of work"""
+        if self.session and self._owns_session:
+            self.session.close()
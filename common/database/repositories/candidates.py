@@ -1,15 +1,46 @@
-from common.database.database import db_session
+from typing import Dict, Iterator, List
+
+from sqlalchemy import select, update
+from sqlalchemy.engine import Row
+
+from common.config.config import DB_STREAM_BATCH_SIZE
 from common.database.models.candidate import Candidate
+from common.database.repositories.base import BaseRepository
 from common.types.upsert_candidate_input import UpsertCandidateInput
 
+CANDIDATE_PROFILE_COLUMNS = (
+    Candidate.id,
+    Candidate.telegram_chat_id,
+    Candidate.tech_stack,
+    Candidate.location,
+    Candidate.role,
+    Candidate.language,
+    Candidate.created_at,
+    Candidate.updated_at,
+    Candidate.deleted_at,
+)
 
-class CandidatesRepository:
-    def __init__(self):
-        self.session = db_session()
 
+class CandidatesRepository(BaseRepository):
     def get_candidates(self):
         return self.session.query(Candidate).all()
 
+    def stream_candidates(self, *criteria, columns=CANDIDATE_PROFILE_COLUMNS, batch_size: int = DB_STREAM_BATCH_SIZE) -> Iterator[Row]:
+        """
+        Iterate over candidates matching the criteria through a server-side cursor,
+        batch_size rows at a time. The session must stay open while iterating.
+        """
+        statement = select(*columns).where(*criteria).order_by(Candidate.id).execution_options(yield_per=batch_size)
+        yield from self.session.execute(statement)
+
+    def set_matched_profile_hashes(self, profile_hashes: Dict[int, str]):
+        """Record the profile hash each candidate (by internal ID) was last matched with, in one bulk update"""
+        if profile_hashes:
+            self.session.execute(
+                update(Candidate),
+                [{"id": candidate_id, "matched_profile_hash": profile_hash} for candidate_id, profile_hash in profile_hashes.items()]
+            )
+
     def update(self, id: int, data: UpsertCandidateInput):
         candidate = self.session.query(Candidate).filter_by(telegram_chat_id=id).first()
         if candidate:
@@ -36,6 +67,10 @@ class CandidatesRepository:
         """Get candidate by internal ID (not telegram_chat_id)"""
         return self.session.query(Candidate).filter(Candidate.id == candidate_id).first()
     
+    def get_candidates_by_ids(self, candidate_ids: List[int]) -> List[Candidate]:
+        """Get candidates by internal IDs"""
+        return self.session.query(Candidate).filter(Candidate.id.in_(candidate_ids)).all()
+
     def get_candidates_with_telegram(self):
         """Get all candidates that have a telegram_chat_id"""
         return self.session.query(Candidate).filter(
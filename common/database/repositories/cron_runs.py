@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import select, update
+
+from common.database.models.cron_run import CronRun
+from common.database.repositories.base import BaseRepository
+
+
+class CronRunsRepository(BaseRepository):
+    def create_run(self, name: str, status: str, host: str, started_at: datetime, error: Optional[str] = None) -> int:
+        run = CronRun(name=name, status=status, host=host, started_at=started_at, error=error)
+        if status == "skipped":
+            run.finished_at = started_at
+        self.session.add(run)
+        self.session.flush()
+        return run.id
+
+    def finish_run(self, run_id: int, status: str, finished_at: datetime, duration_seconds: float, error: Optional[str] = None):
+        self.session.execute(
+            update(CronRun)
+            .where(CronRun.id == run_id)
+            .values(status=status, finished_at=finished_at, duration_seconds=duration_seconds, error=error)
+        )
+
+    def get_latest_runs(self, name: Optional[str] = None, limit: int = 20) -> List[CronRun]:
+        statement = select(CronRun).order_by(CronRun.started_at.desc(), CronRun.id.desc()).limit(limit)
+        if name:
+            statement = statement.where(CronRun.name == name)
+        return list(self.session.execute(statement).scalars())
@@ -1,14 +1,39 @@
+from common.config.config import DB_STREAM_BATCH_SIZE
 from common.database.models.job_posting import JobPosting
-from common.database.database import db_session
+from common.database.models.job_posting_technology import JobPostingTechnology
+from common.database.repositories.base import BaseRepository
+from common.normalization.tech_stack import job_posting_technologies, technology_ids, TECHNOLOGIES_BY_ID
 from datetime import datetime
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Set
 
+from sqlalchemy import delete, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
 
-class JobPostingsRepository:
-    def __init__(self) -> None:
-        self.session = db_session()
+# Columns the agent tools work with, leaving out the multi-KB enrichment Text columns
+JOB_POSTING_SUMMARY_COLUMNS = (
+    JobPosting.id,
+    JobPosting.job_title,
+    JobPosting.company_name,
+    JobPosting.job_link,
+    JobPosting.quick_description,
+    JobPosting.company_type,
+    JobPosting.industry,
+    JobPosting.tech_stack,
+    JobPosting.stage,
+)
 
+
+def job_postings_with_technologies(technologies: Iterable[str]):
+    """Job postings using any of the given canonical technologies, resolved through the technology index"""
+    return JobPosting.id.in_(
+        select(JobPostingTechnology.job_posting_id).where(
+            JobPostingTechnology.technology_id.in_(technology_ids(technologies))
+        )
+    )
+
+
+class JobPostingsRepository(BaseRepository):
     def save_job_postings(self, jobs_list: list[dict]):
         """
         Upsert job postings - update if exists (by job_link), insert if new
@@ -37,6 +62,7 @@ class JobPostingsRepository:
                     job_obj = JobPosting(**job_data)
                     self.session.add(job_obj)
                 
+                self._index_technologies(existing_job or job_obj)
                 # Commit each job individually to avoid transaction conflicts
                 self.session.commit()
                 successful_upserts += 1
@@ -52,7 +78,7 @@ class JobPostingsRepository:
         if failed_upserts > 0:
             raise Exception(f"Failed to upsert {failed_upserts} job postings")
         
-        self.session.close()
+        self.close_session()
 
     def upsert_job_posting(self, job_data: dict):
         """
@@ -75,6 +101,7 @@ class JobPostingsRepository:
                 self.session.add(job_obj)
                 print(f"Inserted new job: {job_data['job_title']}")
             
+            self._index_technologies(existing_job or job_obj)
             self.session.commit()
             return existing_job or job_obj
             
@@ -82,6 +109,27 @@ class JobPostingsRepository:
             self.session.rollback()
             raise e
 
+    def _index_technologies(self, job: JobPosting):
+        """Replace the technology index entries of a job posting with the ones from its current content"""
+        self.session.flush()
+        self.session.execute(delete(JobPostingTechnology).where(JobPostingTechnology.job_posting_id == job.id))
+        self.session.add_all(
+            JobPostingTechnology(technology_id=technology_id, job_posting_id=job.id)
+            for technology_id in technology_ids(job_posting_technologies(job.job_title, job.quick_description, job.tech_stack))
+        )
+
+    def get_technologies_by_job_posting(self, job_posting_ids: Optional[Iterable[int]] = None) -> Dict[int, Set[str]]:
+        """Canonical technologies of each job posting, read from the technology index"""
+        statement = select(JobPostingTechnology.job_posting_id, JobPostingTechnology.technology_id)
+        if job_posting_ids is not None:
+            statement = statement.where(JobPostingTechnology.job_posting_id.in_(list(job_posting_ids)))
+
+        technologies: Dict[int, Set[str]] = {}
+        for job_posting_id, technology_id in self.session.execute(statement.execution_options(yield_per=DB_STREAM_BATCH_SIZE)):
+            if technology_id in TECHNOLOGIES_BY_ID:
+                technologies.setdefault(job_posting_id, set()).add(TECHNOLOGIES_BY_ID[technology_id])
+        return technologies
+
     def get_job_postings(self):
         return self.session.query(JobPosting).all()
     
@@ -91,6 +139,35 @@ class JobPostingsRepository:
             JobPosting.enriched_at.is_(None)
         ).all()
     
+    def stream_job_postings(self, *criteria, columns=JOB_POSTING_SUMMARY_COLUMNS, batch_size: int = DB_STREAM_BATCH_SIZE) -> Iterator[Row]:
+        """
+        Iterate over job postings matching the criteria, projecting only the given columns.
+        Rows are fetched batch_size at a time through a server-side cursor, so memory stays
+        bounded regardless of table size. The session must stay open while iterating.
+        """
+        statement = select(*columns).where(*criteria).order_by(JobPosting.id).execution_options(yield_per=batch_size)
+        yield from self.session.execute(statement)
+
+    def stream_unenriched_job_postings(self, **kwargs) -> Iterator[Row]:
+        """Stream job postings that haven't been enriched yet (enriched_at is null)"""
+        return self.stream_job_postings(JobPosting.enriched_at.is_(None), **kwargs)
+
+    def stream_job_postings_without_details(self, **kwargs) -> Iterator[Row]:
+        """Stream job postings that don't have detailed descriptions yet"""
+        return self.stream_job_postings(JobPosting.detailed_description.is_(None), **kwargs)
+
+    def stream_active_job_postings(self, *criteria, **kwargs) -> Iterator[Row]:
+        """Stream only active job postings (not expired, filled, or error)"""
+        return self.stream_job_postings(JobPosting.status == 'active', *criteria, **kwargs)
+
+    def set_matched_content_hashes(self, content_hashes: Dict[int, str]):
+        """Record the content hash each job posting was last matched with, in one bulk update"""
+        if content_hashes:
+            self.session.execute(
+                update(JobPosting),
+                [{"id": job_id, "matched_content_hash": content_hash} for job_id, content_hash in content_hashes.items()]
+            )
+
     def get_job_postings_by_ids(self, job_ids: List[int]):
         """Get job postings by a list of IDs"""
         return self.session.query(JobPosting).filter(JobPosting.id.in_(job_ids)).all()
@@ -156,6 +233,17 @@ class JobPostingsRepository:
             raise e
         # Don't close session here - let the caller manage it
     
+    def bulk_update_enrichment(self, updates: List[Dict]):
+        """
+        Apply enrichment results in as few statements as possible. Each dict holds the posting id and the
+        columns to set, rows setting the same columns go in one executemany UPDATE.
+        """
+        groups: Dict[tuple, List[Dict]] = {}
+        for row in updates:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        for rows in groups.values():
+            self.session.execute(update(JobPosting), rows)
+
     def get_by_id(self, job_id: int):
         """Get a single job posting by ID"""
         try:
@@ -181,9 +269,4 @@ class JobPostingsRepository:
         except Exception as e:
             self.session.rollback()
             raise e
-        # Don't close session here - let the caller manage it
-
-    def close_session(self):
-        """Close the session - call this when done with the repository"""
-        if self.session:
-            self.session.close()
\ No newline at end of file
+        # Don't close session here - let the caller manage it
\ No newline at end of file
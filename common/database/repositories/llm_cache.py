@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from common.database.models.llm_cache_entry import LLMCacheEntry
+from common.database.repositories.base import BaseRepository
+
+
+def _not_expired(now: datetime):
+    return or_(LLMCacheEntry.expires_at.is_(None), LLMCacheEntry.expires_at > now)
+
+
+class LLMCacheRepository(BaseRepository):
+    def get_response(self, key: str, now: datetime) -> Optional[str]:
+        """Cached response for the key, or None if missing or expired. Hits are counted on the entry"""
+        response = self.session.execute(
+            select(LLMCacheEntry.response).where(LLMCacheEntry.key == key, _not_expired(now))
+        ).scalar_one_or_none()
+        if response is not None:
+            self.session.execute(
+                update(LLMCacheEntry)
+                .where(LLMCacheEntry.key == key)
+                .values(hit_count=LLMCacheEntry.hit_count + 1, last_hit_at=now)
+            )
+        return response
+
+    def put_response(self, key: str, namespace: str, response: str, now: datetime, expires_at: Optional[datetime]):
+        """Insert or replace (e.g. after expiry) the cached response for the key"""
+        insert = postgresql_insert if self.session.bind.dialect.name == "postgresql" else sqlite_insert
+        statement = insert(LLMCacheEntry).values(
+            key=key, namespace=namespace, response=response, hit_count=0, created_at=now, expires_at=expires_at,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[LLMCacheEntry.key],
+            set_={
+                "response": statement.excluded.response,
+                "hit_count": 0,
+                "created_at": statement.excluded.created_at,
+                "expires_at": statement.excluded.expires_at,
+                "last_hit_at": None,
+            },
+        )
+        self.session.execute(statement)
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        statement = delete(LLMCacheEntry)
+        if namespace:
+            statement = statement.where(LLMCacheEntry.namespace == namespace)
+        return self.session.execute(statement).rowcount
+
+    def purge_expired(self, now: datetime) -> int:
+        return self.session.execute(
+            delete(LLMCacheEntry).where(LLMCacheEntry.expires_at <= now)
+        ).rowcount
+
+    def get_stats_by_namespace(self, now: datetime) -> Dict[str, Dict[str, int]]:
+        """Entries, live (unexpired) entries and total hits per namespace"""
+        rows = self.session.execute(
+            select(
+                LLMCacheEntry.namespace,
+                func.count(),
+                func.count().filter(_not_expired(now)),
+                func.coalesce(func.sum(LLMCacheEntry.hit_count), 0),
+            ).group_by(LLMCacheEntry.namespace).order_by(LLMCacheEntry.namespace)
+        )
+        return {namespace: {"entries": entries, "live": live, "hits": hits} for namespace, entries, live, hits in rows}
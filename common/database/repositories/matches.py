@@ -2,17 +2,48 @@ from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from typing import List, Optional
 from sqlalchemy import or_, and_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 import logging
 
-from common.database.database import db_session
 from common.database.models.match import Match
 from common.database.models.job_posting import JobPosting
+from common.database.repositories.base import BaseRepository
+from common.database.repositories.job_posting import job_postings_with_technologies
+from common.database.repositories.notification_outbox import NotificationOutboxRepository
+from common.normalization.tech_stack import normalize_technology, related_technologies
 
 
-class MatchesRepository:
-    def __init__(self):
-        self.session = db_session()
+def job_posting_search_filter(query: str):
+    """
+    Filter job postings by a search query. Queries naming a known technology ("nodejs", "Node.js")
+    are resolved through the technology index, including the technologies in its ecosystem. The
+    index only covers the title, quick description and tech stack, so the enriched columns are
+    still matched as text. Anything else is a case-insensitive match against the searchable job
+    posting columns.
+    """
+    search_term = f"%{query.strip().lower()}%"
+    technology = normalize_technology(query)
+    if technology:
+        return or_(
+            job_postings_with_technologies(related_technologies(technology)),
+            JobPosting.detailed_description.ilike(search_term),
+            JobPosting.requirements.ilike(search_term),
+        )
 
+    return or_(
+        JobPosting.job_title.ilike(search_term),
+        JobPosting.company_name.ilike(search_term),
+        JobPosting.quick_description.ilike(search_term),
+        JobPosting.detailed_description.ilike(search_term),
+        JobPosting.requirements.ilike(search_term),
+        JobPosting.tech_stack.ilike(search_term),
+        JobPosting.industry.ilike(search_term),
+        JobPosting.company_type.ilike(search_term)
+    )
+
+
+class MatchesRepository(BaseRepository):
     def save_matches(self, matches_list: list[dict]):
         """
         Upsert matches - update if exists (by candidate_id + job_posting_id), insert if new
@@ -41,6 +72,8 @@ class MatchesRepository:
                     print(f"Inserting new match for candidate {match_data['candidate_id']} and job {match_data['job_posting_id']}")
                     match_obj = Match(**match_data)
                     self.session.add(match_obj)
+                    self.session.flush()
+                self._add_notification_events([match_data])
                 
                 # Commit each match individually to avoid transaction conflicts
                 self.session.commit()
@@ -57,8 +90,39 @@ class MatchesRepository:
         if failed_upserts > 0:
             raise Exception(f"Failed to upsert {failed_upserts} matches")
         
-        self.session.close()
+        self.close_session()
     
+    def bulk_upsert_matches(self, matches_list: List[dict]) -> int:
+        """
+        Upsert matches in a single INSERT ... ON CONFLICT statement on (candidate_id, job_posting_id).
+        Existing matches get the new score and notes but keep created_at and notified_at.
+        Matches not notified yet get a notification outbox event in the same transaction.
+        """
+        if not matches_list:
+            return 0
+
+        insert = postgresql_insert if self.session.bind.dialect.name == "postgresql" else sqlite_insert
+        statement = insert(Match).values([
+            {key: match[key] for key in ('candidate_id', 'job_posting_id', 'match_score', 'strengths', 'weaknesses')}
+            for match in matches_list
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=[Match.candidate_id, Match.job_posting_id],
+            set_={
+                'match_score': statement.excluded.match_score,
+                'strengths': statement.excluded.strengths,
+                'weaknesses': statement.excluded.weaknesses,
+            }
+        )
+        self.session.execute(statement)
+        self._add_notification_events(matches_list)
+        return len(matches_list)
+
+    def _add_notification_events(self, matches_list: List[dict]):
+        NotificationOutboxRepository(self.session).add_match_events(
+            [(match['candidate_id'], match['job_posting_id']) for match in matches_list], datetime.now()
+        )
+
     def upsert_match(self, match_data: dict):
         """
         Upsert a single match
@@ -79,7 +143,9 @@ class MatchesRepository:
                 # Insert new match
                 match_obj = Match(**match_data)
                 self.session.add(match_obj)
+                self.session.flush()
                 print(f"Inserted new match for candidate {match_data['candidate_id']} and job {match_data['job_posting_id']}")
+            self._add_notification_events([match_data])
             
             self.session.commit()
             return existing_match or match_obj
@@ -101,6 +167,13 @@ class MatchesRepository:
             Match.notified_at.is_(None)
         ).all()
     
+    def get_unnotified_matches_by_ids(self, match_ids: List[int]) -> List[Match]:
+        """Matches among the given IDs that haven't been notified yet, best first"""
+        return self.session.query(Match).filter(
+            Match.id.in_(match_ids),
+            Match.notified_at.is_(None)
+        ).order_by(Match.match_score.desc()).all()
+
     def get_matches_by_candidate(self, candidate_id: int) -> List[Match]:
         """Get all matches for a specific candidate"""
         return self.session.query(Match).filter(
@@ -125,25 +198,13 @@ class MatchesRepository:
                     Match.candidate_id == candidate_id
                 ).order_by(Match.created_at.desc()).all()
             
-            # Clean and prepare the search query
-            search_term = f"%{query.strip().lower()}%"
-            
             # Use explicit join with ON clause to avoid ambiguity
             # Join Match with JobPosting on job_posting_id
             filtered_query = self.session.query(Match).join(
                 JobPosting, Match.job_posting_id == JobPosting.id
             ).filter(
                 Match.candidate_id == candidate_id,
-                or_(
-                    JobPosting.job_title.ilike(search_term),
-                    JobPosting.company_name.ilike(search_term),
-                    JobPosting.quick_description.ilike(search_term),
-                    JobPosting.detailed_description.ilike(search_term),
-                    JobPosting.requirements.ilike(search_term),
-                    JobPosting.tech_stack.ilike(search_term),
-                    JobPosting.industry.ilike(search_term),
-                    JobPosting.company_type.ilike(search_term)
-                )
+                job_posting_search_filter(query)
             ).order_by(Match.created_at.desc())
             
             return filtered_query.all()
@@ -189,9 +250,4 @@ class MatchesRepository:
             self.session.commit()
         except Exception as e:
             self.session.rollback()
-            raise e
-
-    def close_session(self):
-        """Close the session - call this when done with the repository"""
-        if self.session:
-            self.session.close()
\ No newline at end of file
+            raise e
\ No newline at end of file
@@ -0,0 +1,99 @@
+from datetime import datetime
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import func, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from common.database.models.match import Match
+from common.database.models.notification_outbox import NotificationOutboxEvent
+from common.database.repositories.base import BaseRepository
+
+
+class NotificationOutboxRepository(BaseRepository):
+    def add_match_events(self, pairs: Iterable[Tuple[int, int]], now: datetime) -> int:
+        """
+        Write an outbox event for each saved (candidate_id, job_posting_id) match that hasn't been notified.
+        Runs in the caller's transaction, so the events commit or roll back with the matches themselves.
+        """
+        pairs = list(set(pairs))
+        if not pairs:
+            return 0
+        rows = self.session.execute(
+            select(Match.id, Match.candidate_id).where(
+                tuple_(Match.candidate_id, Match.job_posting_id).in_(pairs),
+                Match.notified_at.is_(None),
+            )
+        ).all()
+        return self._insert_events([{"candidate_id": row.candidate_id, "match_id": row.id} for row in rows], now)
+
+    def add_unnotified_since(self, since: datetime, now: datetime) -> int:
+        """Events for the un-notified matches created since a date, e.g. matches saved before the outbox existed"""
+        rows = self.session.execute(
+            select(Match.id, Match.candidate_id).where(Match.created_at >= since, Match.notified_at.is_(None))
+        ).all()
+        return self._insert_events([{"candidate_id": row.candidate_id, "match_id": row.id} for row in rows], now)
+
+    def _insert_events(self, events: List[dict], now: datetime) -> int:
+        if not events:
+            return 0
+        insert = postgresql_insert if self.session.bind.dialect.name == "postgresql" else sqlite_insert
+        statement = insert(NotificationOutboxEvent).values([{**event, "created_at": now} for event in events])
+        statement = statement.on_conflict_do_nothing(
+            index_elements=[NotificationOutboxEvent.match_id], index_where=text("dispatched_at IS NULL")
+        )
+        return self.session.execute(statement).rowcount
+
+    def get_due_candidate_ids(self, due_before: datetime, limit: int) -> List[int]:
+        """Candidates whose oldest pending event was written before due_before, longest waiting first"""
+        oldest = func.min(NotificationOutboxEvent.created_at)
+        return list(self.session.execute(
+            select(NotificationOutboxEvent.candidate_id)
+            .where(NotificationOutboxEvent.dispatched_at.is_(None))
+            .group_by(NotificationOutboxEvent.candidate_id)
+            .having(oldest <= due_before)
+            .order_by(oldest)
+            .limit(limit)
+        ).scalars())
+
+    def get_pending_events(self, candidate_ids: List[int]) -> List[NotificationOutboxEvent]:
+        return list(self.session.execute(
+            select(NotificationOutboxEvent)
+            .where(NotificationOutboxEvent.candidate_id.in_(candidate_ids), NotificationOutboxEvent.dispatched_at.is_(None))
+            .order_by(NotificationOutboxEvent.id)
+        ).scalars())
+
+    def mark_dispatched(self, event_ids: List[int], notified_match_ids: List[int], now: datetime):
+        """
+        Close the sent events and stamp their matches as notified in one transaction. Events written while the
+        digest was being sent aren't in event_ids and stay pending for the next digest
+        """
+        if event_ids:
+            self.session.execute(
+                update(NotificationOutboxEvent)
+                .where(NotificationOutboxEvent.id.in_(event_ids), NotificationOutboxEvent.dispatched_at.is_(None))
+                .values(dispatched_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        if notified_match_ids:
+            self.session.execute(
+                update(Match)
+                .where(Match.id.in_(notified_match_ids), Match.notified_at.is_(None))
+                .values(notified_at=now)
+                .execution_options(synchronize_session=False)
+            )
+
+    def get_stats(self, now: datetime) -> dict:
+        row = self.session.execute(
+            select(
+                func.count(NotificationOutboxEvent.id),
+                func.count(func.distinct(NotificationOutboxEvent.candidate_id)),
+                func.min(NotificationOutboxEvent.created_at),
+            ).where(NotificationOutboxEvent.dispatched_at.is_(None))
+        ).one()
+        pending, candidates, oldest = row
+        return {
+            "pending_events": pending,
+            "pending_candidates": candidates,
+            "oldest_pending_minutes": round((now - oldest).total_seconds() / 60, 1) if oldest else None,
+        }
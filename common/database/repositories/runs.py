@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import select, update
+
+from common.database.models.run import Run
+from common.database.repositories.base import BaseRepository
+
+
+class RunsRepository(BaseRepository):
+    def create_run(self, kind: str, name: str, host: str, started_at: datetime, parent_id: Optional[int] = None) -> int:
+        run = Run(kind=kind, name=name, status="running", host=host, started_at=started_at, parent_id=parent_id)
+        self.session.add(run)
+        self.session.flush()
+        return run.id
+
+    def finish_run(self, run_id: int, **values):
+        self.session.execute(update(Run).where(Run.id == run_id).values(**values))
+
+    def get_run(self, run_id: int) -> Optional[Run]:
+        return self.session.get(Run, run_id)
+
+    def get_latest_runs(self, name: Optional[str] = None, limit: int = 20, include_children: bool = False) -> List[Run]:
+        statement = select(Run).order_by(Run.started_at.desc(), Run.id.desc()).limit(limit)
+        if name:
+            statement = statement.where(Run.name == name)
+        elif not include_children:
+            statement = statement.where(Run.parent_id.is_(None))
+        return list(self.session.execute(statement).scalars())
+
+    def get_previous_runs(self, run: Run, limit: int) -> List[Run]:
+        """Finished successful runs of the same name before the given one, latest first"""
+        return list(self.session.execute(
+            select(Run)
+            .where(Run.name == run.name, Run.status == "succeeded", Run.started_at < run.started_at)
+            .order_by(Run.started_at.desc())
+            .limit(limit)
+        ).scalars())
+
+    def get_children(self, run_id: int) -> List[Run]:
+        return list(self.session.execute(select(Run).where(Run.parent_id == run_id).order_by(Run.id)).scalars())
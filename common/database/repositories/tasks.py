@@ -0,0 +1,175 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, delete, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import aliased
+
+from common.database.models.task import Task
+from common.database.repositories.base import BaseRepository
+
+
+class TasksRepository(BaseRepository):
+    def enqueue(self, rows: List[Dict]) -> int:
+        """
+        Insert tasks, each dict with queue, payload, max_attempts, run_at and optionally dedupe_key.
+        Tasks whose dedupe_key is already pending are skipped. Returns the number of tasks inserted
+        """
+        if not rows:
+            return 0
+        insert = postgresql_insert if self.session.bind.dialect.name == "postgresql" else sqlite_insert
+        statement = insert(Task).on_conflict_do_nothing(
+            index_elements=[Task.dedupe_key], index_where=text("status = 'pending'")
+        )
+        inserted = 0
+        # One statement per task, so skipped duplicates don't count as inserted
+        for row in rows:
+            inserted += self.session.execute(
+                statement.values({"status": "pending", "attempts": 0, "created_at": row["run_at"], **row})
+            ).rowcount
+        return inserted
+
+    def claim(self, queues: Optional[Iterable[str]], worker_id: str, limit: int, now: datetime, lease_until: datetime) -> List[Task]:
+        """
+        Lease up to limit due tasks to the worker. On Postgres the candidate rows are locked with
+        FOR UPDATE SKIP LOCKED, so concurrent workers never block on or claim the same task
+        """
+        criteria = [Task.status == "pending", Task.run_at <= now]
+        if queues:
+            criteria.append(Task.queue.in_(list(queues)))
+        task_ids = list(self.session.execute(
+            select(Task.id).where(*criteria).order_by(Task.run_at, Task.id).limit(limit).with_for_update(skip_locked=True)
+        ).scalars())
+        if not task_ids:
+            return []
+
+        self.session.execute(
+            update(Task)
+            .where(Task.id.in_(task_ids), Task.status == "pending")
+            .values(status="running", locked_by=worker_id, lease_expires_at=lease_until, attempts=Task.attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return list(self.session.execute(
+            select(Task).where(Task.id.in_(task_ids), Task.locked_by == worker_id).order_by(Task.run_at, Task.id)
+            .execution_options(populate_existing=True)
+        ).scalars())
+
+    def extend_leases(self, task_ids: List[int], worker_id: str, lease_until: datetime) -> int:
+        if not task_ids:
+            return 0
+        return self.session.execute(
+            update(Task)
+            .where(Task.id.in_(task_ids), Task.status == "running", Task.locked_by == worker_id)
+            .values(lease_expires_at=lease_until)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    def complete(self, task_id: int, worker_id: str, now: datetime) -> bool:
+        """False if the worker lost its lease and the task was handed to another worker"""
+        return self.session.execute(
+            update(Task)
+            .where(Task.id == task_id, Task.status == "running", Task.locked_by == worker_id)
+            .values(status="done", finished_at=now, lease_expires_at=None, last_error=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+
+    def _requeue(self, criteria: list, values: Dict, now: datetime) -> int:
+        """
+        Set the tasks matching criteria back to pending. Only one task per dedupe_key can be pending,
+        a task whose key is already pending again is superseded by that task and finished instead.
+        Returns the number of tasks requeued or superseded
+        """
+        pending = aliased(Task)
+        pending_duplicate = select(pending.id).where(
+            pending.dedupe_key == Task.dedupe_key, pending.status == "pending", pending.id != Task.id
+        ).exists()
+        changed = self.session.execute(
+            update(Task)
+            .where(*criteria, Task.dedupe_key.is_(None))
+            .values(status="pending", **values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        keyed_ids = list(self.session.execute(
+            select(Task.id).where(*criteria, Task.dedupe_key.isnot(None)).order_by(Task.id)
+        ).scalars())
+        if not keyed_ids:
+            return changed
+        # One statement per task, so of several tasks sharing a key only the first is requeued
+        for task_id in keyed_ids:
+            changed += self.session.execute(
+                update(Task)
+                .where(Task.id == task_id, *criteria, ~pending_duplicate)
+                .values(status="pending", **values)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        # The requeued ones no longer match the criteria, the rest have a pending duplicate
+        return changed + self.session.execute(
+            update(Task)
+            .where(Task.id.in_(keyed_ids), *criteria)
+            .values(
+                status="done", finished_at=now, locked_by=None, lease_expires_at=None,
+                last_error="Superseded by a pending task with the same dedupe key",
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    def fail(self, task_id: int, worker_id: str, error: str, now: datetime, retry_at: Optional[datetime]) -> bool:
+        """Back to pending until retry_at, or dead-lettered when retry_at is None"""
+        criteria = [Task.id == task_id, Task.status == "running", Task.locked_by == worker_id]
+        values = {"last_error": error, "locked_by": None, "lease_expires_at": None}
+        if retry_at:
+            return self._requeue(criteria, {**values, "run_at": retry_at}, now) == 1
+        return self.session.execute(
+            update(Task)
+            .where(*criteria)
+            .values(status="dead", finished_at=now, **values)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+
+    def requeue_expired_leases(self, now: datetime) -> int:
+        """Tasks of crashed or stuck workers go back to pending, or dead once out of attempts"""
+        expired = [Task.status == "running", Task.lease_expires_at < now]
+        values = {"last_error": "Lease expired", "locked_by": None, "lease_expires_at": None}
+        dead = self.session.execute(
+            update(Task)
+            .where(*expired, Task.attempts >= Task.max_attempts)
+            .values(status="dead", finished_at=now, **values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        return dead + self._requeue(expired, values, now)
+
+    def retry_dead(self, now: datetime, queue: Optional[str] = None) -> int:
+        """Give dead-lettered tasks a fresh set of attempts"""
+        criteria = [Task.status == "dead"]
+        if queue:
+            criteria.append(Task.queue == queue)
+        return self._requeue(criteria, {"attempts": 0, "run_at": now, "finished_at": None}, now)
+
+    def purge_done(self, before: datetime) -> int:
+        return self.session.execute(
+            delete(Task).where(Task.status == "done", Task.finished_at < before)
+        ).rowcount
+
+    def get_dead_tasks(self, queue: Optional[str] = None, limit: int = 20) -> List[Task]:
+        statement = select(Task).where(Task.status == "dead").order_by(Task.finished_at.desc()).limit(limit)
+        if queue:
+            statement = statement.where(Task.queue == queue)
+        return list(self.session.execute(statement).scalars())
+
+    def get_stats(self, now: datetime) -> Dict[str, Dict[str, int]]:
+        """Tasks per queue and status, plus how many pending ones are due"""
+        rows = self.session.execute(
+            select(
+                Task.queue,
+                Task.status,
+                func.count(),
+                func.count().filter(and_(Task.status == "pending", Task.run_at <= now)),
+            ).group_by(Task.queue, Task.status).order_by(Task.queue, Task.status)
+        )
+        stats: Dict[str, Dict[str, int]] = {}
+        for queue, status, count, due in rows:
+            stats.setdefault(queue, {"due": 0})[status] = count
+            stats[queue]["due"] += due
+        return stats
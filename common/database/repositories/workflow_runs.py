@@ -0,0 +1,131 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from common.database.models.job_posting import JobPosting
+from common.database.models.workflow_run import WorkflowRun, WorkflowItem
+from common.database.repositories.base import BaseRepository
+
+# Runs a restart picks up again
+RESUMABLE_STATUSES = ("running", "failed")
+
+
+class WorkflowRunsRepository(BaseRepository):
+    def create_run(self, workflow: str, stage: str, now: datetime) -> WorkflowRun:
+        run = WorkflowRun(workflow=workflow, status="running", stage=stage, attempts=1, started_at=now, updated_at=now)
+        self.session.add(run)
+        self.session.flush()
+        return run
+
+    def get_run(self, run_id: int) -> Optional[WorkflowRun]:
+        return self.session.get(WorkflowRun, run_id)
+
+    def get_resumable_run(self, workflow: str) -> Optional[WorkflowRun]:
+        """Latest run of the workflow that crashed, failed or was interrupted"""
+        return self.session.execute(
+            select(WorkflowRun)
+            .where(WorkflowRun.workflow == workflow, WorkflowRun.status.in_(RESUMABLE_STATUSES))
+            .order_by(WorkflowRun.id.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+
+    def list_runs(self, limit: int = 20, workflow: Optional[str] = None) -> List[WorkflowRun]:
+        statement = select(WorkflowRun).order_by(WorkflowRun.id.desc()).limit(limit)
+        if workflow:
+            statement = statement.where(WorkflowRun.workflow == workflow)
+        return list(self.session.execute(statement).scalars())
+
+    def update_run(self, run_id: int, **values):
+        self.session.execute(update(WorkflowRun).where(WorkflowRun.id == run_id).values(**values))
+
+    def add_items(self, run_id: int, job_posting_ids: Iterable[int], now: datetime):
+        """Register job postings as discovered by the run, postings already in it are left as they are"""
+        rows = [
+            {"run_id": run_id, "job_posting_id": job_posting_id, "stage": "discovered", "updated_at": now}
+            for job_posting_id in set(job_posting_ids)
+        ]
+        if not rows:
+            return
+        insert = postgresql_insert if self.session.bind.dialect.name == "postgresql" else sqlite_insert
+        self.session.execute(
+            insert(WorkflowItem).on_conflict_do_nothing(index_elements=[WorkflowItem.run_id, WorkflowItem.job_posting_id]),
+            rows,
+        )
+
+    def get_item_job_posting_ids(self, run_id: int, stage: Optional[str] = None, status: Optional[str] = None) -> List[int]:
+        statement = select(WorkflowItem.job_posting_id).where(WorkflowItem.run_id == run_id).order_by(WorkflowItem.id)
+        if stage:
+            statement = statement.where(WorkflowItem.stage == stage)
+        if status:
+            statement = statement.where(WorkflowItem.status == status)
+        return list(self.session.execute(statement).scalars())
+
+    def update_items(self, run_id: int, updates: List[Dict]):
+        """
+        Record item progress in one executemany UPDATE. Each dict holds the job_posting_id and its
+        new stage, status and error
+        """
+        if not updates:
+            return
+        # Core table update, the ORM would expect the primary key in every row
+        items = WorkflowItem.__table__
+        self.session.execute(
+            update(items)
+            .where(items.c.run_id == run_id, items.c.job_posting_id == bindparam("item_job_posting_id"))
+            .values(
+                stage=bindparam("item_stage"),
+                status=bindparam("item_status"),
+                error=bindparam("item_error"),
+                updated_at=bindparam("item_updated_at"),
+            ),
+            [
+                {
+                    "item_job_posting_id": row["job_posting_id"],
+                    "item_stage": row["stage"],
+                    "item_status": row.get("status"),
+                    "item_error": row.get("error"),
+                    "item_updated_at": row["updated_at"],
+                }
+                for row in updates
+            ],
+        )
+
+    def advance_items(self, run_id: int, from_stage: str, to_stage: str, now: datetime, status: Optional[str] = None) -> int:
+        """Move the run's items in from_stage (and with the given status) to to_stage"""
+        statement = update(WorkflowItem).where(WorkflowItem.run_id == run_id, WorkflowItem.stage == from_stage)
+        if status:
+            statement = statement.where(WorkflowItem.status == status)
+        return self.session.execute(statement.values(stage=to_stage, updated_at=now)).rowcount
+
+    def sync_enriched_items(self, run_id: int, now: datetime) -> int:
+        """
+        Move discovered items whose job posting was enriched without going through the run's checkpoint
+        (enriched before, or by the enricher agent) to enriched, with the posting's status
+        """
+        return self.session.execute(
+            update(WorkflowItem)
+            .where(
+                WorkflowItem.run_id == run_id,
+                WorkflowItem.stage == "discovered",
+                WorkflowItem.job_posting_id.in_(select(JobPosting.id).where(JobPosting.enriched_at.isnot(None))),
+            )
+            .values(
+                stage="enriched",
+                status=select(JobPosting.status).where(JobPosting.id == WorkflowItem.job_posting_id).scalar_subquery(),
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    def count_items(self, run_id: int) -> Dict[str, int]:
+        """Items per stage, enriched and matched ones per stage/status (e.g. "enriched/expired")"""
+        rows = self.session.execute(
+            select(WorkflowItem.stage, WorkflowItem.status, func.count())
+            .where(WorkflowItem.run_id == run_id)
+            .group_by(WorkflowItem.stage, WorkflowItem.status)
+            .order_by(WorkflowItem.stage, WorkflowItem.status)
+        )
+        return {f"{stage}/{status}" if status else stage: count for stage, status, count in rows}
@@ -0,0 +1,175 @@
+"""
+Gazetteer-based location resolver.
+
+Turns free-form location text ("Buenos Aires, Argentina", "Remote - LATAM", "Hybrid in Berlin")
+into ISO country codes, regions and a remote flag, and picks the SerpAPI country/language
+for a location. Results are cached, since the same few candidate locations and posting
+snippets are resolved over and over.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from common.normalization.patterns import keyword_pattern
+
+REGIONS = ["LATAM", "NA", "EU", "APAC"]
+
+# ISO 3166-1 alpha-2 code -> (region, search language, names and aliases)
+COUNTRIES: Dict[str, Tuple[str, str, List[str]]] = {
+    "AR": ("LATAM", "es", ["argentina"]),
+    "BO": ("LATAM", "es", ["bolivia"]),
+    "BR": ("LATAM", "pt", ["brazil", "brasil"]),
+    "CL": ("LATAM", "es", ["chile"]),
+    "CO": ("LATAM", "es", ["colombia"]),
+    "CR": ("LATAM", "es", ["costa rica"]),
+    "DO": ("LATAM", "es", ["dominican republic", "república dominicana", "republica dominicana"]),
+    "EC": ("LATAM", "es", ["ecuador"]),
+    "GT": ("LATAM", "es", ["guatemala"]),
+    "MX": ("LATAM", "es", ["mexico", "méxico"]),
+    "PA": ("LATAM", "es", ["panama", "panamá"]),
+    "PE": ("LATAM", "es", ["peru", "perú"]),
+    "PY": ("LATAM", "es", ["paraguay"]),
+    "SV": ("LATAM", "es", ["el salvador"]),
+    "UY": ("LATAM", "es", ["uruguay"]),
+    "VE": ("LATAM", "es", ["venezuela"]),
+    "US": ("NA", "en", ["united states", "usa", "u.s.", "u.s.a.", "estados unidos", "eeuu"]),
+    "CA": ("NA", "en", ["canada", "canadá"]),
+    "AT": ("EU", "de", ["austria"]),
+    "BE": ("EU", "en", ["belgium", "bélgica"]),
+    "CH": ("EU", "de", ["switzerland", "suiza"]),
+    "CZ": ("EU", "en", ["czech republic", "czechia"]),
+    "DE": ("EU", "de", ["germany", "deutschland", "alemania"]),
+    "DK": ("EU", "en", ["denmark", "dinamarca"]),
+    "ES": ("EU", "es", ["spain", "españa"]),
+    "FI": ("EU", "en", ["finland", "finlandia"]),
+    "FR": ("EU", "fr", ["france", "francia"]),
+    "GB": ("EU", "en", ["united kingdom", "uk", "u.k.", "great britain", "england", "scotland", "reino unido"]),
+    "GR": ("EU", "en", ["greece", "grecia"]),
+    "IE": ("EU", "en", ["ireland", "irlanda"]),
+    "IT": ("EU", "it", ["italy", "italia"]),
+    "NL": ("EU", "nl", ["netherlands", "the netherlands", "holland", "países bajos"]),
+    "NO": ("EU", "en", ["norway", "noruega"]),
+    "PL": ("EU", "pl", ["poland", "polonia"]),
+    "PT": ("EU", "pt", ["portugal"]),
+    "RO": ("EU", "en", ["romania", "rumania"]),
+    "SE": ("EU", "en", ["sweden", "suecia"]),
+    "AU": ("APAC", "en", ["australia"]),
+    "IN": ("APAC", "en", ["india"]),
+    "JP": ("APAC", "en", ["japan", "japón"]),
+    "NZ": ("APAC", "en", ["new zealand", "nueva zelanda"]),
+    "PH": ("APAC", "en", ["philippines", "filipinas"]),
+    "SG": ("APAC", "en", ["singapore", "singapur"]),
+}
+
+# City -> ISO country code
+CITIES = {
+    "buenos aires": "AR", "caba": "AR", "córdoba": "AR", "cordoba": "AR", "rosario": "AR", "mendoza": "AR",
+    "são paulo": "BR", "sao paulo": "BR", "rio de janeiro": "BR", "belo horizonte": "BR", "florianópolis": "BR",
+    "santiago de chile": "CL", "santiago": "CL", "valparaíso": "CL",
+    "bogotá": "CO", "bogota": "CO", "medellín": "CO", "medellin": "CO", "cali": "CO",
+    "ciudad de méxico": "MX", "ciudad de mexico": "MX", "mexico city": "MX", "cdmx": "MX", "guadalajara": "MX",
+    "monterrey": "MX",
+    "lima": "PE", "montevideo": "UY", "quito": "EC", "asunción": "PY", "asuncion": "PY", "caracas": "VE",
+    "san josé": "CR",
+    "new york": "US", "nyc": "US", "san francisco": "US", "bay area": "US", "seattle": "US", "austin": "US",
+    "boston": "US", "chicago": "US", "los angeles": "US", "miami": "US", "denver": "US", "atlanta": "US",
+    "toronto": "CA", "vancouver": "CA", "montreal": "CA", "montréal": "CA",
+    "madrid": "ES", "barcelona": "ES", "valencia": "ES", "málaga": "ES", "malaga": "ES",
+    "berlin": "DE", "munich": "DE", "münchen": "DE", "hamburg": "DE",
+    "london": "GB", "londres": "GB", "manchester": "GB", "edinburgh": "GB",
+    "paris": "FR", "lisbon": "PT", "lisboa": "PT", "porto": "PT", "amsterdam": "NL", "dublin": "IE",
+    "warsaw": "PL", "kraków": "PL", "krakow": "PL", "milan": "IT", "rome": "IT", "stockholm": "SE",
+    "zurich": "CH", "zürich": "CH", "vienna": "AT", "copenhagen": "DK", "prague": "CZ",
+    "bangalore": "IN", "bengaluru": "IN", "sydney": "AU", "melbourne": "AU", "tokyo": "JP",
+}
+
+# Region names that don't point to a single country
+REGION_ALIASES = {
+    "LATAM": ["latam", "latin america", "latinoamérica", "latinoamerica", "south america", "sudamérica",
+              "sudamerica", "américa latina", "america latina"],
+    "NA": ["north america", "norteamérica", "norteamerica"],
+    "EU": ["europe", "european union", "europa", "emea"],
+    "APAC": ["apac", "asia pacific", "asia-pacific", "asia"],
+}
+
+REMOTE_KEYWORDS = ["remote", "remoto", "remota", "anywhere", "work from home", "wfh", "distributed", "home office",
+                   "teletrabajo", "fully remote", "100% remote"]
+
+# SerpAPI `gl` values that differ from the ISO code
+SERPAPI_COUNTRY_OVERRIDES = {"GB": "uk"}
+# SerpAPI (gl, hl) for locations that only resolve to a region, and for unknown locations
+REGION_SEARCH_LOCALES = {
+    "LATAM": ("mx", "es"),
+    "NA": ("us", "en"),
+    "EU": ("uk", "en"),
+    "APAC": ("sg", "en"),
+}
+DEFAULT_SEARCH_LOCALE = ("us", "en")
+
+_PLACES: Dict[str, Tuple[str, str]] = {
+    **{alias: ("region", region) for region, aliases in REGION_ALIASES.items() for alias in aliases},
+    **{city: ("country", code) for city, code in CITIES.items()},
+    **{alias: ("country", code) for code, (_, _, aliases) in COUNTRIES.items() for alias in aliases},
+}
+_PLACE_PATTERN = keyword_pattern(_PLACES)
+_REMOTE_PATTERN = keyword_pattern(REMOTE_KEYWORDS)
+
+
+@dataclass(frozen=True)
+class ResolvedLocation:
+    """Countries (ISO codes) and regions mentioned in a location text, in order of appearance"""
+    countries: Tuple[str, ...] = ()
+    regions: Tuple[str, ...] = ()
+    remote: bool = False
+
+    @property
+    def country(self) -> Optional[str]:
+        return self.countries[0] if self.countries else None
+
+    @property
+    def region(self) -> Optional[str]:
+        return self.regions[0] if self.regions else None
+
+    @property
+    def is_known(self) -> bool:
+        return bool(self.countries or self.regions)
+
+
+@lru_cache(maxsize=4096)
+def _resolve(text: str) -> ResolvedLocation:
+    countries, regions = [], []
+    for match in _PLACE_PATTERN.findall(text):
+        kind, value = _PLACES[match.lower()]
+        if kind == "country":
+            if value not in countries:
+                countries.append(value)
+            value = COUNTRIES[value][0]
+        if value not in regions:
+            regions.append(value)
+    return ResolvedLocation(tuple(countries), tuple(regions), bool(_REMOTE_PATTERN.search(text)))
+
+
+def resolve_location(text: Optional[str]) -> ResolvedLocation:
+    """Resolve free-form location text, normalized so casing and spacing variants share a cache entry"""
+    if not text:
+        return ResolvedLocation()
+    return _resolve(" ".join(text.lower().split()))
+
+
+def search_locale(location: Optional[str]) -> Tuple[str, str]:
+    """SerpAPI (gl, hl) country and language codes to search jobs for a location"""
+    resolved = resolve_location(location)
+    if resolved.country:
+        _, language, _ = COUNTRIES[resolved.country]
+        return SERPAPI_COUNTRY_OVERRIDES.get(resolved.country, resolved.country.lower()), language
+    if resolved.region:
+        return REGION_SEARCH_LOCALES[resolved.region]
+    return DEFAULT_SEARCH_LOCALE
+
+
+if __name__ == '__main__':
+    for location in ["Buenos Aires, Argentina", "Remote - LATAM", "Hybrid in Berlin", "London, UK or remote EMEA",
+                     "São Paulo", "Anywhere", "Madrid", None]:
+        print(f"{location!r:30} -> {resolve_location(location)} search locale={search_locale(location)}")
+    print(_resolve.cache_info())
@@ -0,0 +1,8 @@
+import re
+from typing import Iterable
+
+
+def keyword_pattern(keywords: Iterable[str]) -> re.Pattern:
+    """Match any keyword as a whole token, longest first so 'react native' wins over 'react'"""
+    alternation = "|".join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+    return re.compile(rf"(?<![\w.+#])({alternation})(?![\w+#])", re.IGNORECASE)
@@ -0,0 +1,154 @@
+"""
+Tech stack normalization.
+
+Maps free-form technology names ("Node.js", "NodeJS", "node") to canonical technologies
+with stable integer IDs, and knows which ecosystem each technology belongs to
+(Django -> Python, Next.js -> React -> JavaScript).
+"""
+
+import re
+from typing import Iterable, List, Optional, Set
+
+from common.normalization.patterns import keyword_pattern
+
+# Canonical technology -> aliases.
+# Technology IDs are positions in this table, so new technologies must be appended at the end.
+TECH_ALIASES = {
+    "python": ["python", "python3"],
+    "javascript": ["javascript", "js", "ecmascript"],
+    "typescript": ["typescript", "ts"],
+    "node.js": ["node.js", "nodejs", "node"],
+    "react": ["react", "react.js", "reactjs"],
+    "vue": ["vue", "vue.js", "vuejs"],
+    "angular": ["angular", "angularjs"],
+    "next.js": ["next.js", "nextjs"],
+    "nuxt.js": ["nuxt.js", "nuxtjs", "nuxt"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "fastapi": ["fastapi"],
+    "express": ["express", "express.js", "expressjs"],
+    "nestjs": ["nestjs", "nest.js"],
+    "java": ["java"],
+    "spring": ["spring", "spring boot", "springboot"],
+    "kotlin": ["kotlin"],
+    "go": ["go", "golang"],
+    "rust": ["rust"],
+    "ruby": ["ruby"],
+    "rails": ["rails", "ruby on rails", "ror"],
+    "php": ["php"],
+    "laravel": ["laravel"],
+    "c#": ["c#", "csharp"],
+    ".net": [".net", "dotnet", "asp.net"],
+    "postgresql": ["postgresql", "postgres"],
+    "mysql": ["mysql"],
+    "mongodb": ["mongodb", "mongo"],
+    "redis": ["redis"],
+    "aws": ["aws", "amazon web services"],
+    "gcp": ["gcp", "google cloud"],
+    "azure": ["azure"],
+    "docker": ["docker"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "terraform": ["terraform"],
+    "swift": ["swift"],
+    "flutter": ["flutter"],
+    "react native": ["react native"],
+    "pandas": ["pandas"],
+    "pytorch": ["pytorch"],
+    "tensorflow": ["tensorflow"],
+}
+
+# Technology -> the ecosystem it implies
+TECH_ECOSYSTEM = {
+    "django": "python",
+    "flask": "python",
+    "fastapi": "python",
+    "pandas": "python",
+    "pytorch": "python",
+    "tensorflow": "python",
+    "express": "node.js",
+    "nestjs": "node.js",
+    "node.js": "javascript",
+    "typescript": "javascript",
+    "react": "javascript",
+    "vue": "javascript",
+    "angular": "typescript",
+    "next.js": "react",
+    "nuxt.js": "vue",
+    "react native": "react",
+    "spring": "java",
+    "kotlin": "java",
+    "rails": "ruby",
+    "laravel": "php",
+    ".net": "c#",
+}
+
+# Aliases too ambiguous to look for in free text; only trusted inside tech_stack fields
+AMBIGUOUS_TECH_ALIASES = {"go", "js", "ts", "node", "ror", "spring", "express", "swift", "rust"}
+
+_ALIAS_TO_CANONICAL = {alias: canonical for canonical, aliases in TECH_ALIASES.items() for alias in aliases}
+_TEXT_PATTERN = keyword_pattern(alias for alias in _ALIAS_TO_CANONICAL if alias not in AMBIGUOUS_TECH_ALIASES)
+
+TECHNOLOGIES = list(TECH_ALIASES)
+TECHNOLOGY_IDS = {tech: i + 1 for i, tech in enumerate(TECHNOLOGIES)}
+TECHNOLOGIES_BY_ID = {tech_id: tech for tech, tech_id in TECHNOLOGY_IDS.items()}
+
+
+def normalize_technology(name: Optional[str]) -> Optional[str]:
+    """Canonical name of a single technology, None if it isn't known"""
+    if not name:
+        return None
+    return _ALIAS_TO_CANONICAL.get(name.strip().lower())
+
+
+def extract_technologies(tech_stack: Optional[str] = None, free_text: Optional[str] = None) -> Set[str]:
+    """Canonical technologies in a comma separated tech stack plus the unambiguous ones mentioned in free text"""
+    technologies = set()
+    for token in re.split(r"[,/;|]", tech_stack or ""):
+        canonical = normalize_technology(token)
+        if canonical:
+            technologies.add(canonical)
+    for text in (tech_stack, free_text):
+        if text:
+            technologies.update(_ALIAS_TO_CANONICAL[match.lower()] for match in _TEXT_PATTERN.findall(text))
+    return technologies
+
+
+def job_posting_technologies(job_title: Optional[str], quick_description: Optional[str], tech_stack: Optional[str]) -> Set[str]:
+    """Technologies of a job posting: its tech stack plus the ones named in its title or quick description"""
+    return extract_technologies(tech_stack, " ".join(filter(None, [job_title, quick_description])))
+
+
+def normalize_tech_stack(tech_stack: Optional[str]) -> str:
+    """Canonical, sorted, comma separated form of a tech stack string"""
+    return ", ".join(sorted(extract_technologies(tech_stack)))
+
+
+def ecosystem_ancestors(technology: str) -> List[str]:
+    """Ecosystems a technology implies, closest first (next.js -> react, javascript)"""
+    ancestors = []
+    parent = TECH_ECOSYSTEM.get(technology)
+    while parent and parent not in ancestors:
+        ancestors.append(parent)
+        parent = TECH_ECOSYSTEM.get(parent)
+    return ancestors
+
+
+def related_technologies(technology: str) -> Set[str]:
+    """The technology plus every technology in its ecosystem (python -> python, django, flask, ...)"""
+    return {technology} | {tech for tech in TECHNOLOGIES if technology in ecosystem_ancestors(tech)}
+
+
+def technology_ids(technologies: Iterable[str]) -> Set[int]:
+    return {TECHNOLOGY_IDS[tech] for tech in technologies if tech in TECHNOLOGY_IDS}
+
+
+def technologies_from_ids(ids: Iterable[int]) -> Set[str]:
+    return {TECHNOLOGIES_BY_ID[tech_id] for tech_id in ids if tech_id in TECHNOLOGIES_BY_ID}
+
+
+if __name__ == '__main__':
+    for stack in ["Node.js, NodeJS, node", "Django, PostgreSQL, k8s", "Next.js / TypeScript"]:
+        technologies = extract_technologies(stack)
+        print(f"{stack!r} -> {normalize_tech_stack(stack)!r} ids={sorted(technology_ids(technologies))}")
+    print(f"next.js implies {ecosystem_ancestors('next.js')}")
+    print(f"python ecosystem: {sorted(related_technologies('python'))}")
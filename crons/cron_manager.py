@@ -1,10 +1,28 @@
 import logging
+import os
+import socket
+import time
 from abc import ABC, abstractmethod
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 
+from common.config.config import (
+    CRON_OVERLAP_POLICY,
+    CRON_QUEUE_WAIT_SECONDS,
+    CRON_MISFIRE_GRACE_SECONDS,
+    CRON_JITTER_SECONDS,
+)
+from common.database.database import unit_of_work
+from common.database.locks import advisory_lock
+from common.database.repositories.cron_runs import CronRunsRepository
+from services.run_ledger import RunLedger
+
+OVERLAP_POLICIES = ("skip", "queue")
+
+
 class CronJob(ABC):
     @property
     @abstractmethod
@@ -15,57 +33,150 @@ class CronJob(ABC):
     @abstractmethod
     def interval_hours(self) -> int:
         pass
-    
+
     @property
     @abstractmethod
-    def start_time(self) -> str:
-        """Start time in HH:MM format (24-hour)"""
+    def start_time(self) -> Optional[str]:
+        """Start time in HH:MM format (24-hour), None to start one interval after the scheduler"""
         pass
 
+    @property
+    def interval_minutes(self) -> int:
+        """Jobs running more often than hourly override this instead of interval_hours"""
+        return self.interval_hours * 60
+
     @abstractmethod
     def run(self):
         pass
 
+    # Scheduling policy, jobs can override the configured defaults
+    @property
+    def overlap_policy(self) -> str:
+        """What a tick does while a run of this job is still going: "skip" or "queue" behind it"""
+        return CRON_OVERLAP_POLICY
+
+    @property
+    def misfire_grace_seconds(self) -> int:
+        return CRON_MISFIRE_GRACE_SECONDS
+
+    @property
+    def jitter_seconds(self) -> int:
+        return CRON_JITTER_SECONDS
+
+
 class CronManager:
+    """
+    Schedules cron jobs and guards every run with a database lock named after the job, so with
+    several replicas (or a slow run still going at the next tick) each job runs once at a time
+    across all of them. Every run, including skipped ticks, is recorded in cron_runs, and what an
+    executed run did and cost in the runs ledger (services/run_ledger.py).
+    """
+
     def __init__(self):
         self.scheduler = BackgroundScheduler()
         self.jobs = []
+        self.host = f"{socket.gethostname()}:{os.getpid()}"
 
     def register(self, job: CronJob):
+        if job.overlap_policy not in OVERLAP_POLICIES:
+            raise ValueError(f"Unknown overlap policy {job.overlap_policy!r} for {job.name}, expected one of {OVERLAP_POLICIES}")
         self.jobs.append(job)
         logging.info(f"[CronManager] Registered job {job}")
 
+    def execute(self, job: CronJob) -> str:
+        """Run the job if no other run of it holds the lock. Returns the recorded status"""
+        wait_seconds = CRON_QUEUE_WAIT_SECONDS if job.overlap_policy == "queue" else 0
+        with advisory_lock(f"cron:{job.name}", wait_seconds=wait_seconds) as acquired:
+            if not acquired:
+                logging.info(f"[CronManager] Skipping {job.name}: a previous run is still going")
+                self._record(job, "skipped", error="Previous run still in progress")
+                return "skipped"
+
+            run_id = self._record(job, "running")
+            started = time.monotonic()
+            status, error = "succeeded", None
+            with RunLedger("cron", job.name) as run_ledger:
+                try:
+                    job.run()
+                except Exception as e:
+                    status, error = "failed", f"{type(e).__name__}: {e}"
+                    run_ledger.fail(error)
+                    logging.error(f"[CronManager] Job {job.name} failed: {e}")
+            duration = time.monotonic() - started
+            logging.info(f"[CronManager] Job {job.name} {status} in {duration:.1f}s")
+            self._finish(run_id, status, duration, error)
+            return status
+
+    def _record(self, job: CronJob, status: str, error: Optional[str] = None) -> Optional[int]:
+        # Recording is best effort, a database hiccup must not stop the job itself
+        try:
+            with unit_of_work():
+                return CronRunsRepository().create_run(job.name, status, self.host, datetime.now(), error)
+        except Exception as e:
+            logging.warning(f"[CronManager] Could not record {status} run of {job.name}: {e}")
+            return None
+
+    def _finish(self, run_id: Optional[int], status: str, duration: float, error: Optional[str]):
+        if run_id is None:
+            return
+        try:
+            with unit_of_work():
+                CronRunsRepository().finish_run(run_id, status, datetime.now(), duration, error)
+        except Exception as e:
+            logging.warning(f"[CronManager] Could not record the outcome of cron run {run_id}: {e}")
+
     def start(self):
         for job in self.jobs:
+            options = {
+                "args": [job],
+                "id": job.name,
+                "name": job.name,
+                "replace_existing": True,
+                # Late ticks are merged into one, and dropped once past the grace time
+                "coalesce": True,
+                "misfire_grace_time": job.misfire_grace_seconds,
+                "jitter": job.jitter_seconds or None,
+                # "queue" lets one tick wait on the lock behind the running one
+                "max_instances": 2 if job.overlap_policy == "queue" else 1,
+            }
+            if not job.start_time:
+                self.scheduler.add_job(self.execute, 'interval', minutes=job.interval_minutes, **options)
+                logging.info(
+                    f"[CronManager] Scheduled job {job.name} every {job.interval_minutes} minutes "
+                    f"(overlap policy: {job.overlap_policy})"
+                )
+                continue
+
             # Parse start time
             try:
                 hour, minute = map(int, job.start_time.split(':'))
                 start_time = datetime.now().replace(hour=hour, minute=minute, second=0, microsecond=0)
-                
+
                 # If start time has passed today, schedule for tomorrow
                 if start_time <= datetime.now():
-                    start_time = start_time.replace(day=start_time.day + 1)
-                
+                    start_time += timedelta(days=1)
+
                 # Schedule job with both interval and start time
                 self.scheduler.add_job(
-                    job.run,
+                    self.execute,
                     'interval',
-                    hours=job.interval_hours,
+                    minutes=job.interval_minutes,
                     start_date=start_time,
-                    id=job.name,
-                    replace_existing=True
+                    **options
+                )
+                logging.info(
+                    f"[CronManager] Scheduled job {job.name} every {job.interval_hours} hours starting at "
+                    f"{start_time.strftime('%H:%M')} (overlap policy: {job.overlap_policy})"
                 )
-                logging.info(f"[CronManager] Scheduled job {job.name} every {job.interval_hours} hours starting at {start_time.strftime('%H:%M')}")
-                
+
             except Exception as e:
                 logging.error(f"[CronManager] Error scheduling job {job.name}: {e}")
                 # Fallback to simple interval scheduling
                 self.scheduler.add_job(
-                    job.run,
+                    self.execute,
                     'interval',
-                    hours=job.interval_hours,
-                    id=job.name,
-                    replace_existing=True
+                    minutes=job.interval_minutes,
+                    **options
                 )
                 logging.info(f"[CronManager] Scheduled job {job.name} every {job.interval_hours} hours (fallback)")
 
@@ -75,3 +186,12 @@ class CronManager:
     def shutdown(self):
         self.scheduler.shutdown()
         logging.info("[CronManager] Scheduler stopped")
+
+
+if __name__ == '__main__':
+    # Latest cron runs across all replicas
+    with unit_of_work():
+        runs = CronRunsRepository().get_latest_runs(limit=30)
+    for run in runs:
+        duration = f"{run.duration_seconds:.1f}s" if run.duration_seconds is not None else "-"
+        print(f"{run.started_at:%Y-%m-%d %H:%M:%S} {run.name:32} {run.status:10} {duration:>9} {run.host} {run.error or ''}")
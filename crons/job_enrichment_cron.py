@@ -1,6 +1,7 @@
 from crons.cron_manager import CronJob
 from workflows.job_matching_workflow import run_job_matching_workflow
-from common.config.config import CRON_JOB_ENRICHMENT_INTERVAL_HOURS, CRON_JOB_ENRICHMENT_START_TIME
+from workflows.streaming_job_matching_workflow import run_streaming_job_matching_workflow
+from common.config.config import CRON_JOB_ENRICHMENT_INTERVAL_HOURS, CRON_JOB_ENRICHMENT_START_TIME, WORKFLOW_MODE, TASK_QUEUE_ENABLED
 import logging
 
 class JobEnrichmentCron(CronJob):
@@ -22,7 +23,17 @@ class JobEnrichmentCron(CronJob):
     def run(self):
         logging.info("Starting job enrichment workflow")
         try:
-            result = run_job_matching_workflow()
+            if TASK_QUEUE_ENABLED:
+                # Workers enrich and match, this process only discovers and queues
+                from workers.tasks import enqueue_job_matching
+                enqueue_job_matching()
+                logging.info("Job enrichment workflow queued enrichment and matching tasks")
+                return
+            if WORKFLOW_MODE == "streaming":
+                result = run_streaming_job_matching_workflow()
+            else:
+                result = run_job_matching_workflow()
             logging.info(f"Job enrichment workflow completed successfully. Generated {len(result['matches'])} matches")
         except Exception as e:
             logging.error(f"Job enrichment workflow failed: {str(e)}")
+            raise
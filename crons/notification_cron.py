@@ -1,19 +1,16 @@
-from crons.cron_manager import CronJob
-from common.database.repositories.matches import MatchesRepository
-from common.database.repositories.candidates import CandidatesRepository
-from common.database.repositories.job_posting import JobPostingsRepository
-from bot.telegram_bot import TelegramBot
-from common.config.config import CRON_NOTIFICATION_INTERVAL_HOURS, CRON_NOTIFICATION_START_TIME
 import logging
-from datetime import datetime, timedelta
-import asyncio
+from typing import Optional
+
+from crons.cron_manager import CronJob
+from services.notification_engine import NotificationEngine
+from common.config.config import NOTIFICATION_DISPATCH_INTERVAL_MINUTES, TASK_QUEUE_ENABLED
+
 
 class NotificationCron(CronJob):
+    """Sends the match digests that are due, see services/notification_engine.py"""
+
     def __init__(self):
-        self.matches_repo = MatchesRepository()
-        self.candidates_repo = CandidatesRepository()
-        self.job_postings_repo = JobPostingsRepository()
-        self.telegram_bot = TelegramBot()
+        self.engine = NotificationEngine()
 
     @property
     def name(self) -> str:
@@ -21,114 +18,37 @@ class NotificationCron(CronJob):
 
     @property
     def interval_hours(self) -> int:
-        return CRON_NOTIFICATION_INTERVAL_HOURS
-    
+        # Runs every few minutes, see interval_minutes
+        return 0
+
+    @property
+    def interval_minutes(self) -> int:
+        return NOTIFICATION_DISPATCH_INTERVAL_MINUTES
+
+    @property
+    def start_time(self) -> Optional[str]:
+        return None
+
     @property
-    def start_time(self) -> str:
-        return CRON_NOTIFICATION_START_TIME
+    def jitter_seconds(self) -> int:
+        # The digest window already spreads the sends, a tick late by up to a minute would add to the latency
+        return 0
 
     def run(self):
-        logging.info("Starting notification process")
         try:
-            # Get un-notified matches from the last 24 hours
-            yesterday = datetime.now() - timedelta(days=1)
-            recent_matches = self.matches_repo.get_unnotified_matches_since(yesterday)
-            
-            if not recent_matches:
-                logging.info("No un-notified matches found")
+            if TASK_QUEUE_ENABLED:
+                # One task per due candidate, sent by the workers
+                from workers.tasks import enqueue_match_notifications
+                queued = enqueue_match_notifications()
+                if queued:
+                    logging.info(f"[NotificationCron] Queued {queued} digests")
                 return
-            
-            # Group matches by candidate
-            candidate_matches = {}
-            for match in recent_matches:
-                candidate_id = match.candidate_id
-                if candidate_id not in candidate_matches:
-                    candidate_matches[candidate_id] = []
-                candidate_matches[candidate_id].append(match)
-            
-            # Send notifications to each candidate
-            notified_match_ids = []
-            for candidate_id, matches in candidate_matches.items():
-                success = self._send_candidate_notification(candidate_id, matches)
-                if success:
-                    # Add match IDs to the list of successfully notified matches
-                    notified_match_ids.extend([match.id for match in matches])
-                
-            # Mark successfully notified matches as notified
-            if notified_match_ids:
-                self.matches_repo.mark_matches_as_notified(notified_match_ids)
-                logging.info(f"Marked {len(notified_match_ids)} matches as notified")
-                
-            logging.info(f"Sent notifications to {len(candidate_matches)} candidates")
-            
+            self.engine.dispatch()
         except Exception as e:
-            logging.error(f"Notification process failed: {str(e)}")
-
-    def _send_candidate_notification(self, candidate_id: int, matches: list) -> bool:
-        """Send notification to a specific candidate about their matches. Returns True if successful."""
-        try:
-            # Get candidate info
-            candidate = self.candidates_repo.get_candidate_by_id(candidate_id)
-            if not candidate:
-                logging.warning(f"Candidate {candidate_id} not found")
-                return False
-            
-            # Format notification message
-            message = self._format_match_notification(matches)
-            
-            # Send via Telegram using asyncio
-            asyncio.run(self.telegram_bot.send_message(
-                chat_id=candidate.telegram_chat_id,
-                message=message
-            ))
-            
-            return True
-            
-        except Exception as e:
-            logging.error(f"Error sending notification to candidate {candidate_id}: {str(e)}")
-            return False
-
-    def _format_match_notification(self, matches: list) -> str:
-        """Format the notification message for matches"""
-        if len(matches) == 1:
-            match = matches[0]
-            # Get job posting details
-            job_posting = self.job_postings_repo.get_job_postings_by_ids([match.job_posting_id])[0]
-            
-            # Convert match score to percentage (assuming it's stored as decimal 0-1)
-            match_percentage = int(match.match_score * 100)
-            
-            # Determine location info
-            location_info = "Remote"  # Default, could be enhanced with actual location data
-            
-            return f"""🎯 New Job Opportunity Found!
+            logging.error(f"[NotificationCron] Notification dispatch failed: {e}")
+            raise
 
-{job_posting.job_title}
-🏢 {job_posting.company_name}
-📍 {location_info}
-⭐ Match Score: {match_percentage}%
-🔗 {job_posting.job_link}
 
-{match.strengths if match.strengths else ''}""".strip()
-        else:
-            message = f"🎯 New Job Opportunities Found!\n\n"
-            for i, match in enumerate(matches[:5], 1):  # Limit to top 5
-                # Get job posting details
-                job_posting = self.job_postings_repo.get_job_postings_by_ids([match.job_posting_id])[0]
-                
-                # Convert match score to percentage
-                match_percentage = int(match.match_score * 100)
-                
-                # Determine location info
-                location_info = "Remote"  # Default, could be enhanced with actual location data
-                
-                message += f"{i}. {job_posting.job_title}\n"
-                message += f"   🏢 {job_posting.company_name}\n"
-                message += f"   📍 {location_info}\n"
-                message += f"   ⭐ Match Score: {match_percentage}%\n"
-                message += f"   🔗 {job_posting.job_link}\n\n"
-            
-            if len(matches) > 5:
-                message += f"... and {len(matches) - 5} more matches!"
-            
-            return message
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    NotificationCron().run()
@@ -9,11 +9,12 @@ from threading import Thread
 
 from flask import Flask
 from bot.telegram_bot import TelegramBot
+from bot.webhook_server import WebhookServer
 from crons.cron_manager import CronManager
 from crons.job_seeker_cron import JobSeekerCron
 from crons.job_enrichment_cron import JobEnrichmentCron
 from crons.notification_cron import NotificationCron
-from crons.match_notification_cron import MatchNotificationCron
+from common.config.config import TELEGRAM_MODE, PORT
 
 # Global variables for graceful shutdown
 cron_manager = None
@@ -92,17 +93,15 @@ def cleanup():
     logging.info("Cleanup completed")
 
 def run_flask():
-    """Run Flask app in a separate thread"""
-    port = int(os.environ.get('PORT', 8000))
-    app.run(host='0.0.0.0', port=port, debug=False, use_reloader=False)
+    """Run Flask app in a separate thread (polling mode, the webhook server serves /health itself)"""
+    app.run(host='0.0.0.0', port=PORT, debug=False, use_reloader=False)
 
 def run_keep_alive():
     """Send periodic keep-alive requests to prevent Render from sleeping"""
     # Wait for Flask to start up
     time.sleep(30)
     
-    port = int(os.environ.get('PORT', 8000))
-    health_url = f"http://localhost:{port}/health"
+    health_url = f"http://localhost:{PORT}/health"
     interval = 14 * 60  # 14 minutes in seconds
     
     logging.info(f"Starting keep-alive service, pinging {health_url} every {interval/60} minutes")
@@ -139,8 +138,8 @@ if __name__ == '__main__':
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    # Check for existing processes that might cause conflicts
-    if check_existing_processes():
+    # Check for existing processes that might cause conflicts (webhook mode has none)
+    if TELEGRAM_MODE != "webhook" and check_existing_processes():
         logging.warning("Continuing anyway, but conflicts may occur...")
     
     # Register signal handlers for graceful shutdown
@@ -148,12 +147,13 @@ if __name__ == '__main__':
     signal.signal(signal.SIGTERM, signal_handler)
     
     try:
-        logging.info("Starting jobs-agent application...")
+        logging.info(f"Starting jobs-agent application in {TELEGRAM_MODE} mode...")
         
         # Start Flask health check server in a separate thread
-        flask_thread = Thread(target=run_flask, daemon=True)
-        flask_thread.start()
-        logging.info("Flask health check server started")
+        if TELEGRAM_MODE != "webhook":
+            flask_thread = Thread(target=run_flask, daemon=True)
+            flask_thread.start()
+            logging.info("Flask health check server started")
         
         # Start keep-alive service in a separate thread
         keep_alive_thread = Thread(target=run_keep_alive, daemon=True)
@@ -166,52 +166,60 @@ if __name__ == '__main__':
         # Register all cron jobs
         cron_manager.register(JobSeekerCron())  # Original job fetching
         cron_manager.register(JobEnrichmentCron())  # New enrichment workflow
-        cron_manager.register(NotificationCron())  # New notification system
-        cron_manager.register(MatchNotificationCron())  # Daily match notifications
+        cron_manager.register(NotificationCron())  # Match notification digests
         
         cron_manager.start()
         logging.info("Cron manager started successfully")
 
-        # Initialize and start telegram bot with retry mechanism
-        telegram_bot = TelegramBot()
-        logging.info("Telegram bot initialized, starting polling...")
-        
-        # Retry mechanism for telegram bot conflicts with exponential backoff
-        max_retries = 8
-        base_delay = 60  # Start with 60 seconds
-        
-        for attempt in range(max_retries):
-            try:
-                # Start the bot in a way that allows for graceful shutdown
-                telegram_bot.app.run_polling(
-                    allowed_updates=[],
-                    drop_pending_updates=True,  # Drop any pending updates on startup
-                    close_loop=False  # Don't close the loop automatically
-                )
-                logging.info("Telegram bot started successfully")
-                break
-                
-            except Exception as e:
-                error_str = str(e).lower()
-                if any(conflict_indicator in error_str for conflict_indicator in [
-                    "terminated by other getupdates request",
-                    "conflict",
-                    "getupdates",
-                    "another instance"
-                ]):
-                    if attempt < max_retries - 1:
-                        # Exponential backoff: 60s, 120s, 240s, 480s, etc.
-                        retry_delay = base_delay * (2 ** attempt)
-                        logging.warning(f"Telegram bot conflict detected (attempt {attempt + 1}/{max_retries})")
-                        logging.info(f"Waiting {retry_delay} seconds before retry... (exponential backoff)")
-                        time.sleep(retry_delay)
-                        continue
+        telegram_bot = TelegramBot(cache_profiles=TELEGRAM_MODE != "webhook")
+
+        if TELEGRAM_MODE == "webhook":
+            # One async server for the webhook and /health, returns on SIGINT/SIGTERM once the queued updates are done
+            logging.info("Telegram bot initialized, starting webhook server...")
+            WebhookServer(telegram_bot).run()
+            telegram_bot = None
+            shutdown_requested = True
+
+        else:
+            # Start the telegram bot with retry mechanism
+            logging.info("Telegram bot initialized, starting polling...")
+
+            # Retry mechanism for telegram bot conflicts with exponential backoff
+            max_retries = 8
+            base_delay = 60  # Start with 60 seconds
+
+            for attempt in range(max_retries):
+                try:
+                    # Start the bot in a way that allows for graceful shutdown
+                    telegram_bot.app.run_polling(
+                        allowed_updates=[],
+                        drop_pending_updates=True,  # Drop any pending updates on startup
+                        close_loop=False  # Don't close the loop automatically
+                    )
+                    logging.info("Telegram bot started successfully")
+                    break
+
+                except Exception as e:
+                    error_str = str(e).lower()
+                    if any(conflict_indicator in error_str for conflict_indicator in [
+                        "terminated by other getupdates request",
+                        "conflict",
+                        "getupdates",
+                        "another instance"
+                    ]):
+                        if attempt < max_retries - 1:
+                            # Exponential backoff: 60s, 120s, 240s, 480s, etc.
+                            retry_delay = base_delay * (2 ** attempt)
+                            logging.warning(f"Telegram bot conflict detected (attempt {attempt + 1}/{max_retries})")
+                            logging.info(f"Waiting {retry_delay} seconds before retry... (exponential backoff)")
+                            time.sleep(retry_delay)
+                            continue
+                        else:
+                            logging.error("Max retries reached for telegram bot. Exiting.")
+                            raise
                     else:
-                        logging.error("Max retries reached for telegram bot. Exiting.")
+                        logging.error(f"Unexpected error starting telegram bot: {e}")
                         raise
-                else:
-                    logging.error(f"Unexpected error starting telegram bot: {e}")
-                    raise
 
         # Main loop with graceful shutdown
         while not shutdown_requested:
@@ -0,0 +1,72 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional
+
+from common.config.config import CANDIDATE_CACHE_MAX_SIZE, CANDIDATE_CACHE_TTL_SECONDS
+
+# Profile fields the bot can change
+PROFILE_FIELDS = ('role', 'location', 'tech_stack', 'language')
+
+
+@dataclass(frozen=True)
+class CandidateProfile:
+    """Read-only snapshot of the candidate columns the bot works with"""
+    id: int
+    telegram_chat_id: int
+    role: Optional[str]
+    location: Optional[str]
+    tech_stack: Optional[str]
+    language: str
+
+    @classmethod
+    def from_row(cls, row) -> 'CandidateProfile':
+        """Build a profile from a Candidate model or a row with the same columns"""
+        return cls(**{field.name: getattr(row, field.name) for field in fields(cls)})
+
+
+class CandidateProfileCache:
+    """
+    In-process LRU cache of candidate profiles keyed by telegram_chat_id.
+
+    Kept write-through by AsyncCandidatesService, which never skips a write based on it.
+    Entries expire after a TTL so changes made outside this process (seeders, other
+    instances) are eventually picked up by reads.
+    Only used from the bot's event loop, so it doesn't need locking.
+    """
+
+    def __init__(self, max_size: int = CANDIDATE_CACHE_MAX_SIZE, ttl_seconds: int = CANDIDATE_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[int, tuple[float, CandidateProfile]]' = OrderedDict()
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def get(self, telegram_chat_id: int) -> Optional[CandidateProfile]:
+        entry = self._entries.get(telegram_chat_id)
+        if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+            self._entries.pop(telegram_chat_id, None)
+            self.miss_count += 1
+            return None
+
+        self._entries.move_to_end(telegram_chat_id)
+        self.hit_count += 1
+        return entry[1]
+
+    def set(self, profile: CandidateProfile):
+        self._entries[profile.telegram_chat_id] = (time.monotonic(), profile)
+        self._entries.move_to_end(profile.telegram_chat_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, telegram_chat_id: int):
+        self._entries.pop(telegram_chat_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        total_requests = self.hit_count + self.miss_count
+        return {
+            "total_entries": len(self._entries),
+            "hit_count": self.hit_count,
+            "miss_count": self.miss_count,
+            "hit_rate": round(self.hit_count / total_requests, 3) if total_requests else 0,
+        }
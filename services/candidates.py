@@ -1,25 +1,92 @@
+from typing import Optional
+
+from common.database.async_database import async_unit_of_work
+from common.database.database import unit_of_work
+from common.database.repositories.async_candidates import AsyncCandidatesRepository
 from common.database.repositories.candidates import CandidatesRepository
 from common.types.upsert_candidate_input import UpsertCandidateInput
+from services.candidate_profile_cache import PROFILE_FIELDS, CandidateProfile, CandidateProfileCache
 
 
 class CandidatesService:
-    def __init__(self):
-        self.candidates_repo = CandidatesRepository()
+    """Each call runs in its own unit of work so the long-lived bot never holds a connection between messages"""
 
     def get_candidates(self):
-        return self.candidates_repo.get_candidates()
+        with unit_of_work():
+            return CandidatesRepository().get_candidates()
 
     def upsert(self, id: int, data: UpsertCandidateInput):
-        candidate = self.candidates_repo.get_by_id(id)
-        if candidate:
-            self.candidates_repo.update(id, data)
-        else:
-            data.telegram_chat_id = id
-            self.candidates_repo.create(data)
+        with unit_of_work():
+            candidates_repo = CandidatesRepository()
+            candidate = candidates_repo.get_by_id(id)
+            if candidate:
+                candidates_repo.update(id, data)
+            else:
+                data.telegram_chat_id = id
+                candidates_repo.create(data)
 
     def get_by_id(self, id: int):
-        return self.candidates_repo.get_by_id(id)
+        with unit_of_work():
+            return CandidatesRepository().get_by_id(id)
     
     def get_by_telegram_id(self, telegram_id: int):
         """Get candidate by telegram chat ID"""
-        return self.candidates_repo.get_by_id(telegram_id)
\ No newline at end of file
+        with unit_of_work():
+            return CandidatesRepository().get_by_id(telegram_id)
+
+
+class AsyncCandidatesService:
+    """
+    Non-blocking candidates service used by the Telegram bot handlers.
+
+    Profiles are served from a per-chat cache kept write-through. Updates are a single upsert
+    statement of the fields the caller set, and the database decides whether they are a no-op:
+    another process may have changed the row since it was cached, so the cache isn't trusted
+    to skip writes. A no-op update (e.g. the language set on every plain message) writes nothing.
+    """
+
+    def __init__(self, profile_cache: Optional[CandidateProfileCache] = None):
+        self.profile_cache = profile_cache or CandidateProfileCache()
+
+    async def upsert(self, id: int, data: UpsertCandidateInput) -> CandidateProfile:
+        # Only fields explicitly set by the caller count, so e.g. /setrole doesn't reset the language
+        changes = {
+            key: value
+            for key, value in data.model_dump(exclude_unset=True).items()
+            if key in PROFILE_FIELDS and value
+        }
+
+        if not changes:
+            profile = await self.get_by_telegram_id(id)
+            if profile:
+                return profile
+
+        async with async_unit_of_work() as session:
+            row = await AsyncCandidatesRepository(session).upsert_by_telegram_id(id, changes)
+
+        if row is None:
+            # The row already holds these values, the cached profile is only kept if it agrees
+            profile = self.profile_cache.get(id)
+            if profile and all(getattr(profile, key) == value for key, value in changes.items()):
+                return profile
+            self.profile_cache.invalidate(id)
+            return await self.get_by_telegram_id(id)
+
+        profile = CandidateProfile.from_row(row)
+        self.profile_cache.set(profile)
+        return profile
+
+    async def get_by_telegram_id(self, telegram_id: int) -> Optional[CandidateProfile]:
+        """Get candidate by telegram chat ID"""
+        profile = self.profile_cache.get(telegram_id)
+        if profile:
+            return profile
+
+        async with async_unit_of_work() as session:
+            candidate = await AsyncCandidatesRepository(session).get_by_id(telegram_id)
+        if not candidate:
+            return None
+
+        profile = CandidateProfile.from_row(candidate)
+        self.profile_cache.set(profile)
+        return profile
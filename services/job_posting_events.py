@@ -0,0 +1,38 @@
+import logging
+import threading
+from typing import Callable, List
+
+JobPostingsSavedListener = Callable[[List[str]], None]
+
+
+class JobPostingEvents:
+    """
+    In-process notifications of job postings saved by the discovery tools, so a running
+    pipeline can pick them up as they land instead of waiting for discovery to finish.
+    Listeners run on the saving thread: a listener that blocks slows discovery down.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners: List[JobPostingsSavedListener] = []
+
+    def subscribe(self, listener: JobPostingsSavedListener):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: JobPostingsSavedListener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def publish_saved(self, job_links: List[str]):
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(job_links)
+            except Exception as e:
+                logging.error(f"[JobPostingEvents] Listener failed: {e}")
+
+
+job_posting_events = JobPostingEvents()
@@ -0,0 +1,325 @@
+"""
+Local hashed TF-IDF index over job posting text for fast semantic retrieval.
+
+Tokens from the title, tech stack, quick description and requirements are hashed
+into a fixed number of buckets, so the vocabulary never has to be stored or
+rebuilt. Documents are weighted lnc and queries ltc (SMART notation): document
+vectors are log-tf and L2 normalized, and idf is applied only on the query side.
+Because of that, adding or removing a posting never requires re-weighting the
+others. The index is an inverted list per bucket, persisted to disk as a
+compressed .npz file.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from common.config.config import JOB_INDEX_PATH, JOB_INDEX_FEATURES
+from common.database.database import unit_of_work
+from common.database.models.job_posting import JobPosting
+from common.database.repositories.job_posting import JobPostingsRepository
+from common.normalization.tech_stack import extract_technologies
+
+# Indexed job posting columns and how much each one weighs in the document vector
+INDEXED_FIELD_WEIGHTS = {
+    "job_title": 2.0,
+    "tech_stack": 2.0,
+    "quick_description": 1.0,
+    "requirements": 1.0,
+}
+JOB_POSTING_INDEX_COLUMNS = (JobPosting.id, JobPosting.status) + tuple(
+    getattr(JobPosting, name) for name in INDEXED_FIELD_WEIGHTS
+)
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or", "our",
+    "the", "to", "we", "will", "with", "you", "your", "de", "del", "el", "en", "es", "la", "las", "los", "para",
+    "por", "un", "una", "y", "con",
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9áéíóúñü][a-z0-9áéíóúñü+#.]*")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase word tokens plus canonical technology names, so 'nodejs' and 'Node.js' land in the same bucket"""
+    if not text:
+        return []
+    tokens = [token.rstrip(".") for token in _TOKEN_PATTERN.findall(text.lower())]
+    tokens = [token for token in tokens if len(token) > 1 and token not in STOPWORDS]
+    tokens.extend(f"tech:{tech}" for tech in extract_technologies(text, text))
+    return tokens
+
+
+def _bucket(token: str, n_features: int) -> int:
+    # crc32 rather than hash() - the built-in is salted per process and the index is shared on disk
+    return zlib.crc32(token.encode("utf-8")) % n_features
+
+
+def _content_hash(job_posting: Dict[str, Any]) -> str:
+    content = "\x1f".join(str(job_posting.get(name) or "") for name in INDEXED_FIELD_WEIGHTS)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class JobPostingIndex:
+    """Thread-safe in-process vector index of active job postings"""
+
+    def __init__(self, path: Optional[str] = JOB_INDEX_PATH, n_features: int = JOB_INDEX_FEATURES):
+        self.path = path
+        self.n_features = n_features
+        self._lock = threading.RLock()
+        # job posting id -> (content hash, {bucket: weight})
+        self._documents: Dict[int, Tuple[str, Dict[int, float]]] = {}
+        # bucket -> {job posting id: weight}
+        self._postings: Dict[int, Dict[int, float]] = {}
+        # bucket -> (job posting ids, weights) as arrays, rebuilt lazily after updates
+        self._posting_arrays: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._loaded_mtime: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _vectorize(self, fields: Dict[str, Optional[str]], field_weights: Dict[str, float]) -> Dict[int, float]:
+        counts = Counter()
+        for name, weight in field_weights.items():
+            for token in tokenize(fields.get(name)):
+                counts[_bucket(token, self.n_features)] += weight
+        return {bucket: 1.0 + math.log(count) for bucket, count in counts.items()}
+
+    @staticmethod
+    def _normalize(vector: Dict[int, float]) -> Dict[int, float]:
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {bucket: weight / norm for bucket, weight in vector.items()} if norm else {}
+
+    def _remove_locked(self, job_posting_id: int):
+        document = self._documents.pop(job_posting_id, None)
+        if document is None:
+            return
+        for bucket in document[1]:
+            posting = self._postings[bucket]
+            posting.pop(job_posting_id, None)
+            if not posting:
+                del self._postings[bucket]
+            self._posting_arrays.pop(bucket, None)
+
+    def upsert(self, job_postings: Iterable[Dict[str, Any]]) -> int:
+        """
+        Index active job postings and drop inactive ones. Postings whose indexed text
+        didn't change are skipped. Returns the number of documents (re)indexed.
+        """
+        indexed = 0
+        with self._lock:
+            for job_posting in job_postings:
+                job_posting_id = job_posting["id"]
+                if job_posting.get("status", "active") != "active":
+                    self._remove_locked(job_posting_id)
+                    continue
+
+                content_hash = _content_hash(job_posting)
+                existing = self._documents.get(job_posting_id)
+                if existing and existing[0] == content_hash:
+                    continue
+
+                self._remove_locked(job_posting_id)
+                vector = self._normalize(self._vectorize(job_posting, INDEXED_FIELD_WEIGHTS))
+                self._documents[job_posting_id] = (content_hash, vector)
+                for bucket, weight in vector.items():
+                    self._postings.setdefault(bucket, {})[job_posting_id] = weight
+                    self._posting_arrays.pop(bucket, None)
+                indexed += 1
+        return indexed
+
+    def remove(self, job_posting_ids: Iterable[int]):
+        with self._lock:
+            for job_posting_id in job_posting_ids:
+                self._remove_locked(job_posting_id)
+
+    def _posting_array(self, bucket: int) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._posting_arrays.get(bucket)
+        if arrays is None:
+            posting = self._postings[bucket]
+            arrays = (
+                np.fromiter(posting.keys(), dtype=np.int64, count=len(posting)),
+                np.fromiter(posting.values(), dtype=np.float32, count=len(posting)),
+            )
+            self._posting_arrays[bucket] = arrays
+        return arrays
+
+    def search(self, text: str, top_n: int = 10, job_posting_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """
+        Return up to top_n (job posting id, cosine similarity) pairs for a free text query, best first.
+        If job_posting_ids is given, only those postings are considered.
+        """
+        with self._lock:
+            n_documents = len(self._documents)
+            query = Counter(_bucket(token, self.n_features) for token in tokenize(text))
+            query = {bucket: count for bucket, count in query.items() if bucket in self._postings}
+            if not query or not n_documents:
+                return []
+
+            # ltc query weights: log tf x idf, L2 normalized
+            query = self._normalize({
+                bucket: (1.0 + math.log(count)) * (math.log((n_documents + 1) / (len(self._postings[bucket]) + 1)) + 1.0)
+                for bucket, count in query.items()
+            })
+            arrays = [self._posting_array(bucket) for bucket in query]
+
+        ids = np.concatenate([ids for ids, _ in arrays])
+        weights = np.concatenate([weights * query_weight for (_, weights), query_weight in zip(arrays, query.values())])
+        # Job posting ids are dense autoincrement keys, so they index the score accumulator directly
+        scores = np.bincount(ids, weights=weights)
+        if job_posting_ids is not None:
+            if not isinstance(job_posting_ids, np.ndarray):
+                job_posting_ids = np.fromiter(job_posting_ids, dtype=np.int64)
+            unique_ids = job_posting_ids[job_posting_ids < len(scores)]
+        else:
+            unique_ids = np.flatnonzero(scores)
+        scores = scores[unique_ids]
+
+        if len(scores) > top_n:
+            top = np.argpartition(-scores, top_n - 1)[:top_n]
+            unique_ids, scores = unique_ids[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [(int(unique_ids[i]), round(float(scores[i]), 3)) for i in order if scores[i] > 0]
+
+    def search_for_candidate(self, candidate: Dict[str, Any], top_n: int = 10, job_posting_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """Top job postings for a candidate profile (role, tech stack and location)"""
+        text = " ".join(filter(None, [candidate.get("role"), candidate.get("tech_stack"), candidate.get("location")]))
+        return self.search(text, top_n=top_n, job_posting_ids=job_posting_ids)
+
+    def index_from_database(self, *criteria) -> int:
+        """(Re)index the job postings matching the criteria, reading only the indexed columns"""
+        with unit_of_work():
+            rows = [dict(r._mapping) for r in JobPostingsRepository().stream_job_postings(*criteria, columns=JOB_POSTING_INDEX_COLUMNS)]
+        return self.upsert(rows)
+
+    def rebuild(self) -> int:
+        """Sync the whole index with the database, dropping postings that no longer exist"""
+        with unit_of_work():
+            rows = [dict(r._mapping) for r in JobPostingsRepository().stream_job_postings(columns=JOB_POSTING_INDEX_COLUMNS)]
+        with self._lock:
+            self.remove(set(self._documents) - {row["id"] for row in rows})
+            return self.upsert(rows)
+
+    def save(self):
+        """
+        Atomically persist the index as CSR arrays. Each writer writes its own temp file, so writers
+        in other processes can't tear the file, the last replace wins
+        """
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            ids = sorted(self._documents)
+            vectors = [self._documents[job_posting_id][1] for job_posting_id in ids]
+            indptr = np.cumsum([0] + [len(vector) for vector in vectors], dtype=np.int64)
+            indices = np.fromiter((b for vector in vectors for b in vector.keys()), dtype=np.int32, count=int(indptr[-1]))
+            data = np.fromiter((w for vector in vectors for w in vector.values()), dtype=np.float32, count=int(indptr[-1]))
+            hashes = np.array([self._documents[job_posting_id][0] for job_posting_id in ids], dtype="U40")
+
+            temp_file = tempfile.NamedTemporaryFile(dir=directory, prefix=f"{os.path.basename(self.path)}.", suffix=".tmp", delete=False)
+            try:
+                with temp_file:
+                    np.savez_compressed(
+                        temp_file,
+                        n_features=np.int64(self.n_features),
+                        ids=np.array(ids, dtype=np.int64),
+                        hashes=hashes,
+                        indptr=indptr,
+                        indices=indices,
+                        data=data,
+                    )
+                os.replace(temp_file.name, self.path)
+            except BaseException:
+                if os.path.exists(temp_file.name):
+                    os.remove(temp_file.name)
+                raise
+            self._loaded_mtime = os.path.getmtime(self.path)
+        logging.info(f"[JobPostingIndex] Saved {len(ids)} job postings to {self.path}")
+
+    def load(self) -> bool:
+        """Load the index from disk, returns False if there's nothing to load"""
+        if not self.path or not os.path.exists(self.path):
+            return False
+
+        with np.load(self.path) as archive:
+            n_features = int(archive["n_features"])
+            ids, hashes, indptr, indices, data = (
+                archive["ids"], archive["hashes"], archive["indptr"], archive["indices"], archive["data"]
+            )
+
+        documents = {}
+        postings: Dict[int, Dict[int, float]] = {}
+        for row, job_posting_id in enumerate(ids.tolist()):
+            start, end = indptr[row], indptr[row + 1]
+            vector = dict(zip(indices[start:end].tolist(), data[start:end].tolist()))
+            documents[job_posting_id] = (str(hashes[row]), vector)
+            for bucket, weight in vector.items():
+                postings.setdefault(bucket, {})[job_posting_id] = weight
+
+        with self._lock:
+            self.n_features = n_features
+            self._documents = documents
+            self._postings = postings
+            self._posting_arrays = {}
+            self._loaded_mtime = os.path.getmtime(self.path)
+        logging.info(f"[JobPostingIndex] Loaded {len(documents)} job postings from {self.path}")
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Pick up a newer index file written by another process"""
+        if self.path and os.path.exists(self.path) and os.path.getmtime(self.path) != self._loaded_mtime:
+            return self.load()
+        return False
+
+
+_index: Optional[JobPostingIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_job_posting_index() -> JobPostingIndex:
+    """Process-wide index, loaded from disk (or built from the database) on first use"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            index = JobPostingIndex()
+            if not index.load():
+                index.rebuild()
+                index.save()
+            _index = index
+        else:
+            _index.reload_if_changed()
+        return _index
+
+
+def index_job_postings(*criteria):
+    """Incrementally index the job postings matching the criteria and persist the index"""
+    index = get_job_posting_index()
+    if index.index_from_database(*criteria):
+        index.save()
+
+
+if __name__ == '__main__':
+    import time
+
+    index = JobPostingIndex(path=None)
+    index.upsert([
+        {"id": 1, "job_title": "Senior Backend Engineer", "tech_stack": "Node.js, TypeScript, PostgreSQL", "quick_description": "Remote LATAM"},
+        {"id": 2, "job_title": "Frontend Developer", "tech_stack": "React, Next.js", "quick_description": "Hybrid in Madrid"},
+        {"id": 3, "job_title": "Data Scientist", "tech_stack": "Python, Pandas, PyTorch", "quick_description": "Remote Europe"},
+        {"id": 4, "job_title": "Backend Developer", "tech_stack": "Python, Django", "quick_description": "On-site Buenos Aires"},
+    ])
+
+    start = time.perf_counter()
+    results = index.search_for_candidate({"role": "backend", "tech_stack": "nodejs, typescript", "location": "Argentina"}, top_n=3)
+    print(f"Backend Node.js candidate: {results} ({(time.perf_counter() - start) * 1000:.2f} ms)")
+    print(f"Python search: {index.search('python developer', top_n=3)}")
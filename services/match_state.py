@@ -0,0 +1,123 @@
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from common.database.database import unit_of_work
+from common.database.models.candidate import Candidate
+from common.database.models.job_posting import JobPosting
+from common.database.repositories.candidates import CandidatesRepository, CANDIDATE_PROFILE_COLUMNS
+from common.database.repositories.job_posting import JobPostingsRepository, JOB_POSTING_SUMMARY_COLUMNS
+
+# Fields whose changes make a candidate or a job posting worth matching again
+MATCHED_PROFILE_FIELDS = ('role', 'location', 'tech_stack')
+MATCHED_CONTENT_FIELDS = ('job_title', 'company_name', 'quick_description', 'company_type', 'industry', 'tech_stack', 'stage')
+
+
+def _fields_hash(row: Dict[str, Any], field_names) -> str:
+    """Stable hash of the given fields, normalized so whitespace or casing edits don't trigger a re-match"""
+    normalized = "\x1f".join(" ".join(str(row.get(name) or "").lower().split()) for name in field_names)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def profile_hash(candidate: Dict[str, Any]) -> str:
+    return _fields_hash(candidate, MATCHED_PROFILE_FIELDS)
+
+
+def content_hash(job_posting: Dict[str, Any]) -> str:
+    return _fields_hash(job_posting, MATCHED_CONTENT_FIELDS)
+
+
+@dataclass
+class MatchDelta:
+    """
+    Snapshot of the matching work pending since the last run.
+
+    Candidates and job_postings hold every candidate and active job posting, while the
+    hash maps only hold the ones that are new or changed since they were last matched,
+    with the hash to record once they are. A delta limited to some job postings doesn't pair
+    changed candidates with the rest, so it isn't a complete match of them.
+    """
+    candidates: List[Dict[str, Any]] = field(default_factory=list)
+    job_postings: List[Dict[str, Any]] = field(default_factory=list)
+    changed_candidate_hashes: Dict[int, str] = field(default_factory=dict)
+    changed_job_posting_hashes: Dict[int, str] = field(default_factory=dict)
+    job_postings_limited: bool = False
+
+    @property
+    def changed_candidates(self) -> List[Dict[str, Any]]:
+        return [c for c in self.candidates if c["id"] in self.changed_candidate_hashes]
+
+    @property
+    def unchanged_candidates(self) -> List[Dict[str, Any]]:
+        return [c for c in self.candidates if c["id"] not in self.changed_candidate_hashes]
+
+    @property
+    def changed_job_postings(self) -> List[Dict[str, Any]]:
+        return [j for j in self.job_postings if j["id"] in self.changed_job_posting_hashes]
+
+    @property
+    def pair_count(self) -> int:
+        """Candidate-job pairs to evaluate: changed candidates x active jobs plus the rest x changed jobs"""
+        changed_candidates = len(self.changed_candidate_hashes)
+        return (
+            changed_candidates * len(self.job_postings)
+            + (len(self.candidates) - changed_candidates) * len(self.changed_job_posting_hashes)
+        )
+
+    def is_empty(self) -> bool:
+        return self.pair_count == 0
+
+
+class MatchStateService:
+    """
+    Match-state watermark: tracks the profile each candidate and the content each job posting
+    were last matched with, so a matching run only evaluates what changed since the previous one.
+    """
+
+    def get_delta(self, *job_posting_criteria) -> MatchDelta:
+        """Pending work, optionally limited to the active job postings matching the criteria"""
+        delta = MatchDelta(job_postings_limited=bool(job_posting_criteria))
+        with unit_of_work():
+            for row in CandidatesRepository().stream_candidates(
+                Candidate.deleted_at.is_(None),
+                columns=CANDIDATE_PROFILE_COLUMNS + (Candidate.matched_profile_hash,)
+            ):
+                candidate = dict(row._mapping)
+                current_hash = profile_hash(candidate)
+                if candidate.pop("matched_profile_hash") != current_hash:
+                    delta.changed_candidate_hashes[candidate["id"]] = current_hash
+                delta.candidates.append(candidate)
+
+            for row in JobPostingsRepository().stream_active_job_postings(
+                *job_posting_criteria,
+                columns=JOB_POSTING_SUMMARY_COLUMNS + (JobPosting.matched_content_hash,)
+            ):
+                job_posting = dict(row._mapping)
+                current_hash = content_hash(job_posting)
+                if job_posting.pop("matched_content_hash") != current_hash:
+                    delta.changed_job_posting_hashes[job_posting["id"]] = current_hash
+                delta.job_postings.append(job_posting)
+
+        logging.info(
+            f"[MatchState] {len(delta.changed_candidate_hashes)}/{len(delta.candidates)} candidates and "
+            f"{len(delta.changed_job_posting_hashes)}/{len(delta.job_postings)} active job postings changed, "
+            f"{delta.pair_count} pairs pending"
+        )
+        return delta
+
+    def mark_matched(self, delta: MatchDelta):
+        """
+        Advance the watermark to the hashes captured in the delta. Anything edited after the
+        delta was taken keeps a different hash, so it's picked up again by the next run. Changed
+        candidates of a limited delta weren't paired with every active job posting, they stay
+        pending until a run over all of them
+        """
+        candidate_hashes = {} if delta.job_postings_limited else delta.changed_candidate_hashes
+        with unit_of_work():
+            CandidatesRepository().set_matched_profile_hashes(candidate_hashes)
+            JobPostingsRepository().set_matched_content_hashes(delta.changed_job_posting_hashes)
+        logging.info(
+            f"[MatchState] Marked {len(candidate_hashes)} candidates and "
+            f"{len(delta.changed_job_posting_hashes)} job postings as matched"
+        )
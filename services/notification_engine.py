@@ -0,0 +1,232 @@
+"""
+Match notification engine.
+
+Saving a match writes a notification_outbox event in the same transaction (see MatchesRepository), so
+every saved match is announced exactly when it's committed, without polling the matches table. The
+engine sends each candidate's pending events as one digest once the oldest has waited the digest
+window: matches landing in a burst (the chunks of one matching run) coalesce into a single message,
+and a candidate never gets more than one message per window. The due digests of a run are rendered in
+a few batched queries and fanned out concurrently by TelegramBulkSender; then the events of the
+delivered ones are closed and their matches stamped notified_at in one transaction.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from telegram import Bot
+
+from bot.bulk_sender import OutgoingMessage, SendOutcome, TelegramBulkSender
+from bot.rendering import chunk_message, renderer
+from common.config.config import (
+    TELEGRAM_BOT_TOKEN,
+    NOTIFICATION_DIGEST_WINDOW_MINUTES,
+    NOTIFICATION_MAX_DIGESTS_PER_RUN,
+)
+from common.database.database import unit_of_work
+from common.database.locks import advisory_lock
+from common.database.repositories.candidates import CandidatesRepository
+from common.database.repositories.job_posting import JobPostingsRepository
+from common.database.repositories.matches import MatchesRepository
+from common.database.repositories.notification_outbox import NotificationOutboxRepository
+from services.notification_service import NotificationService
+from services.run_ledger import record_count
+
+
+@dataclass
+class DispatchReport:
+    # Candidate ID -> sent, empty (nothing left to send), dropped (no reachable chat), busy or failed
+    outcomes: Dict[int, str] = field(default_factory=dict)
+
+    def count(self, outcome: str) -> int:
+        return sum(1 for value in self.outcomes.values() if value == outcome)
+
+    def __str__(self) -> str:
+        return ", ".join(f"{outcome}={self.count(outcome)}" for outcome in sorted(set(self.outcomes.values()))) or "nothing due"
+
+
+@dataclass
+class Digest:
+    candidate_id: int
+    chat_id: int
+    # One digest can take several messages when it's longer than Telegram allows
+    messages: List[str]
+    event_ids: List[int]
+    match_ids: List[int]
+
+
+class NotificationEngine:
+    def __init__(
+        self,
+        window_minutes: int = NOTIFICATION_DIGEST_WINDOW_MINUTES,
+        max_digests: int = NOTIFICATION_MAX_DIGESTS_PER_RUN,
+        bot_token: str = TELEGRAM_BOT_TOKEN,
+    ):
+        self.window = timedelta(minutes=window_minutes)
+        self.max_digests = max_digests
+        self.bot_token = bot_token
+        self.notification_service = NotificationService()
+
+    def get_due_candidate_ids(self) -> List[int]:
+        with unit_of_work():
+            return NotificationOutboxRepository().get_due_candidate_ids(datetime.now() - self.window, self.max_digests)
+
+    def dispatch(self) -> DispatchReport:
+        """Send the digests that are due. A digest that couldn't be delivered stays pending for the next run"""
+        report = DispatchReport()
+        with advisory_lock("notify:dispatch") as acquired:
+            if not acquired:
+                logging.info("[NotificationEngine] Another dispatch is running")
+                return report
+            candidate_ids = self.get_due_candidate_ids()
+            if candidate_ids:
+                self._deliver(self._build_digests(candidate_ids, report), report)
+        logging.info(f"[NotificationEngine] Dispatched {len(candidate_ids)} due digests: {report}")
+        record_count("items_processed", report.count("sent"))
+        for outcome in set(report.outcomes.values()):
+            record_count(f"digests_{outcome}", report.count(outcome))
+        return report
+
+    def send_candidate_digest(self, candidate_id: int) -> str:
+        """Single digest for the notify task handler. Raises when it wasn't delivered, so the task is retried"""
+        report = DispatchReport()
+        # Whoever holds the candidate's lock is already sending these events
+        with advisory_lock(f"notify:{candidate_id}") as acquired:
+            if not acquired:
+                return "busy"
+            self._deliver(self._build_digests([candidate_id], report), report)
+        outcome = report.outcomes[candidate_id]
+        if outcome == "failed":
+            raise RuntimeError(f"Digest of candidate {candidate_id} was not delivered")
+        return outcome
+
+    def _build_digests(self, candidate_ids: List[int], report: DispatchReport) -> List[Digest]:
+        """
+        Load the pending events of the candidates and render one digest each, in a few queries for the whole batch.
+        Events with nothing left to send (matches already notified, candidate without a chat) are closed here
+        """
+        with unit_of_work():
+            candidates = {candidate.id: candidate for candidate in CandidatesRepository().get_candidates_by_ids(candidate_ids)}
+            events = NotificationOutboxRepository().get_pending_events(candidate_ids)
+            matches = {
+                match.id: match
+                for match in MatchesRepository().get_unnotified_matches_by_ids([event.match_id for event in events])
+            } if events else {}
+
+        events_by_candidate: Dict[int, List] = {}
+        for event in events:
+            events_by_candidate.setdefault(event.candidate_id, []).append(event)
+
+        # Best first, as get_unnotified_matches_by_ids returns them
+        match_order = {match_id: index for index, match_id in enumerate(matches)}
+        matches_by_candidate: Dict[int, List] = {}
+        for candidate_id, candidate_events in events_by_candidate.items():
+            matches_by_candidate[candidate_id] = sorted(
+                (matches[event.match_id] for event in candidate_events if event.match_id in matches),
+                key=lambda match: match_order[match.id],
+            )
+
+        # The postings shown in every digest, in one query
+        with unit_of_work():
+            job_postings = {
+                job_posting.id: job_posting
+                for job_posting in JobPostingsRepository().get_job_postings_by_ids(list({
+                    match.job_posting_id for candidate_matches in matches_by_candidate.values() for match in candidate_matches[:renderer.max_listed]
+                }))
+            }
+
+        digests, closed_event_ids = [], []
+        for candidate_id in candidate_ids:
+            candidate_events = events_by_candidate.get(candidate_id)
+            candidate = candidates.get(candidate_id)
+            candidate_matches = matches_by_candidate.get(candidate_id)
+            if not candidate_events or not candidate_matches:
+                # Nothing pending, or matches already notified some other way
+                report.outcomes[candidate_id] = "empty"
+            elif not candidate or not candidate.telegram_chat_id:
+                report.outcomes[candidate_id] = "dropped"
+            else:
+                digests.append(Digest(
+                    candidate_id=candidate_id,
+                    chat_id=candidate.telegram_chat_id,
+                    messages=chunk_message(self.notification_service.send_matches_notification(
+                        candidate.telegram_chat_id, candidate_matches, candidate.language, job_postings
+                    )),
+                    event_ids=[event.id for event in candidate_events],
+                    match_ids=[match.id for match in candidate_matches],
+                ))
+                continue
+            closed_event_ids.extend(event.id for event in candidate_events or [])
+
+        if closed_event_ids:
+            self._mark_dispatched(closed_event_ids, [])
+        return digests
+
+    def _deliver(self, digests: List[Digest], report: DispatchReport):
+        if not digests:
+            return
+        outcomes = asyncio.run(self._send(digests))
+
+        delivered_event_ids, notified_match_ids, dropped_event_ids = [], [], []
+        for digest in digests:
+            outcome = outcomes[digest.candidate_id]
+            if outcome.delivered:
+                report.outcomes[digest.candidate_id] = "sent"
+                delivered_event_ids.extend(digest.event_ids)
+                notified_match_ids.extend(digest.match_ids)
+            elif outcome.status in ("blocked", "rejected"):
+                # Blocked the bot or the chat is gone: retrying won't help, the matches stay un-notified
+                report.outcomes[digest.candidate_id] = "dropped"
+                dropped_event_ids.extend(digest.event_ids)
+                logging.warning(f"[NotificationEngine] Dropped digest of candidate {digest.candidate_id}: {outcome.error}")
+            else:
+                report.outcomes[digest.candidate_id] = "failed"
+                logging.error(f"[NotificationEngine] Failed to send digest to candidate {digest.candidate_id}: {outcome.error}")
+
+        # Only what was delivered is marked notified
+        self._mark_dispatched(delivered_event_ids + dropped_event_ids, notified_match_ids)
+
+    async def _send(self, digests: List[Digest]) -> Dict[int, SendOutcome]:
+        # One client and one event loop for the whole fan-out
+        async with Bot(self.bot_token) as bot:
+            return await TelegramBulkSender(bot).send_all([
+                OutgoingMessage(key=digest.candidate_id, chat_id=digest.chat_id, text=message)
+                for digest in digests
+                for message in digest.messages
+            ])
+
+    @staticmethod
+    def _mark_dispatched(event_ids: List[int], notified_match_ids: List[int]):
+        with unit_of_work():
+            NotificationOutboxRepository().mark_dispatched(event_ids, notified_match_ids, datetime.now())
+
+    def backfill(self, since_hours: int = 24) -> int:
+        """Queue the un-notified matches of the last since_hours, e.g. ones saved before the outbox existed"""
+        now = datetime.now()
+        with unit_of_work():
+            return NotificationOutboxRepository().add_unnotified_since(now - timedelta(hours=since_hours), now)
+
+    def get_stats(self) -> dict:
+        with unit_of_work():
+            return NotificationOutboxRepository().get_stats(datetime.now())
+
+
+if __name__ == '__main__':
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Match notification outbox status and dispatch")
+    parser.add_argument("--backfill", type=int, metavar="HOURS", help="Queue un-notified matches of the last HOURS hours")
+    parser.add_argument("--dispatch", action="store_true", help="Send the digests that are due")
+    parser.add_argument("--window", type=int, default=NOTIFICATION_DIGEST_WINDOW_MINUTES, help="Digest window in minutes")
+    args = parser.parse_args()
+
+    engine = NotificationEngine(window_minutes=args.window)
+    if args.backfill is not None:
+        print(f"Queued {engine.backfill(args.backfill)} notification events")
+    if args.dispatch:
+        print(f"Dispatch: {engine.dispatch()}")
+    print(engine.get_stats())
@@ -1,62 +1,27 @@
 import logging
-from typing import List
+from typing import Dict, List, Optional
 import asyncio
 import re
 
+from bot.rendering import escape_markdown, renderer, safe_text
+from common.database.database import unit_of_work
 from common.database.models.match import Match
 from common.database.models.job_posting import JobPosting
 from common.database.repositories.job_posting import JobPostingsRepository
 
 
 class NotificationService:
-    def __init__(self):
-        self.job_postings_repo = JobPostingsRepository()
-
     def _escape_markdown(self, text: str) -> str:
         """
         Escape special characters that break Telegram markdown parsing
         """
-        if not text:
-            return text
-        
-        # Characters that need escaping in Telegram markdown
-        escape_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-        
-        escaped_text = text
-        for char in escape_chars:
-            escaped_text = escaped_text.replace(char, f'\\{char}')
-        
-        return escaped_text
+        return escape_markdown(text)
 
     def _safe_format_text(self, text: str) -> str:
         """
         Create a completely safe version of text by removing problematic characters
         """
-        if not text:
-            return text
-        
-        # Remove or replace problematic characters
-        safe_text = text
-        replacements = {
-            '*': '',
-            '_': '',
-            '[': '(',
-            ']': ')',
-            '`': "'",
-            '~': '-',
-            '>': '',
-            '#': '',
-            '+': 'plus',
-            '=': 'equals',
-            '|': 'or',
-            '{': '(',
-            '}': ')',
-        }
-        
-        for char, replacement in replacements.items():
-            safe_text = safe_text.replace(char, replacement)
-        
-        return safe_text
+        return safe_text(text)
 
     def _format_job_link(self, job_link: str) -> str:
         """
@@ -72,13 +37,15 @@ class NotificationService:
         # Telegram will still make it clickable
         return clean_link
 
-    def send_matches_notification(self, telegram_chat_id: int, matches: List[Match], language: str = 'en'):
+    def send_matches_notification(
+        self, telegram_chat_id: int, matches: List[Match], language: str = 'en', job_postings: Optional[Dict[int, JobPosting]] = None
+    ):
         """
         Send matches notification to a candidate via Telegram
         """
         try:
             # Format the message
-            message = self._format_matches_message(matches, language)
+            message = self._format_matches_message(matches, language, job_postings)
             
             # Return the formatted message - the calling code will handle sending
             logging.info(f"Formatted matches notification for {telegram_chat_id}")
@@ -88,66 +55,41 @@ class NotificationService:
             logging.error(f"Failed to format matches notification for {telegram_chat_id}: {e}")
             raise
 
-    def _format_matches_message(self, matches: List[Match], language: str) -> str:
+    def _format_matches_message(self, matches: List[Match], language: str, job_postings: Optional[Dict[int, JobPosting]] = None) -> str:
         """
-        Format matches into a readable message using plain text to avoid markdown parsing issues
+        Format matches into a readable message using plain text to avoid markdown parsing issues.
+        job_postings maps posting IDs to already loaded postings; when omitted they are loaded here.
         """
-        if language == 'es':
-            header = "🎯 Nuevas Oportunidades de Trabajo Encontradas!\n\n"
-            no_matches = "No se encontraron nuevas oportunidades de trabajo para ti en este momento."
-        else:
-            header = "🎯 New Job Opportunities Found!\n\n"
-            no_matches = "No new job opportunities found for you at this time."
+        # Load the displayed postings in one short unit of work instead of holding a session open
+        if matches and job_postings is None:
+            with unit_of_work():
+                job_postings_repo = JobPostingsRepository()
+                job_postings = {
+                    job.id: job
+                    for job in job_postings_repo.get_job_postings_by_ids(
+                        [match.job_posting_id for match in matches[:renderer.max_listed]]
+                    )
+                }
 
-        if not matches:
-            return header + no_matches
+        return renderer.render_digest(matches, job_postings or {}, language)
 
-        message_parts = [header]
-        
-        for i, match in enumerate(matches[:5], 1):  # Limit to 5 matches
-            # Get job posting details
-            job_posting = self.job_postings_repo.get_by_id(match.job_posting_id)
-            if not job_posting:
-                continue
-                
-            match_score = int(match.match_score * 100)
-            
-            # Use safe text formatting to remove problematic characters
-            job_title = self._safe_format_text(job_posting.job_title or 'Unknown Title')
-            company_name = self._safe_format_text(job_posting.company_name or 'Unknown Company')
-            location = self._safe_format_text(getattr(job_posting, 'location', 'Remote') or 'Remote')
-            
-            if language == 'es':
-                message_parts.append(
-                    f"{i}. {job_title}\n"
-                    f"🏢 {company_name}\n"
-                    f"📍 {location}\n"
-                    f"⭐ Match Score: {match_score}%\n"
-                    f"🔗 {job_posting.job_link}\n"
-                )
-            else:
-                message_parts.append(
-                    f"{i}. {job_title}\n"
-                    f"🏢 {company_name}\n"
-                    f"📍 {location}\n"
-                    f"⭐ Match Score: {match_score}%\n"
-                    f"🔗 {job_posting.job_link}\n"
-                )
-        
-        if len(matches) > 5:
-            if language == 'es':
-                message_parts.append(f"\n... y {len(matches) - 5} oportunidades más!")
-            else:
-                message_parts.append(f"\n... and {len(matches) - 5} more opportunities!")
-        
-        return "\n".join(message_parts)
+    def _format_match_entry(self, index: int, job_posting, match_score: float, language: str = 'en') -> str:
+        """Format a single numbered match; job_posting can be a JobPosting or a row with the same columns"""
+        return renderer.render_entry(index, job_posting, match_score, language)
+
+    def format_matches_page(self, rows: list, language: str, start_index: int = 1, query: Optional[str] = None) -> str:
+        """
+        Format one page of matches for the /matches command.
+        rows come from AsyncMatchesRepository.get_matches_page and already carry the job posting columns.
+        """
+        return renderer.render_matches_page(rows, language, start_index, query)
 
-    def format_matches_for_display(self, matches: List[Match], language: str) -> str:
+    def format_matches_for_display(self, matches: List[Match], language: str, job_postings: Optional[Dict[int, JobPosting]] = None) -> str:
         """
         Format matches for display (used by the /matches command)
         """
         try:
-            message = self._format_matches_message(matches, language)
+            message = self._format_matches_message(matches, language, job_postings)
             
             # Debug logging to help identify problematic content
             logging.info(f"Formatted message length: {len(message)}")
@@ -163,10 +105,7 @@ class NotificationService:
         except Exception as e:
             logging.error(f"Error formatting matches for display: {e}")
             # Return a safe fallback message
-            if language == 'es':
-                return "🔍 Error al formatear las coincidencias. Por favor intenta de nuevo."
-            else:
-                return "🔍 Error formatting matches. Please try again."
+            return renderer.render_format_error(language)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,309 @@
+"""
+Run ledger.
+
+Every cron and workflow execution writes a `runs` row with its stage durations, items processed,
+pages fetched, cache hits and misses, LLM requests, tokens and estimated cost, and errors, so runs of
+the same job can be compared to spot regressions and size budgets. The active RunLedger lives in a
+context variable: code deep inside a run (a browser loading a page, a cache lookup) records into it
+without being handed anything, and records nothing outside of a run. LLM usage is collected by a
+LangChain callback handler registered for the run's context, the way get_openai_callback does, so
+every model call made in the run is counted without passing callbacks around. Threads started by a
+run only see it when they run in a copy of the starting thread's context (contextvars.copy_context).
+"""
+
+import json
+import logging
+import os
+import socket
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_community.callbacks.openai_info import OpenAICallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+from common.database.database import unit_of_work
+from common.database.models.run import Run
+from common.database.repositories.runs import RunsRepository
+
+_current_run: ContextVar[Optional["RunLedger"]] = ContextVar("run_ledger", default=None)
+# LangChain adds the handler in this variable to the callbacks of every call made in the context
+_llm_usage: ContextVar[Optional[OpenAICallbackHandler]] = ContextVar("run_ledger_llm_usage", default=None)
+register_configure_hook(_llm_usage, inheritable=True)
+
+# Counters with a column of their own, the others are kept in the counters JSON
+COLUMN_COUNTERS = ("items_processed", "pages_fetched", "cache_hits", "cache_misses", "errors")
+LLM_USAGE_FIELDS = ("llm_requests", "prompt_tokens", "completion_tokens", "cost_usd")
+# Error messages kept per run, the errors column counts all of them
+MAX_ERROR_MESSAGES = 20
+
+
+class RunLedger:
+    """
+    Context manager recording one run. A run started while another is active is recorded as its child,
+    and its counters, stage durations and LLM usage are added to the parent's when it ends
+    """
+
+    def __init__(self, kind: str, name: str):
+        self.kind = kind
+        self.name = name
+        self.host = f"{socket.gethostname()}:{os.getpid()}"
+        self.run_id: Optional[int] = None
+        self.parent: Optional["RunLedger"] = None
+        self.status = "running"
+        self.counters: Dict[str, int] = {}
+        self.stages: Dict[str, float] = {}
+        self.error_messages: List[str] = []
+        self.llm_usage = OpenAICallbackHandler()
+        # Usage of finished child runs, which went to their own handlers
+        self._child_llm_usage: Dict[str, float] = dict.fromkeys(LLM_USAGE_FIELDS, 0)
+        self._lock = threading.Lock()
+        self._context_tokens = None
+        self._started = 0.0
+
+    def __enter__(self) -> "RunLedger":
+        self.parent = _current_run.get()
+        self._started = time.monotonic()
+        self.run_id = self._create()
+        self._context_tokens = (_current_run.set(self), _llm_usage.set(self.llm_usage))
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        run_token, usage_token = self._context_tokens
+        _llm_usage.reset(usage_token)
+        _current_run.reset(run_token)
+        if exc is not None:
+            self.fail(f"{exc_type.__name__}: {exc}")
+        elif self.status == "running":
+            self.status = "succeeded"
+        duration = time.monotonic() - self._started
+        if self.parent:
+            self.parent._add_child(self)
+        self._finish(duration)
+        logging.info(f"[RunLedger] {self.kind} {self.name} {self.status} in {duration:.1f}s: {self.totals()}")
+        return False
+
+    def count(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def cache_lookup(self, cache: str, hit: bool):
+        outcome = "hits" if hit else "misses"
+        with self._lock:
+            for counter in (f"cache_{outcome}", f"cache.{cache}.{outcome}"):
+                self.counters[counter] = self.counters.get(counter, 0) + 1
+
+    def error(self, message: str):
+        """Record an error the run recovered from"""
+        with self._lock:
+            self.counters["errors"] = self.counters.get("errors", 0) + 1
+            if len(self.error_messages) < MAX_ERROR_MESSAGES:
+                self.error_messages.append(message)
+
+    def fail(self, message: Optional[str] = None):
+        self.status = "failed"
+        if message:
+            self.error(message)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a stage, repeated stages (e.g. batches) add up"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.monotonic() - started)
+
+    def record_stage(self, name: str, seconds: float):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def llm_totals(self) -> Dict[str, float]:
+        usage = self.llm_usage
+        return {
+            "llm_requests": usage.successful_requests + self._child_llm_usage["llm_requests"],
+            "prompt_tokens": usage.prompt_tokens + self._child_llm_usage["prompt_tokens"],
+            "completion_tokens": usage.completion_tokens + self._child_llm_usage["completion_tokens"],
+            "cost_usd": usage.total_cost + self._child_llm_usage["cost_usd"],
+        }
+
+    def totals(self) -> Dict[str, Any]:
+        with self._lock:
+            totals = {counter: self.counters.get(counter, 0) for counter in COLUMN_COUNTERS}
+        return {**totals, **self.llm_totals()}
+
+    def _add_child(self, child: "RunLedger"):
+        child_usage = child.llm_totals()
+        with self._lock:
+            for counter, amount in child.counters.items():
+                self.counters[counter] = self.counters.get(counter, 0) + amount
+            for stage, seconds in child.stages.items():
+                self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+            for field in LLM_USAGE_FIELDS:
+                self._child_llm_usage[field] += child_usage[field]
+            self.error_messages.extend(child.error_messages[:MAX_ERROR_MESSAGES - len(self.error_messages)])
+
+    # Recording is best effort, a database hiccup must not stop the run itself
+    def _create(self) -> Optional[int]:
+        try:
+            with unit_of_work():
+                return RunsRepository().create_run(
+                    self.kind, self.name, self.host, datetime.now(), self.parent.run_id if self.parent else None
+                )
+        except Exception as e:
+            logging.warning(f"[RunLedger] Could not record the start of {self.kind} {self.name}: {e}")
+            return None
+
+    def _finish(self, duration: float):
+        if self.run_id is None:
+            return
+        with self._lock:
+            counters = {counter: amount for counter, amount in self.counters.items() if counter not in COLUMN_COUNTERS}
+            stages = {stage: round(seconds, 3) for stage, seconds in self.stages.items()}
+        try:
+            with unit_of_work():
+                RunsRepository().finish_run(
+                    self.run_id,
+                    status=self.status,
+                    finished_at=datetime.now(),
+                    duration_seconds=duration,
+                    stages=json.dumps(stages),
+                    counters=json.dumps(counters, sort_keys=True),
+                    error="\n".join(self.error_messages) or None,
+                    **self.totals(),
+                )
+        except Exception as e:
+            logging.warning(f"[RunLedger] Could not record the outcome of run {self.run_id}: {e}")
+
+
+def current_run() -> Optional[RunLedger]:
+    return _current_run.get()
+
+
+def record_count(counter: str, amount: int = 1):
+    """Add to a counter of the active run, if any"""
+    run = _current_run.get()
+    if run:
+        run.count(counter, amount)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    run = _current_run.get()
+    if run:
+        run.cache_lookup(cache, hit)
+
+
+def record_error(message: str):
+    run = _current_run.get()
+    if run:
+        run.error(message)
+
+
+@contextmanager
+def run_stage(name: str) -> Iterator[None]:
+    """Time a stage of the active run, if any"""
+    run = _current_run.get()
+    if run is None:
+        yield
+        return
+    with run.stage(name):
+        yield
+
+
+def run_metrics(run: Run) -> Dict[str, float]:
+    """Comparable figures of a recorded run, stage durations included as stage.<name>"""
+    lookups = run.cache_hits + run.cache_misses
+    items = run.items_processed
+    metrics = {
+        "duration_seconds": run.duration_seconds or 0.0,
+        "items_processed": items,
+        "seconds_per_item": (run.duration_seconds or 0.0) / items if items else 0.0,
+        "pages_fetched": run.pages_fetched,
+        "cache_hit_rate": run.cache_hits / lookups if lookups else 0.0,
+        "llm_requests": run.llm_requests,
+        "tokens": run.prompt_tokens + run.completion_tokens,
+        "cost_usd": run.cost_usd,
+        "cost_per_item_usd": run.cost_usd / items if items else 0.0,
+        "errors": run.errors,
+    }
+    for stage, seconds in json.loads(run.stages or "{}").items():
+        metrics[f"stage.{stage}"] = seconds
+    return metrics
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cost and throughput of cron and workflow runs")
+    parser.add_argument("--name", help="Only runs of this cron or workflow")
+    parser.add_argument("--limit", type=int, default=20, help="Runs to list")
+    parser.add_argument("--all", action="store_true", help="Also list runs started by other runs")
+    parser.add_argument("--show", type=int, metavar="RUN_ID", help="Show a run's stages, counters and child runs")
+    parser.add_argument("--compare", type=int, metavar="RUN_ID", help="Compare a run with earlier runs of the same name")
+    parser.add_argument("--against", type=int, metavar="RUN_ID", help="With --compare, compare with this run instead")
+    parser.add_argument("--baseline", type=int, default=10, help="Earlier successful runs the comparison takes the median of")
+    parser.add_argument("--threshold", type=float, default=25.0, help="Percent change flagged in a comparison")
+    args = parser.parse_args()
+
+    def print_run(run: Run, indent: str = ""):
+        lookups = run.cache_hits + run.cache_misses
+        hit_rate = f"{run.cache_hits / lookups:.0%}" if lookups else "-"
+        duration = f"{run.duration_seconds:.1f}s" if run.duration_seconds is not None else "-"
+        print(
+            f"{indent}#{run.id:<6} {run.started_at:%Y-%m-%d %H:%M} {run.kind:8} {run.name[:32]:32} {run.status:9} "
+            f"{duration:>9} items={run.items_processed:<6} pages={run.pages_fetched:<6} cache={hit_rate:>4} "
+            f"llm={run.llm_requests:<5} tokens={run.prompt_tokens + run.completion_tokens:<9} "
+            f"${run.cost_usd:<8.4f} errors={run.errors}"
+        )
+
+    with unit_of_work():
+        repository = RunsRepository()
+        if args.show:
+            run = repository.get_run(args.show)
+            if run is None:
+                raise SystemExit(f"Run {args.show} not found")
+            print_run(run)
+            print(f"  host: {run.host}")
+            for stage, seconds in json.loads(run.stages or "{}").items():
+                print(f"  stage {stage:30} {seconds:10.1f}s")
+            for counter, amount in json.loads(run.counters or "{}").items():
+                print(f"  {counter:36} {amount:10}")
+            for child in repository.get_children(run.id):
+                print_run(child, indent="  ")
+            if run.error:
+                print("  errors:\n    " + run.error.replace("\n", "\n    "))
+
+        elif args.compare:
+            run = repository.get_run(args.compare)
+            if run is None:
+                raise SystemExit(f"Run {args.compare} not found")
+            if args.against:
+                baseline_runs = [repository.get_run(args.against)]
+                if baseline_runs[0] is None:
+                    raise SystemExit(f"Run {args.against} not found")
+                label = f"run #{args.against}"
+            else:
+                baseline_runs = repository.get_previous_runs(run, args.baseline)
+                if not baseline_runs:
+                    raise SystemExit(f"No earlier successful runs of {run.name} to compare with")
+                label = f"median of {len(baseline_runs)}"
+
+            current = run_metrics(run)
+            baseline_metrics = [run_metrics(baseline_run) for baseline_run in baseline_runs]
+            print(f"Run #{run.id} {run.name} ({run.status}) against the {label}")
+            print(f"{'':32}{'run':>14}{'baseline':>14}{'change':>10}")
+            for metric in list(current) + sorted({key for metrics in baseline_metrics for key in metrics} - set(current)):
+                value = current.get(metric, 0.0)
+                baseline = statistics.median(metrics.get(metric, 0.0) for metrics in baseline_metrics)
+                change = (value - baseline) / baseline * 100 if baseline else None
+                flag = " !" if change is not None and abs(change) >= args.threshold else ""
+                change_text = f"{change:+.0f}%" if change is not None else "-"
+                print(f"{metric:32}{value:14.4g}{baseline:14.4g}{change_text:>10}{flag}")
+
+        else:
+            for run in repository.get_latest_runs(args.name, args.limit, include_children=args.all):
+                print_run(run)
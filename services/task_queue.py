@@ -0,0 +1,137 @@
+"""
+Durable work queue on the application database.
+
+Tasks are rows in the tasks table. Workers claim due tasks with SELECT ... FOR UPDATE SKIP LOCKED,
+so any number of worker processes, on one or many machines, share the work without a broker and
+without ever claiming the same task. A claimed task is leased to its worker: the worker renews the
+lease while the task runs, and a task whose lease runs out (the worker crashed or hung) is handed
+to another worker. Failed tasks are retried with exponential backoff and dead-lettered after
+max_attempts, where they stay for inspection until retried or purged.
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from common.config.config import TASK_LEASE_SECONDS, TASK_MAX_ATTEMPTS, TASK_RETRY_BASE_SECONDS
+from common.database.database import unit_of_work
+from common.database.models.task import Task
+from common.database.repositories.tasks import TasksRepository
+
+# Queues
+DISCOVER_URL_QUEUE = "discover_url"
+ENRICH_QUEUE = "enrich"
+MATCH_QUEUE = "match"
+MATCH_CHUNK_QUEUE = "match_chunk"
+NOTIFY_QUEUE = "notify"
+
+
+class TaskQueue:
+    def __init__(
+        self,
+        max_attempts: int = TASK_MAX_ATTEMPTS,
+        lease_seconds: int = TASK_LEASE_SECONDS,
+        retry_base_seconds: int = TASK_RETRY_BASE_SECONDS,
+    ):
+        self.max_attempts = max_attempts
+        self.lease = timedelta(seconds=lease_seconds)
+        self.retry_base_seconds = retry_base_seconds
+
+    def enqueue(self, queue: str, payload: Optional[Dict[str, Any]] = None, dedupe_key: Optional[str] = None, delay_seconds: float = 0) -> bool:
+        """False if a pending task with the same dedupe_key was already queued"""
+        return self.enqueue_many(queue, [payload or {}], [dedupe_key], delay_seconds) == 1
+
+    def enqueue_many(
+        self,
+        queue: str,
+        payloads: List[Dict[str, Any]],
+        dedupe_keys: Optional[List[Optional[str]]] = None,
+        delay_seconds: float = 0,
+    ) -> int:
+        run_at = datetime.now() + timedelta(seconds=delay_seconds)
+        rows = [
+            {
+                "queue": queue,
+                "payload": json.dumps(payload, default=str),
+                "dedupe_key": dedupe_key,
+                "max_attempts": self.max_attempts,
+                "run_at": run_at,
+            }
+            for payload, dedupe_key in zip(payloads, dedupe_keys or [None] * len(payloads))
+        ]
+        with unit_of_work():
+            inserted = TasksRepository().enqueue(rows)
+        logging.info(f"[TaskQueue] Enqueued {inserted}/{len(rows)} {queue} tasks")
+        return inserted
+
+    def claim(self, queues: Optional[Iterable[str]], worker_id: str, limit: int = 1) -> List[Task]:
+        now = datetime.now()
+        with unit_of_work():
+            return TasksRepository().claim(queues, worker_id, limit, now, now + self.lease)
+
+    def renew_leases(self, task_ids: List[int], worker_id: str) -> int:
+        with unit_of_work():
+            return TasksRepository().extend_leases(task_ids, worker_id, datetime.now() + self.lease)
+
+    def complete(self, task: Task, worker_id: str):
+        with unit_of_work():
+            if not TasksRepository().complete(task.id, worker_id, datetime.now()):
+                logging.warning(f"[TaskQueue] Task {task.id} finished after its lease was lost, result kept by the new owner")
+
+    def fail(self, task: Task, worker_id: str, error: str) -> str:
+        """Schedule a retry with exponential backoff, or dead-letter the task once out of attempts"""
+        now = datetime.now()
+        retry_at = None
+        if task.attempts < task.max_attempts:
+            retry_at = now + timedelta(seconds=self.retry_base_seconds * 2 ** (task.attempts - 1))
+        with unit_of_work():
+            TasksRepository().fail(task.id, worker_id, error, now, retry_at)
+        return "retry" if retry_at else "dead"
+
+    def requeue_expired_leases(self) -> int:
+        with unit_of_work():
+            requeued = TasksRepository().requeue_expired_leases(datetime.now())
+        if requeued:
+            logging.warning(f"[TaskQueue] Released {requeued} tasks whose lease expired")
+        return requeued
+
+    def retry_dead(self, queue: Optional[str] = None) -> int:
+        with unit_of_work():
+            return TasksRepository().retry_dead(datetime.now(), queue)
+
+    def purge_done(self, older_than_days: int = 7) -> int:
+        with unit_of_work():
+            return TasksRepository().purge_done(datetime.now() - timedelta(days=older_than_days))
+
+    def get_dead_tasks(self, queue: Optional[str] = None, limit: int = 20) -> List[Task]:
+        with unit_of_work():
+            return TasksRepository().get_dead_tasks(queue, limit)
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        with unit_of_work():
+            return TasksRepository().get_stats(datetime.now())
+
+
+task_queue = TaskQueue()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Task queue status and maintenance")
+    parser.add_argument("--dead", action="store_true", help="Show the latest dead-lettered tasks")
+    parser.add_argument("--retry-dead", nargs="?", const="", metavar="QUEUE", help="Retry dead-lettered tasks, of one queue or all")
+    parser.add_argument("--purge-done", type=int, metavar="DAYS", help="Delete tasks finished more than DAYS days ago")
+    args = parser.parse_args()
+
+    if args.retry_dead is not None:
+        print(f"Retrying {task_queue.retry_dead(args.retry_dead or None)} dead tasks")
+    if args.purge_done is not None:
+        print(f"Purged {task_queue.purge_done(args.purge_done)} done tasks")
+    if args.dead:
+        for task in task_queue.get_dead_tasks():
+            print(f"#{task.id:<6} {task.queue:12} attempts={task.attempts} finished={task.finished_at:%Y-%m-%d %H:%M} {task.last_error}")
+
+    for queue, counts in task_queue.get_stats().items():
+        print(f"{queue:12} " + " ".join(f"{status}={count}" for status, count in counts.items()))
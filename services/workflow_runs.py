@@ -0,0 +1,163 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from common.config.config import WORKFLOW_RESUME_MAX_AGE_HOURS
+from common.database.database import unit_of_work
+from common.database.models.job_posting import JobPosting
+from common.database.models.workflow_run import WorkflowRun
+from common.database.repositories.job_posting import JobPostingsRepository
+from common.database.repositories.workflow_runs import WorkflowRunsRepository, RESUMABLE_STATUSES
+
+# Stages of the job matching workflow, in order. A run's stage is the next one to run
+STAGES = ("fetching_jobs", "enriching_jobs", "matching_candidates", "done")
+
+
+class WorkflowCheckpoint:
+    """
+    Durable progress of a workflow run: the stage it's in and the stage each of its job postings
+    reached. A run that crashed or was restarted resumes from its checkpoint, skipping completed
+    stages and postings, so a restart doesn't pay again for scraping and LLM calls already made.
+    """
+
+    def __init__(self, run_id: int):
+        self.run_id = run_id
+
+    @classmethod
+    def start(cls, workflow: str, resume: bool = True) -> "WorkflowCheckpoint":
+        """Resume the workflow's latest unfinished run, or start a new one"""
+        now = datetime.now()
+        with unit_of_work():
+            repository = WorkflowRunsRepository()
+            run = repository.get_resumable_run(workflow) if resume else None
+            if run and run.started_at < now - timedelta(hours=WORKFLOW_RESUME_MAX_AGE_HOURS):
+                # Postings discovered that long ago are stale, start over instead
+                logging.info(f"[WorkflowRun] Abandoning run {run.id} started at {run.started_at}")
+                repository.update_run(run.id, status="abandoned", updated_at=now, finished_at=now)
+                run = None
+            if run:
+                attempt = run.attempts + 1
+                repository.update_run(run.id, status="running", attempts=attempt, updated_at=now)
+                logging.info(f"[WorkflowRun] Resuming run {run.id} at {run.stage} (attempt {attempt})")
+            else:
+                run = repository.create_run(workflow, STAGES[0], now)
+                logging.info(f"[WorkflowRun] Started run {run.id}")
+            return cls(run.id)
+
+    @classmethod
+    def resume(cls, run_id: int) -> "WorkflowCheckpoint":
+        """Resume a specific run, whatever its age"""
+        with unit_of_work():
+            repository = WorkflowRunsRepository()
+            run = repository.get_run(run_id)
+            if run is None:
+                raise ValueError(f"Workflow run {run_id} not found")
+            if run.status not in RESUMABLE_STATUSES + ("abandoned",):
+                raise ValueError(f"Workflow run {run_id} is {run.status}, it can't be resumed")
+            attempt = run.attempts + 1
+            repository.update_run(run_id, status="running", attempts=attempt, updated_at=datetime.now())
+        logging.info(f"[WorkflowRun] Resuming run {run_id} at {run.stage} (attempt {attempt})")
+        return cls(run_id)
+
+    def get_run(self) -> WorkflowRun:
+        with unit_of_work():
+            return WorkflowRunsRepository().get_run(self.run_id)
+
+    def is_stage_done(self, stage: str) -> bool:
+        return STAGES.index(self.get_run().stage) > STAGES.index(stage)
+
+    def complete_stage(self, stage: str):
+        """Advance the run past the stage, unless an earlier stage is still pending"""
+        with unit_of_work():
+            repository = WorkflowRunsRepository()
+            if repository.get_run(self.run_id).stage != stage:
+                return
+            repository.update_run(self.run_id, stage=STAGES[STAGES.index(stage) + 1], updated_at=datetime.now())
+        logging.info(f"[WorkflowRun] Run {self.run_id} completed {stage}")
+
+    def record_discovered(self, job_links: List[str]):
+        """Listener for job_posting_events: postings saved by discovery join the run"""
+        self.add_job_postings(JobPosting.job_link.in_(job_links))
+
+    def add_job_postings(self, *criteria):
+        with unit_of_work():
+            job_posting_ids = [
+                row.id for row in JobPostingsRepository().stream_job_postings(*criteria, columns=(JobPosting.id,))
+            ]
+            WorkflowRunsRepository().add_items(self.run_id, job_posting_ids, datetime.now())
+
+    def get_job_posting_ids(self, stage: Optional[str] = None, status: Optional[str] = None) -> List[int]:
+        with unit_of_work():
+            return WorkflowRunsRepository().get_item_job_posting_ids(self.run_id, stage, status)
+
+    def record_enrichment(self, results: List[Dict[str, Any]]):
+        """
+        Enrichment pipeline save hook, runs in the unit of work saving the results so the postings
+        and their checkpoint are committed together
+        """
+        now = datetime.now()
+        with unit_of_work():
+            WorkflowRunsRepository().update_items(self.run_id, [
+                {
+                    "job_posting_id": result["id"],
+                    "stage": "enriched",
+                    "status": result["status"],
+                    "error": result.get("error"),
+                    "updated_at": now,
+                }
+                for result in results
+            ])
+
+    def sync_enriched(self) -> int:
+        with unit_of_work():
+            return WorkflowRunsRepository().sync_enriched_items(self.run_id, datetime.now())
+
+    def record_matched(self) -> int:
+        """Enriched active postings of the run were matched"""
+        with unit_of_work():
+            return WorkflowRunsRepository().advance_items(self.run_id, "enriched", "matched", datetime.now(), status="active")
+
+    def finish(self, errors: List[str]):
+        """Completed once every stage is done, failed (and resumable) otherwise"""
+        now = datetime.now()
+        with unit_of_work():
+            repository = WorkflowRunsRepository()
+            completed = repository.get_run(self.run_id).stage == STAGES[-1]
+            repository.update_run(
+                self.run_id,
+                status="completed" if completed else "failed",
+                error="\n".join(errors) or None,
+                updated_at=now,
+                finished_at=now if completed else None,
+            )
+        logging.info(f"[WorkflowRun] Run {self.run_id} {'completed' if completed else 'failed'}")
+
+    def abandon(self):
+        now = datetime.now()
+        with unit_of_work():
+            WorkflowRunsRepository().update_run(self.run_id, status="abandoned", updated_at=now, finished_at=now)
+
+    def summary(self) -> Dict[str, Any]:
+        with unit_of_work():
+            repository = WorkflowRunsRepository()
+            run = repository.get_run(self.run_id)
+            if run is None:
+                raise ValueError(f"Workflow run {self.run_id} not found")
+            return {
+                "id": run.id,
+                "workflow": run.workflow,
+                "status": run.status,
+                "stage": run.stage,
+                "attempts": run.attempts,
+                "started_at": run.started_at,
+                "updated_at": run.updated_at,
+                "finished_at": run.finished_at,
+                "error": run.error,
+                "items": repository.count_items(run.id),
+            }
+
+
+def list_workflow_runs(limit: int = 20) -> List[Dict[str, Any]]:
+    with unit_of_work():
+        runs = WorkflowRunsRepository().list_runs(limit)
+    return [WorkflowCheckpoint(run.id).summary() for run in runs]
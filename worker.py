@@ -0,0 +1,42 @@
+"""
+Task queue worker. Run any number of copies, on one machine or many, next to the bot process:
+
+    python worker.py                      # every queue, WORKER_CONCURRENCY tasks at a time
+    python worker.py --queues enrich match_chunk --concurrency 4
+    python worker.py --once               # drain the queues and exit
+"""
+
+import argparse
+import logging
+import signal
+
+from workers.task_worker import TaskWorker
+from workers.tasks import HANDLERS, enqueue_urls
+from common.config.config import WORKER_CONCURRENCY
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Run queued discovery, enrichment, matching and notification tasks")
+    parser.add_argument("--queues", nargs="+", choices=sorted(HANDLERS), help="Queues to work on (default: all)")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY, help="Tasks run at the same time")
+    parser.add_argument("--once", action="store_true", help="Exit once the queues are drained")
+    parser.add_argument("--enqueue-url", nargs="+", metavar="URL", help="Queue URLs for discovery before starting")
+    args = parser.parse_args()
+
+    if args.enqueue_url:
+        enqueue_urls(args.enqueue_url)
+
+    worker = TaskWorker(HANDLERS, queues=args.queues, concurrency=args.concurrency)
+
+    def signal_handler(signum, frame):
+        # Running tasks finish, unclaimed ones stay queued for other workers
+        logging.info(f"Received signal {signum}, stopping after the running tasks...")
+        worker.stop()
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+    worker.run(once=args.once)
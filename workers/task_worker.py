@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from common.config.config import WORKER_CONCURRENCY, TASK_POLL_SECONDS
+from common.database.models.task import Task
+from services.task_queue import TaskQueue, task_queue as default_task_queue
+
+
+class TaskWorker:
+    """
+    Runs queued tasks with `concurrency` threads, each claiming one task at a time. A maintenance
+    thread renews the leases of running tasks and releases tasks of workers whose lease expired.
+    Any number of TaskWorker processes can run against the same database.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, Callable[[Dict[str, Any]], None]],
+        queues: Optional[Iterable[str]] = None,
+        concurrency: int = WORKER_CONCURRENCY,
+        poll_seconds: float = TASK_POLL_SECONDS,
+        task_queue: TaskQueue = default_task_queue,
+    ):
+        self.handlers = handlers
+        self.queues = list(queues or handlers)
+        unknown = set(self.queues) - set(handlers)
+        if unknown:
+            raise ValueError(f"No handler for queues: {', '.join(sorted(unknown))}")
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.task_queue = task_queue
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        # Task ID -> worker ID of the tasks running in this process
+        self._running: Dict[int, str] = {}
+        self.counters = {"done": 0, "retry": 0, "dead": 0}
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, once: bool = False):
+        """Process tasks until stop() is called, or until the queues are drained when once is set"""
+        self._stop.clear()
+        logging.info(f"[TaskWorker] {self.name} starting {self.concurrency} threads on queues {', '.join(self.queues)}")
+        maintenance = threading.Thread(target=self._maintain, name="task-maintenance", daemon=True)
+        maintenance.start()
+        threads = [
+            threading.Thread(target=self._loop, args=(f"{self.name}:{slot}", once), name=f"task-worker-{slot}", daemon=True)
+            for slot in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self._stop.set()
+        maintenance.join()
+        logging.info(f"[TaskWorker] {self.name} stopped: {self.counters}")
+        return self.counters
+
+    def _loop(self, worker_id: str, once: bool):
+        while not self._stop.is_set():
+            try:
+                tasks = self.task_queue.claim(self.queues, worker_id)
+            except Exception as e:
+                logging.error(f"[TaskWorker] Claim failed: {e}")
+                tasks = []
+            if not tasks:
+                if once:
+                    return
+                self._stop.wait(self.poll_seconds)
+                continue
+            for task in tasks:
+                self._execute(task, worker_id)
+
+    def _execute(self, task: Task, worker_id: str):
+        with self._lock:
+            self._running[task.id] = worker_id
+        started = time.monotonic()
+        try:
+            self.handlers[task.queue](json.loads(task.payload))
+            self.task_queue.complete(task, worker_id)
+            outcome = "done"
+            logging.info(f"[TaskWorker] {task.queue} task {task.id} done in {time.monotonic() - started:.1f}s")
+        except Exception as e:
+            try:
+                outcome = self.task_queue.fail(task, worker_id, f"{type(e).__name__}: {e}")
+            except Exception as fail_error:
+                # The task stays running until its lease expires, then it's requeued like a crashed worker's
+                logging.error(f"[TaskWorker] Recording the failure of task {task.id} failed: {fail_error}")
+                outcome = "retry"
+            logging.error(
+                f"[TaskWorker] {task.queue} task {task.id} failed (attempt {task.attempts}/{task.max_attempts}, "
+                f"{'retrying' if outcome == 'retry' else 'dead-lettered'}): {e}"
+            )
+        finally:
+            with self._lock:
+                self._running.pop(task.id, None)
+        with self._lock:
+            self.counters[outcome] += 1
+
+    def _maintain(self):
+        # Well within the lease, so a renewal can fail once without losing the task
+        interval = max(1.0, self.task_queue.lease.total_seconds() / 3)
+        while not self._stop.wait(interval):
+            try:
+                with self._lock:
+                    running = dict(self._running)
+                by_worker: Dict[str, list] = {}
+                for task_id, worker_id in running.items():
+                    by_worker.setdefault(worker_id, []).append(task_id)
+                for worker_id, task_ids in by_worker.items():
+                    self.task_queue.renew_leases(task_ids, worker_id)
+                self.task_queue.requeue_expired_leases()
+            except Exception as e:
+                logging.error(f"[TaskWorker] Lease maintenance failed: {e}")
@@ -0,0 +1,183 @@
+"""
+Task queue handlers and producers.
+
+Each queue has a handler that receives the task's JSON payload. A handler raising an exception
+fails the task, which is retried with backoff and dead-lettered after TASK_MAX_ATTEMPTS, so
+handlers are written to be safe to run again: enrichment skips postings already enriched,
+notifications skip matches already notified, and matching upserts.
+"""
+
+import hashlib
+import logging
+from typing import Any, Callable, Dict, List
+
+from agents.candidate_matcher.batch_scorer import BatchMatchScorer, chunk_work_items
+from agents.candidate_matcher.compact_format import CompactPromptSerializer
+from agents.candidate_matcher.shortlist import build_match_shortlist
+from agents.common.tools.batch_process_urls import process_single_url
+from agents.job_enricher.pipeline import JobEnrichmentPipeline
+from agents.job_seeker.agent import JobSeekerAgent
+from common.config.config import ENRICHMENT_BATCH_SIZE, MATCHER_CHUNK_TOKEN_BUDGET
+from common.database.database import unit_of_work
+from common.database.models.job_posting import JobPosting
+from common.database.repositories.job_posting import JobPostingsRepository
+from services.job_posting_events import job_posting_events
+from services.job_posting_index import index_job_postings
+from services.match_state import MatchStateService
+from services.notification_engine import NotificationEngine
+from services.task_queue import (
+    task_queue,
+    DISCOVER_URL_QUEUE,
+    ENRICH_QUEUE,
+    MATCH_QUEUE,
+    MATCH_CHUNK_QUEUE,
+    NOTIFY_QUEUE,
+)
+
+
+# Producers
+def enqueue_urls(urls: List[str]) -> int:
+    return task_queue.enqueue_many(
+        DISCOVER_URL_QUEUE,
+        [{"url": url} for url in urls],
+        [f"url:{hashlib.sha1(url.encode('utf-8')).hexdigest()}" for url in urls],
+    )
+
+
+def enqueue_enrichment(job_posting_ids: List[int]) -> int:
+    """
+    Enrichment tasks of ENRICHMENT_BATCH_SIZE postings. A posting queued twice is only visited once,
+    the handler skips postings enriched in the meantime
+    """
+    job_posting_ids = sorted(set(job_posting_ids))
+    batches = [job_posting_ids[i:i + ENRICHMENT_BATCH_SIZE] for i in range(0, len(job_posting_ids), ENRICHMENT_BATCH_SIZE)]
+    return task_queue.enqueue_many(
+        ENRICH_QUEUE,
+        [{"job_posting_ids": batch} for batch in batches],
+        [f"enrich:{batch[0]}-{batch[-1]}:{len(batch)}" for batch in batches],
+    )
+
+
+def enqueue_enrichment_for_links(job_links: List[str]):
+    """job_posting_events listener: saved postings are queued for enrichment as they land"""
+    with unit_of_work():
+        job_posting_ids = [
+            row.id for row in JobPostingsRepository().stream_job_postings(
+                JobPosting.job_link.in_(job_links), JobPosting.enriched_at.is_(None), columns=(JobPosting.id,)
+            )
+        ]
+    enqueue_enrichment(job_posting_ids)
+
+
+def enqueue_enrichment_backlog() -> int:
+    with unit_of_work():
+        job_posting_ids = [
+            row.id for row in JobPostingsRepository().stream_unenriched_job_postings(columns=(JobPosting.id,))
+        ]
+    return enqueue_enrichment(job_posting_ids)
+
+
+def enqueue_matching() -> bool:
+    # A single pending matching task covers whatever changed before it runs
+    return task_queue.enqueue(MATCH_QUEUE, dedupe_key="match")
+
+
+def enqueue_match_notifications() -> int:
+    """One task per candidate whose notification digest is due"""
+    candidate_ids = NotificationEngine().get_due_candidate_ids()
+    return task_queue.enqueue_many(
+        NOTIFY_QUEUE,
+        [{"candidate_id": candidate_id} for candidate_id in candidate_ids],
+        [f"notify:{candidate_id}" for candidate_id in candidate_ids],
+    )
+
+
+def enqueue_job_matching():
+    """
+    Queue mode of the job matching workflow: discovery runs here, postings are queued for enrichment
+    as the agent saves them, and the workers take enrichment and matching from there
+    """
+    job_posting_events.subscribe(enqueue_enrichment_for_links)
+    try:
+        JobSeekerAgent().exec()
+    except Exception as e:
+        logging.error(f"[Tasks] Discovery failed: {e}")
+    finally:
+        job_posting_events.unsubscribe(enqueue_enrichment_for_links)
+    # Postings earlier runs didn't get to enrich, and candidates whose profile changed
+    enqueue_enrichment_backlog()
+    enqueue_matching()
+
+
+# Handlers
+def process_url(payload: Dict[str, Any]):
+    """Discover the job postings behind a URL (a posting, a listing or a careers page) and save them"""
+    result = process_single_url(payload["url"])
+    job_postings = [
+        {
+            "job_link": job["url"],
+            "job_title": job["title"],
+            "company_name": job["company"],
+            "quick_description": job.get("description"),
+        }
+        for job in result["jobs"] if job.get("title") and job.get("company")
+    ]
+    if not job_postings:
+        if result["errors"]:
+            raise RuntimeError("; ".join(result["errors"]))
+        return
+
+    with unit_of_work():
+        JobPostingsRepository().save_job_postings(job_postings)
+    job_links = [job["job_link"] for job in job_postings]
+    try:
+        index_job_postings(JobPosting.job_link.in_(job_links))
+    except Exception as e:
+        logging.error(f"[Tasks] Error indexing saved job postings: {e}")
+    job_posting_events.publish_saved(job_links)
+    enqueue_enrichment_for_links(job_links)
+
+
+def enrich_job_postings(payload: Dict[str, Any]):
+    report = JobEnrichmentPipeline().run(
+        JobPosting.id.in_(payload["job_posting_ids"]), JobPosting.enriched_at.is_(None)
+    )
+    if report.count("skipped"):
+        raise RuntimeError(f"{report.count('skipped')} job postings skipped, no browser available")
+    if report.results:
+        enqueue_matching()
+
+
+def plan_matching(payload: Dict[str, Any]):
+    """
+    Split the pending delta into scoring chunks queued for the workers. The chunks are queued and
+    the watermark advanced in one transaction: from then on the queue owns the work, retrying and
+    dead-lettering chunks like any other task
+    """
+    match_state = MatchStateService()
+    delta = match_state.get_delta()
+    if delta.is_empty():
+        return
+    chunks = chunk_work_items(build_match_shortlist(delta), MATCHER_CHUNK_TOKEN_BUDGET, CompactPromptSerializer())
+    with unit_of_work():
+        task_queue.enqueue_many(MATCH_CHUNK_QUEUE, [{"work_items": chunk} for chunk in chunks])
+        match_state.mark_matched(delta)
+
+
+def score_match_chunk(payload: Dict[str, Any]):
+    result = BatchMatchScorer().run(payload["work_items"])
+    if result.failed_chunks:
+        raise RuntimeError(f"{result.failed_chunks}/{result.chunks} scoring calls failed")
+
+
+def send_match_notification(payload: Dict[str, Any]):
+    NotificationEngine().send_candidate_digest(payload["candidate_id"])
+
+
+HANDLERS: Dict[str, Callable[[Dict[str, Any]], None]] = {
+    DISCOVER_URL_QUEUE: process_url,
+    ENRICH_QUEUE: enrich_job_postings,
+    MATCH_QUEUE: plan_matching,
+    MATCH_CHUNK_QUEUE: score_match_chunk,
+    NOTIFY_QUEUE: send_match_notification,
+}
@@ -1,10 +1,18 @@
-from typing import Dict, Any, List, TypedDict
+from typing import Dict, Any, List, Optional, TypedDict
 from langgraph.graph import StateGraph, END
 from agents.job_seeker.agent import JobSeekerAgent
-from agents.candidate_matcher.agent import CandidateMatcherAgent
+from agents.candidate_matcher.batch_scorer import score_pending_matches
 from agents.job_enricher.agent import JobEnricherAgent
+from agents.job_enricher.pipeline import JobEnrichmentPipeline
+from common.config.config import ENRICHMENT_MODE
+from common.database.models.job_posting import JobPosting
+from services.job_posting_events import job_posting_events
+from services.run_ledger import RunLedger, record_count, run_stage
+from services.workflow_runs import WorkflowCheckpoint, list_workflow_runs
 import logging
 
+WORKFLOW_NAME = "job_matching"
+
 # Define the state schema as a TypedDict for proper LangGraph compatibility
 class WorkflowState(TypedDict):
     job_postings: List[Dict[str, Any]]
@@ -12,26 +20,36 @@ class WorkflowState(TypedDict):
     matches: List[Dict[str, Any]]
     errors: List[str]
     current_step: str
+    # Checkpointed run the state belongs to, see services/workflow_runs.py
+    run_id: int
 
-# Node functions for the workflow - these must return dictionaries
+# Node functions for the workflow - these must return dictionaries. Each one is timed as a stage of the run in the ledger
+@run_stage("fetching_jobs")
 def fetch_job_postings(state: WorkflowState) -> WorkflowState:
     """Step 1: Fetch job postings using the job seeker agent"""
+    checkpoint = WorkflowCheckpoint(state["run_id"])
     try:
+        if checkpoint.is_stage_done("fetching_jobs"):
+            logging.info("Job postings already fetched by this run - skipping fetch step")
+            return {
+                **state,
+                "job_postings": [{"id": job_posting_id} for job_posting_id in checkpoint.get_job_posting_ids()],
+                "current_step": "fetching_jobs"
+            }
+
         logging.info("Starting job posting fetch step")
         
-        job_seeker = JobSeekerAgent()
-        result = job_seeker.exec()
+        # The agent's output is free text, the postings it saved are recorded in the run as they land
+        job_posting_events.subscribe(checkpoint.record_discovered)
+        try:
+            JobSeekerAgent().exec()
+        finally:
+            job_posting_events.unsubscribe(checkpoint.record_discovered)
+        checkpoint.complete_stage("fetching_jobs")
         
-        # Parse the result to get job postings
-        # This depends on how your job_seeker agent returns data
-        if isinstance(result, dict):
-            job_postings = result.get('job_postings', [])
-        elif isinstance(result, list):
-            job_postings = result
-        else:
-            job_postings = []
-            
+        job_postings = [{"id": job_posting_id} for job_posting_id in checkpoint.get_job_posting_ids()]
         logging.info(f"Fetched {len(job_postings)} job postings")
+        record_count("job_postings_discovered", len(job_postings))
         
         # If no job postings found, log a warning but continue
         if not job_postings:
@@ -51,33 +69,67 @@ def fetch_job_postings(state: WorkflowState) -> WorkflowState:
             "current_step": "fetching_jobs"
         }
 
+@run_stage("enriching_jobs")
 def enrich_job_postings_step(state: WorkflowState) -> WorkflowState:
-    """Step 2: Enrich job postings with detailed descriptions using the job enricher agent"""
+    """Step 2: Enrich job postings with detailed descriptions, directly or through the job enricher agent"""
+    checkpoint = WorkflowCheckpoint(state["run_id"])
     try:
+        if checkpoint.is_stage_done("enriching_jobs"):
+            logging.info("Job postings already enriched by this run - skipping enrichment step")
+            return {
+                **state,
+                "enriched_jobs": [],
+                "current_step": "enriching_jobs"
+            }
+
         logging.info("Starting job enrichment step")
         
-        job_postings = state.get("job_postings", [])
-        if not job_postings:
+        # Postings earlier runs didn't get to enrich are part of this run too
+        checkpoint.add_job_postings(JobPosting.enriched_at.is_(None))
+        pending_ids = checkpoint.get_job_posting_ids(stage="discovered")
+        if not pending_ids:
             logging.warning("No job postings to enrich - skipping enrichment step")
+            checkpoint.complete_stage("enriching_jobs")
             return {
                 **state,
                 "enriched_jobs": [],
                 "current_step": "enriching_jobs"
             }
         
-        # Use the job enricher agent
-        job_enricher = JobEnricherAgent()
-        result = job_enricher.exec()
-        
-        # Parse the result to get enriched jobs
-        if isinstance(result, dict):
-            enriched_results = result.get('enriched_jobs', [])
-        elif isinstance(result, list):
-            enriched_results = result
+        if ENRICHMENT_MODE == "agent":
+            # Use the job enricher agent
+            job_enricher = JobEnricherAgent()
+            result = job_enricher.exec()
+            
+            # Parse the result to get enriched jobs
+            if isinstance(result, dict):
+                enriched_results = result.get('enriched_jobs', [])
+            elif isinstance(result, list):
+                enriched_results = result
+            else:
+                enriched_results = []
         else:
-            enriched_results = []
+            # Enrichment is deterministic, run it directly without an LLM round trip. Each saved batch is
+            # checkpointed with the postings, postings enriched before a crash aren't visited again
+            enriched_results = JobEnrichmentPipeline(on_save=checkpoint.record_enrichment).run(
+                JobPosting.id.in_(pending_ids), JobPosting.enriched_at.is_(None)
+            ).results
+        # Postings enriched before they were saved again by this run, or by the agent
+        checkpoint.sync_enriched()
             
         logging.info(f"Enriched {len(enriched_results)} job postings")
+        record_count("job_postings_enriched", len(enriched_results))
+
+        not_enriched = checkpoint.get_job_posting_ids(stage="discovered")
+        if not_enriched:
+            # The stage stays pending, resuming the run retries only these postings
+            return {
+                **state,
+                "enriched_jobs": enriched_results,
+                "errors": state.get("errors", []) + [f"Enrichment error: {len(not_enriched)} job postings not enriched"],
+                "current_step": "enriching_jobs"
+            }
+        checkpoint.complete_stage("enriching_jobs")
         
         return {
             **state,
@@ -94,32 +146,39 @@ def enrich_job_postings_step(state: WorkflowState) -> WorkflowState:
             "current_step": "enriching_jobs"
         }
 
+@run_stage("matching_candidates")
 def match_candidates_step(state: WorkflowState) -> WorkflowState:
-    """Step 3: Match candidates with enriched job postings"""
+    """Step 3: Match candidates with new or changed job postings, and changed candidates with all active ones"""
+    checkpoint = WorkflowCheckpoint(state["run_id"])
     try:
-        logging.info("Starting candidate matching step")
-        
-        enriched_jobs = state.get("enriched_jobs", [])
-        if not enriched_jobs:
-            logging.warning("No enriched jobs to match")
+        if checkpoint.is_stage_done("matching_candidates"):
+            logging.info("Candidates already matched by this run - skipping matching step")
             return {
                 **state,
                 "matches": [],
                 "current_step": "matching_candidates"
             }
+
+        logging.info("Starting candidate matching step")
         
-        candidate_matcher = CandidateMatcherAgent()
-        result = candidate_matcher.exec()
-        
-        # Parse the result to get matches
-        if isinstance(result, dict):
-            matches = result.get('matches', [])
-        elif isinstance(result, list):
-            matches = result
-        else:
-            matches = []
+        # Only the delta since the last successful matching run is evaluated, scored with parallel,
+        # bounded LLM calls streaming into the matches table. Chunks scored before a crash are
+        # answered by the LLM cache when the run resumes
+        result = score_pending_matches()
+        matches = result.matches if result else []
+        record_count("matches", len(matches))
+        if result and result.failed_chunks:
+            # The watermark wasn't advanced, so the failed pairs are retried in the next run
+            return {
+                **state,
+                "matches": matches,
+                "errors": state.get("errors", []) + [f"Matching error: {result.failed_chunks}/{result.chunks} chunks failed"],
+                "current_step": "matching_candidates"
+            }
             
         logging.info(f"Generated {len(matches)} matches")
+        checkpoint.record_matched()
+        checkpoint.complete_stage("matching_candidates")
         
         return {
             **state,
@@ -157,9 +216,13 @@ def create_job_matching_workflow():
     return workflow.compile()
 
 # Usage
-def run_job_matching_workflow():
-    """Run the complete job matching workflow"""
+def run_job_matching_workflow(run_id: Optional[int] = None, resume: bool = True):
+    """
+    Run the complete job matching workflow. The latest unfinished run is resumed unless resume is
+    False, run_id resumes that run instead
+    """
     workflow = create_job_matching_workflow()
+    checkpoint = WorkflowCheckpoint.resume(run_id) if run_id else WorkflowCheckpoint.start(WORKFLOW_NAME, resume)
     
     # Create initial state as a dictionary
     initial_state: WorkflowState = {
@@ -167,17 +230,56 @@ def run_job_matching_workflow():
         "enriched_jobs": [],
         "matches": [],
         "errors": [],
-        "current_step": ""
+        "current_step": "",
+        "run_id": checkpoint.run_id
     }
     
-    result = workflow.invoke(initial_state)
+    with RunLedger("workflow", WORKFLOW_NAME) as run_ledger:
+        try:
+            result = workflow.invoke(initial_state)
+        except Exception as e:
+            checkpoint.finish([f"Workflow error: {str(e)}"])
+            raise
+        checkpoint.finish(result.get('errors', []))
+        run_ledger.count("items_processed", len(result['job_postings']))
+        for error in result.get('errors', []):
+            run_ledger.error(error)
+        if result.get('errors'):
+            run_ledger.fail()
     
-    logging.info(f"Workflow completed. Generated {len(result['matches'])} matches")
+    logging.info(f"Workflow run {checkpoint.run_id} completed. Generated {len(result['matches'])} matches")
     if result.get('errors'):
         logging.error(f"Workflow errors: {result['errors']}")
     
     return result
 
+def print_workflow_run(run: Dict[str, Any]):
+    print(
+        f"#{run['id']:<5} {run['status']:10} {run['stage']:20} attempts={run['attempts']} "
+        f"started={run['started_at']:%Y-%m-%d %H:%M} items={run['items']}"
+    )
+    if run['error']:
+        print(f"       {run['error']}")
+
 if __name__ == '__main__':
-    result = run_job_matching_workflow()
-    print(f"Workflow completed with {len(result['matches'])} matches")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run, inspect and resume checkpointed job matching workflow runs")
+    parser.add_argument("--list", action="store_true", help="Show the latest runs")
+    parser.add_argument("--show", type=int, metavar="RUN_ID", help="Show a run's progress")
+    parser.add_argument("--resume", type=int, metavar="RUN_ID", help="Resume a run")
+    parser.add_argument("--abandon", type=int, metavar="RUN_ID", help="Stop a run from being resumed")
+    parser.add_argument("--new", action="store_true", help="Start a new run instead of resuming the latest unfinished one")
+    args = parser.parse_args()
+
+    if args.list:
+        for run in list_workflow_runs():
+            print_workflow_run(run)
+    elif args.show:
+        print_workflow_run(WorkflowCheckpoint(args.show).summary())
+    elif args.abandon:
+        WorkflowCheckpoint(args.abandon).abandon()
+        print(f"Abandoned run {args.abandon}")
+    else:
+        result = run_job_matching_workflow(run_id=args.resume, resume=not args.new)
+        print(f"Workflow completed with {len(result['matches'])} matches")
@@ -0,0 +1,248 @@
+"""
+Streaming variant of the job matching workflow.
+
+Instead of fetch -> enrich -> match, one stage after the other, the three stages run at the
+same time: job postings saved by the discovery agent flow through a bounded queue into the
+enrichment pipeline, and enriched postings through another bounded queue into matching, each
+stage working in micro-batches. A full queue blocks the stage feeding it, so a slow stage
+throttles the ones before it instead of piling up work in memory.
+"""
+
+import contextvars
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agents.candidate_matcher.batch_scorer import score_pending_matches
+from agents.job_enricher.pipeline import JobEnrichmentPipeline
+from agents.job_seeker.agent import JobSeekerAgent
+from common.config.config import STREAM_QUEUE_SIZE, STREAM_BATCH_SIZE, STREAM_BATCH_WAIT_SECONDS
+from common.database.models.job_posting import JobPosting
+from services.job_posting_events import job_posting_events
+from services.run_ledger import RunLedger
+
+WORKFLOW_NAME = "streaming_job_matching"
+
+# Put on a queue by the stage feeding it when it's done
+_END = object()
+
+
+@dataclass
+class StageCounters:
+    name: str
+    items_in: int = 0
+    items_out: int = 0
+    batches: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    # Deepest the stage's output queue got, a queue at capacity means the next stage is the bottleneck
+    max_queue_depth: int = 0
+
+    @property
+    def throughput(self) -> float:
+        """Items processed per busy second"""
+        return self.items_in / self.busy_seconds if self.busy_seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.name}: {self.items_in} in, {self.items_out} out, {self.batches} batches, {self.errors} errors, "
+            f"{self.busy_seconds:.1f}s busy ({self.throughput:.2f}/s), max queue depth {self.max_queue_depth}"
+        )
+
+
+class StreamingJobMatchingWorkflow:
+    def __init__(
+        self,
+        discover: Optional[Callable[[], Any]] = None,
+        queue_size: int = STREAM_QUEUE_SIZE,
+        batch_size: int = STREAM_BATCH_SIZE,
+        batch_wait_seconds: float = STREAM_BATCH_WAIT_SECONDS,
+    ):
+        self.discover = discover or (lambda: JobSeekerAgent().exec())
+        self.batch_size = batch_size
+        self.batch_wait_seconds = batch_wait_seconds
+        # Links of saved job postings, and IDs of enriched ones
+        self.discovered: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.enriched: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.counters = {name: StageCounters(name) for name in ("discover", "enrich", "match")}
+
+        self.job_links: List[str] = []
+        self.enriched_jobs: List[Dict[str, Any]] = []
+        self.matches: List[Dict[str, Any]] = []
+        self.errors: List[str] = []
+        self.first_discovery_at: Optional[float] = None
+        self.first_match_at: Optional[float] = None
+
+    def _put(self, target: queue.Queue, item: Any, counters: StageCounters):
+        # Blocks while the queue is full, which is the backpressure on the producing stage
+        target.put(item)
+        counters.items_out += 1
+        counters.max_queue_depth = max(counters.max_queue_depth, target.qsize())
+
+    def _take_batch(self, source: queue.Queue) -> Tuple[List[Any], bool]:
+        """
+        Up to batch_size items: waits for the first one, then at most batch_wait_seconds for the rest.
+        The flag is True once the producer is done.
+        """
+        item = source.get()
+        if item is _END:
+            return [], True
+        items = [item]
+        deadline = time.monotonic() + self.batch_wait_seconds
+        while len(items) < self.batch_size:
+            try:
+                item = source.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _END:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def _on_job_postings_saved(self, job_links: List[str]):
+        if self.first_discovery_at is None:
+            self.first_discovery_at = time.monotonic()
+        self.counters["discover"].items_in += len(job_links)
+        self.counters["discover"].batches += 1
+        self.job_links.extend(job_links)
+        for job_link in job_links:
+            self._put(self.discovered, job_link, self.counters["discover"])
+
+    def _discovery_stage(self):
+        counters = self.counters["discover"]
+        started = time.monotonic()
+        job_posting_events.subscribe(self._on_job_postings_saved)
+        try:
+            self.discover()
+        except Exception as e:
+            counters.errors += 1
+            self.errors.append(f"Fetch error: {e}")
+            logging.error(f"[StreamingWorkflow] Discovery failed: {e}")
+        finally:
+            job_posting_events.unsubscribe(self._on_job_postings_saved)
+            counters.busy_seconds = time.monotonic() - started
+            self.discovered.put(_END)
+
+    def _enrichment_stage(self):
+        counters = self.counters["enrich"]
+        pipeline = JobEnrichmentPipeline()
+        finished = False
+        while not finished:
+            job_links, finished = self._take_batch(self.discovered)
+            if not job_links:
+                continue
+            started = time.monotonic()
+            counters.items_in += len(job_links)
+            counters.batches += 1
+            try:
+                # Postings saved again after being enriched earlier are left as they are
+                report = pipeline.run(JobPosting.job_link.in_(job_links), JobPosting.enriched_at.is_(None))
+                self.enriched_jobs.extend(report.results)
+                counters.busy_seconds += time.monotonic() - started
+                for result in report.results:
+                    if result["status"] == "active":
+                        self._put(self.enriched, result["id"], counters)
+            except Exception as e:
+                counters.busy_seconds += time.monotonic() - started
+                counters.errors += 1
+                self.errors.append(f"Enrichment error: {e}")
+                logging.error(f"[StreamingWorkflow] Enrichment batch failed: {e}")
+        self.enriched.put(_END)
+
+    def _match(self, *job_posting_criteria):
+        counters = self.counters["match"]
+        started = time.monotonic()
+        counters.batches += 1
+        try:
+            result = score_pending_matches(*job_posting_criteria)
+            if result:
+                self.matches.extend(result.matches)
+                counters.items_out += len(result.matches)
+                if result.matches and self.first_match_at is None:
+                    self.first_match_at = time.monotonic()
+                if result.failed_chunks:
+                    counters.errors += 1
+                    self.errors.append(f"Matching error: {result.failed_chunks}/{result.chunks} chunks failed")
+        except Exception as e:
+            counters.errors += 1
+            self.errors.append(f"Matching error: {e}")
+            logging.error(f"[StreamingWorkflow] Matching batch failed: {e}")
+        finally:
+            counters.busy_seconds += time.monotonic() - started
+
+    def _matching_stage(self):
+        counters = self.counters["match"]
+        finished = False
+        while not finished:
+            job_posting_ids, finished = self._take_batch(self.enriched)
+            if job_posting_ids:
+                counters.items_in += len(job_posting_ids)
+                # Every enriched posting pending a match, which includes this batch
+                self._match(JobPosting.enriched_at.isnot(None))
+        # Final pass over the whole delta, e.g. postings whose content changed but didn't need enrichment. The
+        # batches only matched changed candidates with enriched postings, this pass pairs them with every active one
+        self._match()
+
+    def run(self) -> Dict[str, Any]:
+        started = time.monotonic()
+        # Each stage runs in a copy of this context, so its pages and LLM calls count towards the caller's run
+        stages = [
+            threading.Thread(target=contextvars.copy_context().run, args=(target,), name=name, daemon=True)
+            for target, name in (
+                (self._discovery_stage, "stream-discover"),
+                (self._enrichment_stage, "stream-enrich"),
+                (self._matching_stage, "stream-match"),
+            )
+        ]
+        for stage in stages:
+            stage.start()
+        for stage in stages:
+            stage.join()
+
+        time_to_first_match = (
+            self.first_match_at - self.first_discovery_at
+            if self.first_match_at is not None and self.first_discovery_at is not None else None
+        )
+        for counters in self.counters.values():
+            logging.info(f"[StreamingWorkflow] {counters.summary()}")
+        if time_to_first_match is not None:
+            logging.info(f"[StreamingWorkflow] First match {time_to_first_match:.1f}s after the first discovered posting")
+        logging.info(f"[StreamingWorkflow] Completed in {time.monotonic() - started:.1f}s with {len(self.matches)} matches")
+
+        return {
+            "job_postings": [{"job_link": job_link} for job_link in self.job_links],
+            "enriched_jobs": self.enriched_jobs,
+            "matches": self.matches,
+            "errors": self.errors,
+            "current_step": "matching_candidates",
+            "stages": {name: counters.__dict__.copy() for name, counters in self.counters.items()},
+            "time_to_first_match_seconds": time_to_first_match,
+        }
+
+
+def run_streaming_job_matching_workflow() -> Dict[str, Any]:
+    """Run discovery, enrichment and matching concurrently"""
+    with RunLedger("workflow", WORKFLOW_NAME) as run_ledger:
+        result = StreamingJobMatchingWorkflow().run()
+        # The stages overlap, each one's busy time is recorded
+        for name, counters in result["stages"].items():
+            run_ledger.record_stage(name, counters["busy_seconds"])
+        run_ledger.count("items_processed", len(result["job_postings"]))
+        run_ledger.count("job_postings_discovered", len(result["job_postings"]))
+        run_ledger.count("job_postings_enriched", len(result["enriched_jobs"]))
+        run_ledger.count("matches", len(result["matches"]))
+        for error in result["errors"]:
+            run_ledger.error(error)
+        if result["errors"]:
+            run_ledger.fail()
+    if result["errors"]:
+        logging.error(f"Workflow errors: {result['errors']}")
+    return result
+
+
+if __name__ == '__main__':
+    result = run_streaming_job_matching_workflow()
+    print(f"Workflow completed with {len(result['matches'])} matches")